@@ -0,0 +1,29 @@
+"""Move audit_logs rows older than the retention window into gzip day segments.
+
+Usage:
+    python archive_audit_logs.py [--days 90] [--dir audit_archive]
+
+Defaults come from FOOD_AUDIT_RETENTION_DAYS / FOOD_AUDIT_ARCHIVE_DIR. Safe to
+run repeatedly (e.g. from a nightly cron job).
+"""
+import argparse
+
+from core.database import init_database
+from core.audit_archive import archive_audit_logs, get_archive_dir, get_retention_days, load_index
+
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--days", type=int, default=None, help="days kept in the live table")
+parser.add_argument("--dir", default=None, help="archive directory")
+args = parser.parse_args()
+
+init_database()
+archive_dir = get_archive_dir(args.dir)
+archived = archive_audit_logs(retention_days=args.days, archive_dir=archive_dir)
+
+print(f"\n✓ Archived {archived} audit row(s) older than {get_retention_days(args.days)} day(s) into {archive_dir}/\n")
+segments = load_index(archive_dir).get("segments", {})
+for day, segment in sorted(segments.items())[-10:]:
+    print(f"{day}: {segment['count']} row(s) in {segment['file']}")
+if len(segments) > 10:
+    print(f"... {len(segments)} segment(s) in total")
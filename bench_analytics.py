@@ -0,0 +1,206 @@
+"""Time the NumPy columnar analytics (core.columnar) against per-order Python loops.
+
+Seeds a temporary database up to each requested order count (with 1-4 order
+lines per order), then reports, per size:
+
+* loading the order / line-item column snapshots from SQL, and reopening a
+  saved snapshot memory-mapped;
+* the dashboard reports on those arrays: 30-day period revenue, 14-day daily
+  trend, top sellers, per-customer cancellation stats, 7-day daily risk series;
+* the same period revenue / trend / customer stats as a per-order loop over
+  ``list_orders`` rows, for comparison.
+
+Usage:
+    python bench_analytics.py [--sizes 10000,100000,1000000] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+STATUSES = ["placed", "preparing", "out for delivery", "delivered", "delivered", "delivered", "cancelled"]
+
+
+def _seed(start, stop, customer_ids, rng):
+    from models.models import engine, Order, OrderItem
+
+    now = datetime.now()
+    with engine.begin() as conn:
+        orders, lines = [], []
+        for i in range(start, stop):
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 120))
+            count = rng.randint(1, 4)
+            orders.append({
+                "id": i + 1, "customer_id": rng.choice(customer_ids), "customer_order_number": i + 1,
+                "customer_name": "Bench Customer", "delivery_address": f"Bench St. {rng.randint(1, 500)}",
+                "contact_number": "+639170000000", "total_amount": 120.0 * count, "items": "[]",
+                "status": rng.choice(STATUSES), "payment_method": "Cash on Delivery",
+                "created_at": created, "placed_at": created,
+            })
+            lines.extend(
+                {"order_id": i + 1, "menu_item_id": rng.randint(1, 200), "name": "Bench Dish",
+                 "unit_price": 120.0, "quantity": rng.randint(1, 3)}
+                for _ in range(count)
+            )
+            if len(orders) >= 5000:
+                conn.execute(Order.__table__.insert(), orders)
+                conn.execute(OrderItem.__table__.insert(), lines)
+                orders, lines = [], []
+        if orders:
+            conn.execute(Order.__table__.insert(), orders)
+            conn.execute(OrderItem.__table__.insert(), lines)
+
+
+def _seed_reference_rows(customers):
+    from models.models import engine, MenuItem, User
+
+    with engine.begin() as conn:
+        conn.execute(MenuItem.__table__.insert(), [
+            {"name": f"Bench Dish {i}", "description": "bench", "price": 120.0, "stock": 50,
+             "image": "", "image_type": "base64", "category": f"Cat {i % 5}"}
+            for i in range(200)
+        ])
+        conn.execute(User.__table__.insert(), [
+            {"email": f"bench-{i}@example.com", "password": "x", "full_name": f"Bench {i}", "role": "customer"}
+            for i in range(customers)
+        ])
+        return [row.id for row in conn.execute(User.__table__.select().where(User.__table__.c.role == "customer"))]
+
+
+def _best(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000, result
+
+
+def _row_loop_reports(orders, today, now):
+    """Period revenue, 14-day trend and per-customer cancellations, one order at a time."""
+    period_start = today - timedelta(days=29)
+    trend_start = today - timedelta(days=13)
+    revenue = 0.0
+    trend = {}
+    by_customer = {}
+    for order in orders:
+        created = order.get("created_at") or order.get("placed_at")
+        if isinstance(created, str):
+            created = datetime.fromisoformat(created)
+        day = created.date()
+        status = (order.get("status") or "").strip().lower()
+        amount = float(order.get("total_amount") or 0.0)
+        if status != "cancelled" and period_start <= day <= today:
+            revenue += amount
+        if status != "cancelled" and trend_start <= day <= today:
+            trend[day] = trend.get(day, 0.0) + amount
+        bucket = by_customer.setdefault(order.get("customer_id"), [0, 0, 0])
+        bucket[0] += 1
+        if status == "cancelled":
+            bucket[1] += 1
+            if created >= now - timedelta(days=7):
+                bucket[2] += 1
+    return revenue, trend, by_customer
+
+
+def _vectorized_timings(columnar, orders_cols, item_cols, today, now, repeat):
+    """Best times of the dashboard reports on the given column snapshots."""
+    def dashboard():
+        columnar.period_revenue(orders_cols, today - timedelta(days=29), today)
+        columnar.daily_totals(orders_cols, today - timedelta(days=13), 14)
+        columnar.top_items(item_cols, today - timedelta(days=29), today)
+        columnar.customer_order_stats(orders_cols, now)
+        columnar.daily_customer_counts(orders_cols, today - timedelta(days=6), 7)
+
+    steps = [
+        ("period revenue (30d)", lambda: columnar.period_revenue(orders_cols, today - timedelta(days=29), today)),
+        ("daily trend (14d)", lambda: columnar.daily_totals(orders_cols, today - timedelta(days=13), 14)),
+        ("top sellers (30d)", lambda: columnar.top_items(item_cols, today - timedelta(days=29), today)),
+        ("per-customer cancellation stats", lambda: columnar.customer_order_stats(orders_cols, now)),
+        ("daily risk counts (7d)", lambda: columnar.daily_customer_counts(orders_cols, today - timedelta(days=6), 7)),
+        ("all vectorized reports", dashboard),
+    ]
+    timings = []
+    for label, fn in steps:
+        ms, _ = _best(fn, repeat)
+        timings.append((label, ms))
+    return timings
+
+
+def run(sizes, repeat):
+    from core.database import init_database, list_orders
+    from core import columnar
+
+    if not columnar.HAS_NUMPY:
+        print("numpy is not installed: pip install numpy")
+        return 1
+
+    init_database()
+    rng = random.Random(11)
+    customer_ids = _seed_reference_rows(customers=2000)
+    seeded = 0
+
+    print(f"{'orders':>9} {'step':<40} {'best ms':>10}")
+    print("-" * 62)
+    for size in sizes:
+        _seed(seeded, size, customer_ids, rng)
+        seeded = size
+
+        now = datetime.now()
+        today = now.date()
+        timings = []
+
+        ms, orders_cols = _best(columnar.load_order_columns, repeat)
+        timings.append(("load order columns (SQL)", ms))
+        ms, item_cols = _best(columnar.load_item_columns, repeat)
+        timings.append(("load item columns (SQL)", ms))
+
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            orders_cols.save(snapshot_dir)
+            ms, mapped_cols = _best(lambda: columnar.OrderColumns.load(snapshot_dir), repeat)
+            timings.append(("reopen snapshot (mmap .npy)", ms))
+            timings.extend(_vectorized_timings(columnar, mapped_cols, item_cols, today, now, repeat))
+            mapped_cols = None  # release the memory map before the directory is removed
+
+        ms, rows = _best(list_orders, 1)
+        timings.append(("row path: list_orders", ms))
+        ms, _ = _best(lambda: _row_loop_reports(rows, today, now), 1)
+        timings.append(("row path: per-order loop", ms))
+
+        for label, ms in timings:
+            print(f"{size:>9} {label:<40} {ms:>10.1f}")
+        print("-" * 62)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.sizes.split(",") if size.strip())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before models.models builds its engine
+        os.environ.update({
+            "FOOD_DB_PATH": os.path.join(tmp, "bench.db"),
+            "FOOD_DB_IN_MEMORY": "0",
+            "ADMIN_EMAIL": "bench-admin@example.com",
+            "ADMIN_PASSWORD": "Bench#Pass1",
+            "CUSTOMER_EMAIL": "bench-customer@example.com",
+            "CUSTOMER_PASSWORD": "Bench#Pass1",
+            "OWNER_EMAIL": "bench-owner@example.com",
+            "OWNER_PASSWORD": "Bench#Pass1",
+        })
+        os.environ.pop("FOOD_DB_URL", None)
+        return run(sizes, args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Count database commits per checkout and per login for each audit mode.
+
+Runs against a temporary database. For every core.audit mode it places
+orders, performs successful and failed logins, flushes the audit queue and
+reports commits per operation (counted with a SQLAlchemy ``commit`` event on
+the write engine) plus wall time.
+
+Usage:
+    python bench_audit_commits.py [--orders 200] [--logins 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+def run(orders, logins):
+    from sqlalchemy import event
+    from core.audit import AUDIT_MODES, audit_writer
+    from core.auth import authenticate_user
+    from core.database import init_database, create_menu_item, create_order
+    from models.models import Session, MenuItem, User, engine
+
+    init_database()
+    create_menu_item("Bench Adobo", "bench", 120.0, 10 ** 9, "🍗", image_type="emoji", category="Mains")
+
+    session = Session()
+    try:
+        customer_id = session.query(User.id).filter_by(role="customer").scalar()
+        item_id = session.query(MenuItem.id).filter_by(name="Bench Adobo").scalar()
+    finally:
+        session.close()
+
+    cart = [{"id": item_id, "name": "Bench Adobo", "price": 120.0, "quantity": 1}]
+    email = os.environ["CUSTOMER_EMAIL"]
+    password = os.environ["CUSTOMER_PASSWORD"]
+
+    commits = [0]
+
+    def count_commit(conn):
+        commits[0] += 1
+
+    event.listen(engine, "commit", count_commit)
+
+    def measure(operation, count):
+        audit_writer.flush()
+        commits[0] = 0
+        started = time.perf_counter()
+        for _ in range(count):
+            operation()
+        elapsed = time.perf_counter() - started
+        audit_writer.flush()
+        return commits[0] / count, elapsed * 1000.0 / count
+
+    operations = [
+        ("checkout", orders, lambda: create_order(customer_id, "Bench", "Bench St.", "+639170000000", cart, 120.0)),
+        ("login ok", logins, lambda: authenticate_user(email, password)),
+        ("login unknown", logins, lambda: authenticate_user("nobody@example.com", "wrong")),
+    ]
+
+    print(f"{'mode':<14} {'operation':<14} {'commits/op':>11} {'ms/op':>8}")
+    print("-" * 50)
+    for mode in AUDIT_MODES:
+        audit_writer.mode = mode
+        for label, count, operation in operations:
+            per_op, ms = measure(operation, count)
+            print(f"{mode:<14} {label:<14} {per_op:>11.2f} {ms:>8.2f}")
+
+    event.remove(engine, "commit", count_commit)
+    audit_writer.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before models.models builds its engine
+        os.environ.update({
+            "FOOD_DB_PATH": os.path.join(tmp, "bench.db"),
+            "FOOD_DB_IN_MEMORY": "0",
+            "FOOD_AUDIT_MODE": "buffered",
+            "ADMIN_EMAIL": "bench-admin@example.com",
+            "ADMIN_PASSWORD": "Bench#Pass1",
+            "CUSTOMER_EMAIL": "bench-customer@example.com",
+            "CUSTOMER_PASSWORD": "Bench#Pass1",
+            "OWNER_EMAIL": "bench-owner@example.com",
+            "OWNER_PASSWORD": "Bench#Pass1",
+        })
+        os.environ.pop("FOOD_DB_URL", None)
+        run(args.orders, args.logins)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Compare ORM + to_dict list reads with the projected row path (core.projections).
+
+Seeds a temporary database with N orders (and a menu with large base64-sized
+images), then times get_all_orders vs list_orders and get_all_menu_items vs
+list_menu_items, reporting rows/sec for each.
+
+Usage:
+    python bench_list_rows.py [--orders 100000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def _seed(order_count):
+    from models.models import engine, MenuItem, Order, User
+
+    with engine.begin() as conn:
+        customer_id = conn.execute(User.__table__.select().where(User.__table__.c.role == "customer")).first().id
+        conn.execute(MenuItem.__table__.insert(), [
+            {
+                "name": f"Bench Dish {i}", "description": "bench", "price": 100.0 + i, "stock": 50,
+                "image": "x" * 200_000, "image_type": "base64", "category": f"Cat {i % 5}",
+                "recipe": "step " * 2000, "ingredients": "rice, egg",
+            }
+            for i in range(200)
+        ])
+
+        rng = random.Random(7)
+        now = datetime.now()
+        statuses = ["placed", "preparing", "out for delivery", "delivered", "cancelled"]
+        batch = []
+        for i in range(order_count):
+            items = [{"id": rng.randint(1, 200), "name": "Bench Dish", "price": 120.0, "quantity": rng.randint(1, 3)}
+                     for _ in range(rng.randint(1, 4))]
+            created = now - timedelta(minutes=i * 3)
+            batch.append({
+                "customer_id": customer_id, "customer_order_number": order_count - i,
+                "customer_name": "Bench Customer", "delivery_address": "Bench St.", "contact_number": "+639170000000",
+                "total_amount": 120.0 * len(items), "items": json.dumps(items), "status": rng.choice(statuses),
+                "payment_method": "Cash on Delivery", "created_at": created, "placed_at": created,
+            })
+            if len(batch) >= 5000:
+                conn.execute(Order.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Order.__table__.insert(), batch)
+
+
+def _time(label, fn, repeat):
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = len(fn())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<38} {rows:>8} {best * 1000:>10.1f} {rows / best if best else 0:>12,.0f}")
+    return best
+
+
+def run(order_count, repeat):
+    from core.database import (
+        init_database, get_all_orders, list_orders, get_all_menu_items, list_menu_items,
+    )
+
+    init_database()
+    print(f"Seeding {order_count} orders...")
+    _seed(order_count)
+
+    print(f"{'path':<38} {'rows':>8} {'best ms':>10} {'rows/sec':>12}")
+    print("-" * 72)
+    orm = _time("get_all_orders (ORM + to_dict)", get_all_orders, repeat)
+    projected = _time("list_orders (projected)", list_orders, repeat)
+    _time("list_orders(include_items=True)", lambda: list_orders(include_items=True), repeat)
+    menu_orm = _time("get_all_menu_items (ORM + to_dict)", get_all_menu_items, repeat)
+    menu_projected = _time("list_menu_items (projected)", list_menu_items, repeat)
+    print("-" * 72)
+    print(f"orders speed-up: {orm / projected:.1f}x   menu speed-up: {menu_orm / menu_projected:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before models.models builds its engine
+        os.environ.update({
+            "FOOD_DB_PATH": os.path.join(tmp, "bench.db"),
+            "FOOD_DB_IN_MEMORY": "0",
+            "ADMIN_EMAIL": "bench-admin@example.com",
+            "ADMIN_PASSWORD": "Bench#Pass1",
+            "CUSTOMER_EMAIL": "bench-customer@example.com",
+            "CUSTOMER_PASSWORD": "Bench#Pass1",
+            "OWNER_EMAIL": "bench-owner@example.com",
+            "OWNER_PASSWORD": "Bench#Pass1",
+        })
+        os.environ.pop("FOOD_DB_URL", None)
+        run(args.orders, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Benchmark order-placement throughput for each SQLite storage profile.
+
+Each profile runs in a fresh subprocess against its own temporary database
+(FOOD_DB_PATH / FOOD_DB_PROFILE), with several threads calling
+core.database.create_order concurrently while another thread applies status
+updates, like owners working the order list during checkout traffic.
+
+Usage:
+    python bench_storage_profiles.py [--threads 8] [--orders 200] [--profiles legacy,performance]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def _worker(threads, orders_per_thread):
+    from core.database import init_database, create_menu_item, create_order, update_order_status
+    from models.models import Session, MenuItem, Order, User
+
+    init_database()
+    create_menu_item("Bench Adobo", "bench", 120.0, 10 ** 9, "🍗", image_type="emoji", category="Mains")
+    create_menu_item("Bench Rice", "bench", 20.0, 10 ** 9, "🍚", image_type="emoji", category="Sides")
+
+    session = Session()
+    try:
+        customer_id = session.query(User.id).filter_by(role="customer").scalar()
+        item_ids = [row[0] for row in session.query(MenuItem.id).filter(MenuItem.name.like("Bench %")).all()]
+    finally:
+        session.close()
+
+    cart = [
+        {"id": item_ids[0], "name": "Bench Adobo", "price": 120.0, "quantity": 1},
+        {"id": item_ids[1], "name": "Bench Rice", "price": 20.0, "quantity": 2},
+    ]
+    errors = []
+    placed = [0]
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def place_orders():
+        for _ in range(orders_per_thread):
+            try:
+                create_order(customer_id, "Bench Customer", "Bench St.", "+639170000000", cart, 160.0)
+                with lock:
+                    placed[0] += 1
+            except Exception as e:
+                errors.append(str(e))
+        Session.remove()
+
+    def update_statuses():
+        while not done.is_set():
+            session = Session()
+            try:
+                order_id = session.query(Order.id).filter_by(status="placed").order_by(Order.id.desc()).limit(1).scalar()
+            finally:
+                session.close()
+            if order_id:
+                ok, message = update_order_status(order_id, "preparing", None)
+                if not ok:
+                    errors.append(message)
+            time.sleep(0.005)
+        Session.remove()
+
+    owner = threading.Thread(target=update_statuses)
+    customers = [threading.Thread(target=place_orders) for _ in range(threads)]
+
+    started = time.perf_counter()
+    owner.start()
+    for thread in customers:
+        thread.start()
+    for thread in customers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    owner.join()
+
+    locked = sum(1 for message in errors if "locked" in message.lower())
+    print(json.dumps({
+        "orders": placed[0],
+        "seconds": elapsed,
+        "orders_per_sec": placed[0] / elapsed if elapsed else 0.0,
+        "errors": len(errors),
+        "locked_errors": locked,
+    }))
+
+
+def main():
+    from models.storage import PROFILES
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=200, help="orders per thread")
+    parser.add_argument("--profiles", default=",".join(PROFILES))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.threads, args.orders)
+        return
+
+    print(f"{'profile':<12} {'orders':>8} {'seconds':>9} {'orders/s':>10} {'errors':>7} {'locked':>7}")
+    print("-" * 58)
+    for profile in [p.strip() for p in args.profiles.split(",") if p.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ)
+            env.update({
+                "FOOD_DB_PATH": os.path.join(tmp, "bench.db"),
+                "FOOD_DB_PROFILE": profile,
+                "FOOD_DB_IN_MEMORY": "0",
+                "ADMIN_EMAIL": "bench-admin@example.com",
+                "ADMIN_PASSWORD": "Bench#Pass1",
+                "CUSTOMER_EMAIL": "bench-customer@example.com",
+                "CUSTOMER_PASSWORD": "Bench#Pass1",
+                "OWNER_EMAIL": "bench-owner@example.com",
+                "OWNER_PASSWORD": "Bench#Pass1",
+            })
+            env.pop("FOOD_DB_URL", None)
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker",
+                 "--threads", str(args.threads), "--orders", str(args.orders)],
+                env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                print(f"{profile:<12} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(
+                f"{profile:<12} {stats['orders']:>8} {stats['seconds']:>9.2f} "
+                f"{stats['orders_per_sec']:>10.1f} {stats['errors']:>7} {stats['locked_errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Fail if an audit entry recorded in a rolled-back transaction is ever written.
+
+Runs against a temporary database in ``immediate`` audit mode (entries joined
+to a session are written after its commit). For each way a transaction can
+end without committing (``rollback()``, ``close()``) it records an entry on
+the thread's session, ends the transaction, then makes an unrelated commit on
+the same session and checks that only the committed entries were persisted.
+
+Usage:
+    python check_audit_rollback.py
+"""
+import os
+import sys
+import tempfile
+
+
+def run():
+    from core.audit import record_audit
+    from core.database import init_database
+    from models.models import Session, AuditLog, MenuItem
+
+    init_database()
+
+    def end_with_rollback(session):
+        session.rollback()
+
+    def end_with_close(session):
+        session.close()
+
+    failures = 0
+    for label, end_transaction in (("rollback", end_with_rollback), ("close", end_with_close)):
+        session = Session()
+        try:
+            record_audit(None, f"ROLLED_BACK_{label.upper()}", "must not be written", session=session)
+            session.query(MenuItem).first()
+            end_transaction(session)
+
+            # An unrelated commit later on the same thread-local session
+            record_audit(None, f"COMMITTED_{label.upper()}", "written", session=session)
+            session.query(MenuItem).first()
+            session.commit()
+
+            actions = {action for (action,) in session.query(AuditLog.action)}
+        finally:
+            session.close()
+
+        leaked = f"ROLLED_BACK_{label.upper()}" in actions
+        written = f"COMMITTED_{label.upper()}" in actions
+        ok = written and not leaked
+        print(f"{'✓' if ok else '✗'} {label}: committed entry written={written}, rolled-back entry written={leaked}")
+        failures += 0 if ok else 1
+
+    print("-" * 60)
+    if failures:
+        print(f"✗ {failures} case(s) wrote audit entries of a rolled-back transaction")
+        return 1
+    print("✓ Rolled-back audit entries are discarded")
+    return 0
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before models.models builds its engine
+        os.environ.update({
+            "FOOD_DB_PATH": os.path.join(tmp, "audit-check.db"),
+            "FOOD_DB_IN_MEMORY": "0",
+            "FOOD_AUDIT_MODE": "immediate",
+            "ADMIN_EMAIL": "check-admin@example.com",
+            "ADMIN_PASSWORD": "Check#Pass1",
+            "CUSTOMER_EMAIL": "check-customer@example.com",
+            "CUSTOMER_PASSWORD": "Check#Pass1",
+            "OWNER_EMAIL": "check-owner@example.com",
+            "OWNER_PASSWORD": "Check#Pass1",
+        })
+        os.environ.pop("FOOD_DB_URL", None)
+        return run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""Fail if a hot query in core.database / core.auth falls back to a full table scan.
+
+Runs each hot read path against the configured database, captures the SQL it
+emits and checks SQLite's EXPLAIN QUERY PLAN output. Exits non-zero when any
+plan contains a bare ``SCAN <table>`` (no index) or sorts with a temp B-tree
+(except BM25-ranked full-text results and prefix-search matches). Keyset
+pages walked newest first in primary-key order stop after LIMIT rows and are
+not counted as full scans.
+"""
+import re
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import event
+
+from models.models import engine, read_engine
+from core.database import (
+    init_database,
+    get_orders_by_customer,
+    get_all_orders,
+    get_orders_page,
+    get_audit_logs,
+    get_menu_items_page,
+    get_menu_items_keyset,
+    search_menu_items,
+    get_user_favorites,
+    get_favorite_menu_items_page,
+    get_menu_item_stats,
+    get_daily_sales,
+    get_daily_item_sales,
+    get_daily_customer_order_counts,
+    get_order_status_events,
+    get_staff_cancelled_order_ids,
+    get_stage_durations,
+)
+from core.auth import get_user_by_id, get_all_users, search_users
+from core.read_cache import read_cache
+from core.menu_facets import category_facets
+
+
+HOT_QUERIES = [
+    ("get_orders_by_customer", lambda: get_orders_by_customer(1)),
+    ("get_all_orders", get_all_orders),
+    ("get_orders_page", lambda: get_orders_page(limit=50)),
+    ("get_orders_page(status)", lambda: get_orders_page(status="placed", since=datetime.now() - timedelta(days=30))),
+    ("get_orders_page(cursor)", lambda: get_orders_page(status="placed", cursor=[datetime.now().isoformat(), 10])),
+    ("get_orders_page(legacy cursor)", lambda: get_orders_page(status="placed", cursor=[None, 10])),
+    ("get_audit_logs", lambda: get_audit_logs(limit=100)),
+    ("get_menu_items_page", lambda: get_menu_items_page(limit=10, offset=0)),
+    ("get_menu_items_page(category)", lambda: get_menu_items_page(category="Mains", limit=10, offset=0)),
+    ("get_menu_items_keyset", lambda: get_menu_items_keyset(limit=10, cursor=["Mains", "Lechon", 1])),
+    ("get_menu_items_keyset(prev)", lambda: get_menu_items_keyset(limit=10, cursor=["Mains", "Lechon", 1], direction="prev")),
+    ("get_menu_items_keyset(last)", lambda: get_menu_items_keyset(category="Mains", limit=10, direction="last")),
+    ("search_menu_items", lambda: search_menu_items("lech", limit=10)),
+    ("category facets rebuild", category_facets.rebuild),
+    ("get_user_favorites", lambda: get_user_favorites(1)),
+    ("get_favorite_menu_items_page", lambda: get_favorite_menu_items_page(1, limit=10)),
+    ("get_favorite_menu_items_page(cursor)", lambda: get_favorite_menu_items_page(1, limit=10, cursor=5)),
+    ("get_favorite_menu_items_page(last)", lambda: get_favorite_menu_items_page(1, limit=10, direction="last")),
+    ("get_menu_item_stats", lambda: get_menu_item_stats(1)),
+    ("get_daily_sales", lambda: get_daily_sales(since=(datetime.now() - timedelta(days=60)).date())),
+    ("get_daily_item_sales", lambda: get_daily_item_sales(since=(datetime.now() - timedelta(days=30)).date())),
+    ("get_daily_customer_order_counts", lambda: get_daily_customer_order_counts(since=(datetime.now() - timedelta(days=90)).date())),
+    ("get_order_status_events", lambda: get_order_status_events(1)),
+    ("get_staff_cancelled_order_ids", get_staff_cancelled_order_ids),
+    ("get_staff_cancelled_order_ids(ids)", lambda: get_staff_cancelled_order_ids(since=datetime.now() - timedelta(minutes=5), order_ids=[1, 2, 3])),
+    ("get_stage_durations", lambda: get_stage_durations(since=datetime.now() - timedelta(days=30))),
+    ("get_user_by_id", lambda: get_user_by_id(1)),
+    ("search_users", lambda: search_users()),
+    ("search_users(role)", lambda: search_users(role="customer")),
+    ("search_users(status)", lambda: search_users(status="disabled")),
+    ("search_users(cursor)", lambda: search_users(role="customer", cursor=10)),
+    ("search_users(locked)", lambda: search_users(status="locked")),
+    ("search_users(query)", lambda: search_users(query="ana")),
+    ("search_users(query, role)", lambda: search_users(role="customer", query="élo")),
+    ("get_all_users", get_all_users),
+]
+
+
+def _full_scans(details, statement):
+    """Plan steps that read a whole table (or sort it) instead of using an index."""
+    ranked_search = any("VIRTUAL TABLE INDEX" in detail.upper() for detail in details)
+    # OR of index range seeks (prefix search): only the matching rows are sorted
+    prefix_search = any(detail.upper() == "MULTI-INDEX OR" for detail in details)
+    # Newest-first page in rowid order: the scan stops after LIMIT rows
+    keyset_tables = set(re.findall(r"ORDER BY (\w+)\.id DESC\s+LIMIT", statement, re.IGNORECASE))
+    bad = []
+    for detail in details:
+        upper = detail.upper()
+        if upper.startswith("SCAN ") and " USING " not in upper and "VIRTUAL TABLE INDEX" not in upper:
+            # Subquery results and the schema catalog are not table scans
+            if upper.startswith(("SCAN (SUBQUERY", "SCAN SUBQUERY", "SCAN SQLITE_MASTER")):
+                continue
+            if detail.split()[1] in keyset_tables:
+                continue
+            bad.append(detail)
+        elif "USE TEMP B-TREE FOR ORDER BY" in upper and not (ranked_search or prefix_search):
+            # Full-text results are sorted by BM25 rank, which no index can provide
+            bad.append(detail)
+    return bad
+
+
+def main():
+    init_database()
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    failures = 0
+    for label, run_query in HOT_QUERIES:
+        captured.clear()
+        read_cache.clear()  # plan the SQL of every read, not a cached result
+        engines = {engine, read_engine}
+        for bound in engines:
+            event.listen(bound, "before_cursor_execute", capture)
+        try:
+            run_query()
+        finally:
+            for bound in engines:
+                event.remove(bound, "before_cursor_execute", capture)
+
+        with engine.connect() as conn:
+            for statement, parameters in captured:
+                plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                details = [row[-1] for row in plan]
+                bad = _full_scans(details, statement)
+                status = "✗" if bad else "✓"
+                print(f"{status} {label}")
+                for detail in details:
+                    print(f"    {detail}")
+                if bad:
+                    failures += 1
+
+    print("-" * 60)
+    if failures:
+        print(f"✗ {failures} hot query plan(s) fall back to a full table scan")
+        return 1
+    print("✓ All hot queries are index-backed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
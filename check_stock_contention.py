@@ -0,0 +1,127 @@
+"""Fail if concurrent checkouts can oversell a menu item.
+
+Creates a temporary database, stocks one item with a few units and lets many
+threads call core.database.create_order for it at the same time. Exits
+non-zero if stock goes negative, or if the units sold (order_items) and the
+remaining stock do not add up to the starting stock.
+
+Usage:
+    python check_stock_contention.py [--threads 16] [--attempts 20] [--stock 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+
+
+def run(threads, attempts, stock):
+    from sqlalchemy import func
+    from core.database import init_database, create_menu_item, create_order
+    from models.models import Session, MenuItem, OrderItem, User
+
+    init_database()
+    create_menu_item("Last Lechon", "contention check", 240.0, stock, "🐷", image_type="emoji", category="Mains")
+    create_menu_item("Plenty Rice", "contention check", 20.0, 10 ** 6, "🍚", image_type="emoji", category="Sides")
+
+    session = Session()
+    try:
+        customer_id = session.query(User.id).filter_by(role="customer").scalar()
+        scarce_id = session.query(MenuItem.id).filter_by(name="Last Lechon").scalar()
+        rice_id = session.query(MenuItem.id).filter_by(name="Plenty Rice").scalar()
+    finally:
+        session.close()
+
+    placed = [0]
+    rejected = [0]
+    errors = []
+    lock = threading.Lock()
+    start = threading.Barrier(threads)
+
+    def checkout():
+        rng = random.Random()
+        start.wait()
+        for _ in range(attempts):
+            cart = [
+                {"id": scarce_id, "name": "Last Lechon", "price": 240.0, "quantity": rng.randint(1, 3)},
+                {"id": rice_id, "name": "Plenty Rice", "price": 20.0, "quantity": 1},
+            ]
+            try:
+                success, _order_id, conflicts = create_order(
+                    customer_id, "Contention Customer", "Check St.", "+639170000000", cart, 0.0
+                )
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            with lock:
+                if success:
+                    placed[0] += 1
+                else:
+                    rejected[0] += 1
+                    if not conflicts:
+                        errors.append("rejected order without conflicts")
+        Session.remove()
+
+    workers = [threading.Thread(target=checkout) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    session = Session()
+    try:
+        remaining = session.query(MenuItem.stock).filter_by(id=scarce_id).scalar()
+        sold = session.query(func.coalesce(func.sum(OrderItem.quantity), 0))\
+            .filter(OrderItem.menu_item_id == scarce_id)\
+            .scalar()
+    finally:
+        session.close()
+
+    print(f"orders placed: {placed[0]}, rejected: {rejected[0]}, errors: {len(errors)}")
+    print(f"stock: start {stock}, sold {sold}, remaining {remaining}")
+
+    failures = []
+    if remaining < 0:
+        failures.append("stock went negative")
+    if sold + remaining != stock:
+        failures.append("units sold + remaining stock != starting stock")
+    if errors:
+        failures.append(f"checkout errors, e.g. {errors[0]}")
+    if not rejected[0] and threads * attempts * 3 > stock:
+        failures.append("no checkout was rejected although demand exceeded stock")
+
+    print("-" * 60)
+    if failures:
+        for failure in failures:
+            print(f"✗ {failure}")
+        return 1
+    print("✓ No overselling under contention")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=20, help="checkouts per thread")
+    parser.add_argument("--stock", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Must be set before models.models builds its engine
+        os.environ.update({
+            "FOOD_DB_PATH": os.path.join(tmp, "contention.db"),
+            "FOOD_DB_IN_MEMORY": "0",
+            "ADMIN_EMAIL": "check-admin@example.com",
+            "ADMIN_PASSWORD": "Check#Pass1",
+            "CUSTOMER_EMAIL": "check-customer@example.com",
+            "CUSTOMER_PASSWORD": "Check#Pass1",
+            "OWNER_EMAIL": "check-owner@example.com",
+            "OWNER_PASSWORD": "Check#Pass1",
+        })
+        os.environ.pop("FOOD_DB_URL", None)
+        return run(args.threads, args.attempts, args.stock)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
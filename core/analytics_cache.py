@@ -0,0 +1,131 @@
+# core/analytics_cache.py
+"""Process-wide, single-flight cache for analytics snapshots.
+
+Dashboard reports (sales stats, fraud risk) are expensive and identical for
+every viewer, so they are computed once per process and shared across Flet
+sessions:
+
+* entries are keyed by ``(report, params)`` and stamped with the data
+  versions they depend on (``"orders"``, ``"users"``, ``"menu"``); writers call
+  ``bump_data_version`` after committing;
+* concurrent requests for a missing key wait for one computation
+  (single-flight) instead of each running it;
+* a stale entry (version changed, or older than ``max_age``) is returned
+  immediately while one background thread recomputes it.
+
+Snapshots are shared: callers must treat returned values as read-only.
+
+Environment variables:
+    FOOD_ANALYTICS_MAX_AGE_SECONDS  Refresh entries at least this often, to pick up
+                                    writes from other processes (default: 60).
+"""
+import os
+import threading
+import time
+
+
+class _Flight:
+    """One in-progress computation that other callers can wait on."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class AnalyticsCache:
+    def __init__(self, max_age_seconds=None):
+        self.max_age = float(max_age_seconds or os.getenv("FOOD_ANALYTICS_MAX_AGE_SECONDS") or 60)
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._entries = {}   # key -> (value, stamp, computed_at)
+        self._flights = {}   # key -> _Flight
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0}
+
+    # ---------- versions ----------
+    def bump(self, *kinds):
+        with self._lock:
+            for kind in kinds:
+                self._versions[kind] = self._versions.get(kind, 0) + 1
+
+    def _stamp(self, depends_on):
+        return tuple(self._versions.get(kind, 0) for kind in depends_on)
+
+    # ---------- lookups ----------
+    def get(self, report, params, compute, depends_on=(), allow_stale=True):
+        """Return the snapshot for (report, params), computing it at most once at a time.
+
+        With ``allow_stale=False`` (explicit refreshes, or right after the caller's own
+        write) a stale entry is not served: the caller waits for a current value.
+        """
+        key = (report, params)
+        while True:
+            with self._lock:
+                stamp = self._stamp(depends_on)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    value, entry_stamp, computed_at = entry
+                    if entry_stamp == stamp and time.monotonic() - computed_at < self.max_age:
+                        self.stats["hits"] += 1
+                        return value
+                    if allow_stale:
+                        # Serve the stale snapshot and let a single background thread refresh it
+                        self.stats["stale_hits"] += 1
+                        if key not in self._flights:
+                            flight = self._flights[key] = _Flight()
+                            threading.Thread(
+                                target=self._run, args=(key, flight, compute, depends_on),
+                                name=f"analytics-{report}", daemon=True,
+                            ).start()
+                        return value
+
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.stats["misses"] += 1
+                else:
+                    self.stats["coalesced"] += 1
+
+            if leader:
+                self._run(key, flight, compute, depends_on)
+                if flight.error is not None:
+                    raise flight.error
+                return flight.value
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # The computation we joined may predate a newer write: re-check its stamp
+
+    def _run(self, key, flight, compute, depends_on):
+        with self._lock:
+            # Stamp taken before computing: a write during the computation leaves the entry stale
+            stamp = self._stamp(depends_on)
+        try:
+            flight.value = compute()
+            with self._lock:
+                self._entries[key] = (flight.value, stamp, time.monotonic())
+                self.stats["refreshes"] += 1
+        except Exception as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+analytics_cache = AnalyticsCache()
+
+
+def bump_data_version(*kinds):
+    """Mark cached analytics that depend on ``kinds`` ("orders", "users", "menu") as stale."""
+    analytics_cache.bump(*kinds)
+
+
+def analytics_snapshot(report, params, compute, depends_on=(), allow_stale=True):
+    return analytics_cache.get(report, params, compute, depends_on, allow_stale=allow_stale)
@@ -0,0 +1,189 @@
+# core/audit.py
+"""Audit log pipeline.
+
+``AuditWriter.record`` writes an ``AuditLog`` entry in one of three ways:
+
+* with ``session=`` (buffered/transactional modes): the entry is added to
+  the caller's session and commits (or rolls back) together with the
+  business change, so no extra commit;
+* ``buffered`` mode (default): the entry goes into a bounded in-memory queue
+  that a background thread batch-inserts every ``flush_interval_ms`` or
+  ``batch_size`` entries, and on interpreter shutdown;
+* ``immediate`` mode: own transaction, after the caller's commit (the
+  pre-pipeline behaviour); entries of a rolled-back transaction are
+  discarded.
+
+``transactional`` mode joins the caller's session when one is given and
+otherwise commits immediately.
+
+Environment variables:
+    FOOD_AUDIT_MODE               buffered | transactional | immediate (default: buffered;
+                                  in-memory databases always use transactional)
+    FOOD_AUDIT_BATCH_SIZE         Max entries per background insert (default: 200).
+    FOOD_AUDIT_FLUSH_INTERVAL_MS  Max delay before a queued entry is written (default: 250).
+    FOOD_AUDIT_QUEUE_SIZE         Queue bound; when full, entries are written inline (default: 10000).
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session
+
+from models.models import AuditLog, engine
+
+
+AUDIT_MODES = ("buffered", "transactional", "immediate")
+
+
+class AuditWriter:
+    def __init__(self, bind, mode=None, batch_size=None, flush_interval_ms=None, max_queue=None):
+        mode = mode or os.getenv("FOOD_AUDIT_MODE") or "buffered"
+        if mode not in AUDIT_MODES:
+            raise ValueError(f"Unknown FOOD_AUDIT_MODE '{mode}'. Expected one of: {', '.join(AUDIT_MODES)}")
+        if mode == "buffered" and bind.url.get_backend_name() == "sqlite" and bind.url.database in (None, "", ":memory:"):
+            # The in-memory database lives on one shared connection; keep writes on the caller's thread
+            mode = "transactional"
+
+        self.bind = bind
+        self.mode = mode
+        self.batch_size = int(batch_size or os.getenv("FOOD_AUDIT_BATCH_SIZE") or 200)
+        self.flush_interval = int(flush_interval_ms or os.getenv("FOOD_AUDIT_FLUSH_INTERVAL_MS") or 250) / 1000.0
+        self._queue = queue.Queue(maxsize=int(max_queue or os.getenv("FOOD_AUDIT_QUEUE_SIZE") or 10000))
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    # ---------- writing ----------
+    def record(self, user_id, action, details="", session=None):
+        entry = {"user_id": user_id, "action": action, "details": details, "timestamp": datetime.now()}
+
+        if session is not None:
+            if self.mode == "immediate":
+                # Own transaction, but only once the caller's has released the write lock
+                self._defer_until_commit(session, entry)
+            else:
+                session.add(AuditLog(**entry))
+            return
+
+        if self.mode == "buffered" and not self._stopping.is_set():
+            self._ensure_thread()
+            try:
+                self._queue.put_nowait(entry)
+                return
+            except queue.Full:
+                pass  # Back-pressure: write inline rather than drop the entry
+
+        self._insert([entry])
+
+    def _defer_until_commit(self, session, entry):
+        """Queue ``entry`` on the session's current transaction.
+
+        Sessions are thread-local and reused, so the entries live in
+        ``session.info`` and the listeners stay attached: a commit writes the
+        pending entries, a rollback (or close without commit) discards them.
+        """
+        if isinstance(session, scoped_session):
+            session = session()  # listeners on the registry would apply to every session
+        pending = session.info.setdefault("pending_audit_entries", [])
+        pending.append(entry)
+        if session.info.get("pending_audit_hooked"):
+            return
+        session.info["pending_audit_hooked"] = True
+
+        def after_commit(committed):
+            entries = committed.info.pop("pending_audit_entries", None)
+            if entries:
+                self._insert(entries)
+
+        def after_transaction_end(ended, transaction):
+            # Runs after after_commit; anything still pending was rolled back or closed
+            if transaction.parent is None:
+                ended.info.pop("pending_audit_entries", None)
+
+        event.listen(session, "after_commit", after_commit)
+        event.listen(session, "after_transaction_end", after_transaction_end)
+
+    def _insert(self, entries):
+        with self.bind.begin() as conn:
+            conn.execute(AuditLog.__table__.insert(), entries)
+
+    # ---------- background flushing ----------
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                self._thread.start()
+
+    def _drain(self, first=None, wait=True):
+        """Collect up to batch_size entries, waiting at most flush_interval for more."""
+        batch = [first] if first is not None else []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if wait and timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        try:
+            self._insert(batch)
+        except Exception as e:
+            # Retry entry by entry so one bad row does not lose the whole batch
+            print(f"⚠️ Audit batch insert failed ({e}); retrying individually")
+            for entry in batch:
+                try:
+                    self._insert([entry])
+                except Exception as inner:
+                    print(f"⚠️ Dropped audit entry {entry['action']}: {inner}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._write_batch(self._drain(first))
+
+    def flush(self):
+        """Write every queued entry now and wait for any batch already in flight."""
+        while True:
+            batch = self._drain(wait=False)
+            if not batch:
+                break
+            self._write_batch(batch)
+        self._queue.join()
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def shutdown(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+audit_writer = AuditWriter(engine)
+atexit.register(audit_writer.shutdown)
+
+
+def record_audit(user_id, action, details="", session=None):
+    audit_writer.record(user_id, action, details, session=session)
+
+
+def flush_audit_log():
+    audit_writer.flush()
@@ -0,0 +1,230 @@
+# core/audit_archive.py
+"""Audit log retention.
+
+``archive_audit_logs`` moves ``audit_logs`` rows older than the retention
+window into append-only, gzip-compressed JSON-lines segments, one per day
+(``audit-YYYY-MM-DD.jsonl.gz``), and deletes them from the live table.
+``index.json`` in the archive directory records, per day, the row count,
+id/timestamp range and per-action counts so queries can skip segments
+without opening them.
+
+``query_audit_history`` merges the live table with the archived segments
+for admin history views.
+
+Environment variables:
+    FOOD_AUDIT_ARCHIVE_DIR       Segment directory (default: audit_archive).
+    FOOD_AUDIT_RETENTION_DAYS    Days kept in the live table (default: 90).
+"""
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from models.models import AuditLog, ReadSession, engine
+from core.audit import flush_audit_log
+
+
+DEFAULT_ARCHIVE_DIR = "audit_archive"
+DEFAULT_RETENTION_DAYS = 90
+INDEX_FILE = "index.json"
+
+_archive_lock = threading.Lock()
+
+
+def get_archive_dir(archive_dir=None):
+    return archive_dir or os.getenv("FOOD_AUDIT_ARCHIVE_DIR") or DEFAULT_ARCHIVE_DIR
+
+
+def get_retention_days(retention_days=None):
+    if retention_days is not None:
+        return int(retention_days)
+    return int(os.getenv("FOOD_AUDIT_RETENTION_DAYS") or DEFAULT_RETENTION_DAYS)
+
+
+def _segment_name(day):
+    return f"audit-{day}.jsonl.gz"
+
+
+def load_index(archive_dir=None):
+    path = os.path.join(get_archive_dir(archive_dir), INDEX_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"segments": {}}
+
+
+def _save_index(archive_dir, index):
+    path = os.path.join(archive_dir, INDEX_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _row_to_entry(row):
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "action": row.action,
+        "details": row.details,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+    }
+
+
+def _append_segment(archive_dir, day, entries, index):
+    """Append entries to the day's segment (a new gzip member) and update its index entry."""
+    path = os.path.join(archive_dir, _segment_name(day))
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    with open(path, "rb") as f:
+        os.fsync(f.fileno())
+
+    segment = index["segments"].setdefault(day, {
+        "file": _segment_name(day),
+        "count": 0,
+        "min_id": None,
+        "max_id": None,
+        "first": None,
+        "last": None,
+        "actions": {},
+    })
+    ids = [entry["id"] for entry in entries]
+    stamps = [entry["timestamp"] for entry in entries if entry["timestamp"]]
+    segment["count"] += len(entries)
+    segment["min_id"] = min(ids + ([segment["min_id"]] if segment["min_id"] is not None else []))
+    segment["max_id"] = max(ids + ([segment["max_id"]] if segment["max_id"] is not None else []))
+    if stamps:
+        segment["first"] = min(stamps + ([segment["first"]] if segment["first"] else []))
+        segment["last"] = max(stamps + ([segment["last"]] if segment["last"] else []))
+    for entry in entries:
+        segment["actions"][entry["action"]] = segment["actions"].get(entry["action"], 0) + 1
+
+
+def archive_audit_logs(retention_days=None, archive_dir=None, now=None, batch_size=5000):
+    """Move audit rows older than the retention window into day segments.
+
+    Rows are deleted only after their segment and the index are on disk. If
+    the process dies in between, the next run archives those rows again;
+    readers de-duplicate by id. Returns the number of rows archived.
+    """
+    archive_dir = get_archive_dir(archive_dir)
+    cutoff = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0) \
+        - timedelta(days=get_retention_days(retention_days))
+
+    flush_audit_log()
+    os.makedirs(archive_dir, exist_ok=True)
+    table = AuditLog.__table__
+    archived = 0
+
+    with _archive_lock:
+        index = load_index(archive_dir)
+        while True:
+            with engine.begin() as conn:
+                rows = conn.execute(
+                    select(table)
+                    .where(table.c.timestamp < cutoff)
+                    .order_by(table.c.timestamp, table.c.id)
+                    .limit(batch_size)
+                ).fetchall()
+                if not rows:
+                    break
+
+                by_day = {}
+                for row in rows:
+                    by_day.setdefault(row.timestamp.date().isoformat(), []).append(_row_to_entry(row))
+                for day, entries in sorted(by_day.items()):
+                    _append_segment(archive_dir, day, entries, index)
+                _save_index(archive_dir, index)
+
+                ids = [row.id for row in rows]
+                for start in range(0, len(ids), 500):
+                    conn.execute(table.delete().where(table.c.id.in_(ids[start:start + 500])))
+            archived += len(rows)
+
+    return archived
+
+
+def _read_segment(archive_dir, segment):
+    path = os.path.join(archive_dir, segment["file"])
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    except FileNotFoundError:
+        return
+
+
+def _matches(entry, since, until, actions, user_id):
+    if actions and entry.get("action") not in actions:
+        return False
+    if user_id is not None and entry.get("user_id") != user_id:
+        return False
+    stamp = entry.get("timestamp") or ""
+    if since is not None and stamp < since.isoformat():
+        return False
+    if until is not None and stamp >= until.isoformat():
+        return False
+    return True
+
+
+def query_audit_history(since=None, until=None, action=None, user_id=None, limit=100, archive_dir=None):
+    """Newest-first audit entries from the live table and archived segments.
+
+    ``action`` may be a single action name or a collection of them. Archived
+    segments are only opened when the live table cannot fill ``limit`` and the
+    index says the day is in range and contains a matching action.
+    """
+    actions = {action} if isinstance(action, str) else set(action or [])
+    flush_audit_log()
+
+    session = ReadSession()
+    try:
+        query = session.query(AuditLog)
+        if actions:
+            query = query.filter(AuditLog.action.in_(actions))
+        if user_id is not None:
+            query = query.filter(AuditLog.user_id == user_id)
+        if since is not None:
+            query = query.filter(AuditLog.timestamp >= since)
+        if until is not None:
+            query = query.filter(AuditLog.timestamp < until)
+        entries = [log.to_dict() for log in query.order_by(AuditLog.timestamp.desc()).limit(limit).all()]
+    finally:
+        session.close()
+
+    if len(entries) >= limit:
+        return entries
+
+    archive_dir = get_archive_dir(archive_dir)
+    seen = {entry["id"] for entry in entries}
+    since_day = since.date().isoformat() if since is not None else None
+    until_day = until.date().isoformat() if until is not None else None
+
+    # Newest day first; stop once enough older entries have been collected
+    for day, segment in sorted(load_index(archive_dir).get("segments", {}).items(), reverse=True):
+        if since_day and day < since_day:
+            break
+        if until_day and day > until_day:
+            continue
+        if actions and not actions.intersection(segment.get("actions", {})):
+            continue
+        day_entries = []
+        for entry in _read_segment(archive_dir, segment):
+            if entry.get("id") in seen or not _matches(entry, since, until, actions, user_id):
+                continue
+            seen.add(entry.get("id"))
+            day_entries.append(entry)
+        entries.extend(sorted(day_entries, key=lambda entry: entry.get("timestamp") or "", reverse=True))
+        if len(entries) >= limit:
+            break
+
+    entries.sort(key=lambda entry: entry.get("timestamp") or "", reverse=True)
+    return entries[:limit]
@@ -1,14 +1,17 @@
 # core/auth.py (Refactored with SQLAlchemy)
 import bcrypt
 from datetime import datetime, timedelta
-from models.models import Session, User, PendingSignup
+from models.models import Session, ReadSession, read_engine, fold_search_text, User, PendingSignup
+from .projections import UserRow, UserRowWithPicture, USER_SELECT, USER_WITH_PICTURE_SELECT, fetch_rows
 from .database import log_action
+from .analytics_cache import bump_data_version
+from .read_cache import cached_read, invalidate_reads
 from .email_sender import get_email_sender
 from .auth_login import authenticate_user_impl
 import hashlib
 import secrets
 import math
-from sqlalchemy import func
+from sqlalchemy import func, or_, select
 
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_DURATION_MINUTES = 1
@@ -231,6 +234,8 @@ def register_user(email: str, password: str, full_name: str, role: str = "custom
         )
         session.add(user)
         session.commit()
+        bump_data_version("users")
+        invalidate_reads(("user", user.id))
 
         log_action(user.id, "USER_REGISTERED", f"New user registered: {email}")
         return True, "User registered successfully"
@@ -243,6 +248,11 @@ def register_user(email: str, password: str, full_name: str, role: str = "custom
 
 # ========== USER MANAGEMENT ==========
 def get_user_by_id(user_id: int):
+    """User dict by id, served from core.read_cache (treat as read-only)."""
+    return cached_read("user_by_id", user_id, lambda: _load_user_by_id(user_id), depends_on=(("user", user_id),))
+
+
+def _load_user_by_id(user_id: int):
     session = Session()
     try:
         user = session.query(User).filter_by(id=user_id).first()
@@ -252,7 +262,7 @@ def get_user_by_id(user_id: int):
 
 
 def get_all_users():
-    session = Session()
+    session = ReadSession()
     try:
         users = session.query(User).order_by(User.created_at.desc()).all()
         return [user.to_dict() for user in users]
@@ -260,6 +270,77 @@ def get_all_users():
         session.close()
 
 
+def list_users(include_picture=False, user_ids=None):
+    """All users, newest first, as projected UserRow tuples (no password/token hashes).
+
+    profile_picture/pic_type are only selected when ``include_picture``;
+    ``user_ids`` keeps only those ids.
+    """
+    statement = (USER_WITH_PICTURE_SELECT if include_picture else USER_SELECT)\
+        .order_by(User.__table__.c.created_at.desc())
+    if user_ids is not None:
+        statement = statement.where(User.__table__.c.id.in_(list(user_ids)))
+    with read_engine.connect() as conn:
+        return fetch_rows(conn, statement, UserRowWithPicture if include_picture else UserRow)
+
+
+USER_PAGE_SIZE = 50
+
+
+def _prefix_range(column, prefix):
+    """``column`` starts with ``prefix``, as a range an index on ``column`` can seek."""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (column >= prefix) & (column < upper)
+
+
+def search_users(role=None, status=None, query=None, limit=USER_PAGE_SIZE, cursor=None):
+    """One page of the admin user directory, newest (highest id) first, filtered in SQL.
+
+    ``role`` is a role name or "all"; ``status`` is "all", "active",
+    "disabled" or "locked" (``locked_until`` in the future). ``query``
+    matches the start of the full name or email, compared in folded form
+    (see ``fold_search_text``). Rows are projected UserRow tuples without
+    profile pictures. ``cursor`` is the ``next_cursor`` of the
+    previous page. Returns ``{"total", "users", "next_cursor"}``; ``total`` is
+    only counted for the first page (``None`` when a cursor is given).
+    """
+    table = User.__table__
+    conditions = []
+    if role and role != "all":
+        conditions.append(table.c.role == role)
+    if status == "active":
+        conditions.append(table.c.is_active == 1)
+    elif status == "disabled":
+        conditions.append(table.c.is_active == 0)
+    elif status == "locked":
+        conditions.append(table.c.locked_until > datetime.now())
+
+    query = fold_search_text(query)
+    if query:
+        conditions.append(or_(
+            _prefix_range(table.c.search_name, query),
+            _prefix_range(table.c.search_email, query),
+        ))
+
+    statement = USER_SELECT.where(*conditions)
+    with read_engine.connect() as conn:
+        total = None
+        if not cursor:
+            total = conn.execute(select(func.count()).select_from(table).where(*conditions)).scalar()
+        else:
+            statement = statement.where(table.c.id < cursor)
+        statement = statement.order_by(table.c.id.desc()).limit(limit + 1)
+        rows = fetch_rows(conn, statement, UserRow)
+
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "total": total,
+        "users": rows,
+        "next_cursor": rows[-1].id if has_next else None,
+    }
+
+
 def create_user_by_admin(email: str, password: str, full_name: str, role: str, admin_id: int):
     session = Session()
     try:
@@ -279,6 +360,8 @@ def create_user_by_admin(email: str, password: str, full_name: str, role: str, a
         )
         session.add(user)
         session.commit()
+        bump_data_version("users")
+        invalidate_reads(("user", user.id))
         
         log_action(admin_id, "USER_CREATED", f"Admin created user: {email} (role: {role})")
         return True, f"User {email} created successfully"
@@ -305,6 +388,8 @@ def delete_user(user_id: int, admin_id: int):
         user_email = user.email
         session.delete(user)
         session.commit()
+        bump_data_version("users")
+        invalidate_reads(("user", user_id), ("favorites", user_id))
         
         log_action(admin_id, "USER_DELETED", f"Admin deleted user: {user_email}")
         return True, f"User {user_email} deleted successfully"
@@ -324,6 +409,8 @@ def disable_user(user_id: int, admin_id: int):
             user.failed_login_attempts = 0
             user.locked_until = None
             session.commit()
+            bump_data_version("users")
+            invalidate_reads(("user", user_id))
             log_action(admin_id, "USER_DISABLED", f"Admin disabled user ID: {user_id}")
     finally:
         session.close()
@@ -336,6 +423,8 @@ def enable_user(user_id: int, admin_id: int):
         if user:
             user.is_active = 1
             session.commit()
+            bump_data_version("users")
+            invalidate_reads(("user", user_id))
             log_action(admin_id, "USER_ENABLED", f"Admin enabled user ID: {user_id}")
     finally:
         session.close()
@@ -378,6 +467,8 @@ def update_user_profile(caller_id: int, user_id: int, new_name, new_email, addre
             user.pic_type = pic_type
         
         session.commit()
+        bump_data_version("users")
+        invalidate_reads(("user", user_id))
         log_action(user_id, "PROFILE_UPDATED", "User updated profile")
         return True, "Profile updated!"
     except Exception as e:
@@ -400,6 +491,7 @@ def change_password(user_id: int, old_password: str, new_password: str):
         
         user.password = hash_password(new_password)
         session.commit()
+        invalidate_reads(("user", user.id))
         
         log_action(user_id, "PASSWORD_CHANGED", "User changed password")
         return True, "Password changed successfully!"
@@ -515,6 +607,7 @@ def reset_password_with_code(email: str, code: str, new_password: str):
         user.failed_login_attempts = 0
         user.locked_until = None
         session.commit()
+        invalidate_reads(("user", user.id))
 
         log_action(user.id, "PASSWORD_RESET", "User reset password using OTP")
         return True, "Password reset successful. You can now log in."
@@ -554,6 +647,8 @@ def verify_signup_code(email: str, code: str):
             session.add(user)
             session.delete(pending)
             session.commit()
+            bump_data_version("users")
+            invalidate_reads(("user", user.id))
 
             log_action(user.id, "EMAIL_VERIFIED", f"Email verified and account created: {email}")
             return True, "Email verified successfully."
@@ -579,6 +674,7 @@ def verify_signup_code(email: str, code: str):
         user.verification_token_expires_at = None
         user.verification_sent_at = None
         session.commit()
+        invalidate_reads(("user", user.id))
 
         log_action(user.id, "EMAIL_VERIFIED", f"Email verified: {email}")
         return True, "Email verified successfully."
@@ -4,6 +4,7 @@ from sqlalchemy import func
 
 from models.models import Session, User
 from .database import log_action
+from .read_cache import invalidate_reads
 
 
 def authenticate_user_impl(
@@ -43,6 +44,7 @@ def authenticate_user_impl(
                 user.locked_until = None
                 user.failed_login_attempts = 0
                 session.commit()
+                invalidate_reads(("user", user.id))
             else:
                 return {"locked": True, "locked_until": user.locked_until.isoformat()}
 
@@ -53,13 +55,15 @@ def authenticate_user_impl(
                 locked_until_dt = datetime.now() + timedelta(minutes=lockout_duration_minutes)
                 user.failed_login_attempts = new_attempts
                 user.locked_until = locked_until_dt
+                log_action(user.id, "ACCOUNT_LOCKED", f"Locked after {new_attempts} fails", session=session)
                 session.commit()
-                log_action(user.id, "ACCOUNT_LOCKED", f"Locked after {new_attempts} fails")
+                invalidate_reads(("user", user.id))
                 return {"locked": True, "locked_until": locked_until_dt.isoformat()}
 
             user.failed_login_attempts = new_attempts
+            log_action(user.id, "LOGIN_FAILED", f"Wrong password (attempt {new_attempts})", session=session)
             session.commit()
-            log_action(user.id, "LOGIN_FAILED", f"Wrong password (attempt {new_attempts})")
+            invalidate_reads(("user", user.id))
             return None
 
         if getattr(user, "email_verified", 1) == 0:
@@ -68,9 +72,9 @@ def authenticate_user_impl(
         user.failed_login_attempts = 0
         user.locked_until = None
         user.last_login = datetime.now()
+        log_action(user.id, "LOGIN_SUCCESS", f"Successful login: {normalized_email}", session=session)
         session.commit()
-
-        log_action(user.id, "LOGIN_SUCCESS", f"Successful login: {normalized_email}")
+        invalidate_reads(("user", user.id))
         return user.to_dict()
     finally:
         session.close()
@@ -0,0 +1,260 @@
+# core/columnar.py
+"""Columnar (NumPy) snapshots of orders for vectorized analytics.
+
+Instead of looping over order dicts and parsing timestamps/amounts per row,
+the analytics load one array per column straight from SQL:
+
+* ``OrderColumns``: id, customer_id, created (epoch seconds of the naive local
+  timestamp, -1 when missing), status (code in ``STATUS_CODES``, -1 unknown),
+  total;
+* ``ItemColumns``: one row per order line of a non-cancelled order: day,
+  menu_item_id, quantity, revenue.
+
+Grouping and binning then run as ``np.bincount`` / ``np.unique`` over those
+arrays. Snapshots can be saved as ``.npy`` files and reopened memory-mapped.
+
+NumPy is optional: when it is not installed ``HAS_NUMPY`` is False and callers
+keep their row-based code path.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import Integer, case, cast, func, select
+
+from models.models import read_engine, Order, OrderItem
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, see HAS_NUMPY
+    np = None
+
+HAS_NUMPY = np is not None
+
+STATUS_CODES = ("placed", "preparing", "out for delivery", "delivered", "cancelled")
+PLACED, PREPARING, OUT_FOR_DELIVERY, DELIVERED, CANCELLED = range(len(STATUS_CODES))
+ACTIVE_STATUSES = (PLACED, PREPARING, OUT_FOR_DELIVERY)
+
+SECONDS_PER_DAY = 86400
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = _EPOCH.date()
+
+
+def epoch_seconds(dt):
+    """Seconds since 1970-01-01 of a naive local datetime (same scale as ``created``)."""
+    return int((dt - _EPOCH).total_seconds())
+
+
+def epoch_day(day):
+    """Day number of a ``date`` on the scale of ``OrderColumns.day``."""
+    return (day - _EPOCH_DATE).days
+
+
+def from_epoch_seconds(seconds):
+    return _EPOCH + timedelta(seconds=int(seconds))
+
+
+def _status_code(column):
+    return case(
+        {name: code for code, name in enumerate(STATUS_CODES)},
+        value=func.lower(func.trim(column)),
+        else_=-1,
+    )
+
+
+def _epoch_expression(column):
+    # strftime('%s') reads the stored naive timestamp as-is, matching epoch_seconds()
+    return cast(func.strftime('%s', column), Integer)
+
+
+_ORDER_COLUMNS_SELECT = select(
+    Order.id,
+    func.coalesce(Order.customer_id, 0),
+    func.coalesce(_epoch_expression(func.coalesce(Order.created_at, Order.placed_at)), -1),
+    _status_code(Order.status),
+    func.coalesce(Order.total_amount, 0.0),
+)
+
+_ITEM_COLUMNS_SELECT = select(
+    func.coalesce(_epoch_expression(Order.created_at), 0) // SECONDS_PER_DAY,
+    OrderItem.menu_item_id,
+    OrderItem.quantity,
+    OrderItem.quantity * OrderItem.unit_price,
+).join(Order, Order.id == OrderItem.order_id)\
+    .where(OrderItem.menu_item_id.isnot(None))\
+    .where(Order.status != "cancelled")
+
+
+class _Columns:
+    FIELDS = ()
+
+    def __init__(self, **arrays):
+        for name, _ in self.FIELDS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(getattr(self, self.FIELDS[0][0]))
+
+    @classmethod
+    def _from_rows(cls, rows):
+        dtype = np.dtype(list(cls.FIELDS))
+        table = np.fromiter((tuple(row) for row in rows), dtype=dtype)
+        return cls(**{name: np.ascontiguousarray(table[name]) for name, _ in cls.FIELDS})
+
+    def save(self, directory):
+        """Write one ``<field>.npy`` file per column into ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        for name, _ in self.FIELDS:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Reopen a snapshot written by ``save`` (memory-mapped, read-only, by default)."""
+        mode = "r" if mmap else None
+        return cls(**{
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode)
+            for name, _ in cls.FIELDS
+        })
+
+
+class OrderColumns(_Columns):
+    FIELDS = (
+        ("id", "i8"),
+        ("customer_id", "i8"),
+        ("created", "i8"),
+        ("status", "i1"),
+        ("total", "f8"),
+    )
+
+    @property
+    def day(self):
+        return self.created // SECONDS_PER_DAY
+
+
+class ItemColumns(_Columns):
+    FIELDS = (
+        ("day", "i8"),
+        ("menu_item_id", "i8"),
+        ("quantity", "i8"),
+        ("revenue", "f8"),
+    )
+
+
+def load_order_columns(since=None, conn=None):
+    """Columnar snapshot of orders created at or after ``since`` (datetime), or all orders."""
+    stmt = _ORDER_COLUMNS_SELECT
+    if since is not None:
+        stmt = stmt.where(Order.created_at >= since)
+    if conn is not None:
+        return OrderColumns._from_rows(conn.execute(stmt))
+    with read_engine.connect() as conn:
+        return OrderColumns._from_rows(conn.execute(stmt))
+
+
+def load_item_columns(since=None, conn=None):
+    """Columnar snapshot of line items of non-cancelled orders created at or after ``since``."""
+    stmt = _ITEM_COLUMNS_SELECT
+    if since is not None:
+        stmt = stmt.where(Order.created_at >= since)
+    if conn is not None:
+        return ItemColumns._from_rows(conn.execute(stmt))
+    with read_engine.connect() as conn:
+        return ItemColumns._from_rows(conn.execute(stmt))
+
+
+# ---------- vectorized reports ----------
+def _day_window(days_column, first_day, days):
+    offset = days_column - epoch_day(first_day)
+    mask = (offset >= 0) & (offset < days)
+    return offset, mask
+
+
+def period_revenue(orders, since, until):
+    """Revenue and order count of non-cancelled orders with ``since <= day <= until`` (dates)."""
+    day = orders.day
+    mask = (orders.created >= 0) & (day >= epoch_day(since)) & (day <= epoch_day(until)) \
+        & (orders.status != CANCELLED)
+    return float(orders.total[mask].sum()), int(mask.sum())
+
+
+def daily_totals(orders, first_day, days):
+    """Per-day arrays (length ``days`` from ``first_day``) of order counts and revenue.
+
+    Returns a dict with ``orders``, ``revenue`` (both excluding cancelled orders),
+    ``delivered`` and ``cancelled`` counts.
+    """
+    offset, mask = _day_window(orders.day, first_day, days)
+    mask &= orders.created >= 0
+    offset = offset[mask]
+    status = orders.status[mask]
+    kept = status != CANCELLED
+    return {
+        "orders": np.bincount(offset[kept], minlength=days),
+        "revenue": np.bincount(offset[kept], weights=orders.total[mask][kept], minlength=days),
+        "delivered": np.bincount(offset[status == DELIVERED], minlength=days),
+        "cancelled": np.bincount(offset[status == CANCELLED], minlength=days),
+    }
+
+
+def top_items(items, since, until, limit=5, by="quantity"):
+    """``[(menu_item_id, quantity, revenue)]`` of the best sellers in ``since..until`` (dates)."""
+    mask = (items.day >= epoch_day(since)) & (items.day <= epoch_day(until))
+    item_ids, inverse = np.unique(items.menu_item_id[mask], return_inverse=True)
+    quantity = np.bincount(inverse, weights=items.quantity[mask], minlength=len(item_ids))
+    revenue = np.bincount(inverse, weights=items.revenue[mask], minlength=len(item_ids))
+    primary, secondary = (quantity, revenue) if by == "quantity" else (revenue, quantity)
+    order = np.lexsort((secondary, primary))[::-1][:limit]
+    return [(int(item_ids[i]), int(quantity[i]), float(revenue[i])) for i in order]
+
+
+def customer_order_stats(orders, now, exclude_order_ids=()):
+    """Per-customer order and cancellation counts, vectorized.
+
+    Cancellations of orders in ``exclude_order_ids`` are not counted. Returns a
+    dict of equal-length arrays: ``customer_id``, ``orders``, ``cancelled``,
+    ``cancelled_7d``, ``cancelled_24h``, ``active`` and ``latest`` (epoch
+    seconds, -1 when unknown).
+    """
+    customer_ids, inverse = np.unique(orders.customer_id, return_inverse=True)
+    groups = len(customer_ids)
+    created = orders.created
+    now_seconds = epoch_seconds(now)
+
+    cancelled = orders.status == CANCELLED
+    if len(exclude_order_ids):
+        cancelled &= ~np.isin(orders.id, np.fromiter(exclude_order_ids, dtype="i8"))
+    dated = created >= 0
+    cancelled_7d = cancelled & dated & (created >= now_seconds - 7 * SECONDS_PER_DAY)
+    cancelled_24h = cancelled & dated & (created >= now_seconds - SECONDS_PER_DAY)
+
+    latest = np.full(groups, -1, dtype="i8")
+    np.maximum.at(latest, inverse, created)
+
+    return {
+        "customer_id": customer_ids,
+        "orders": np.bincount(inverse, minlength=groups),
+        "cancelled": np.bincount(inverse, weights=cancelled, minlength=groups).astype("i8"),
+        "cancelled_7d": np.bincount(inverse, weights=cancelled_7d, minlength=groups).astype("i8"),
+        "cancelled_24h": np.bincount(inverse, weights=cancelled_24h, minlength=groups).astype("i8"),
+        "active": np.bincount(inverse, weights=np.isin(orders.status, ACTIVE_STATUSES), minlength=groups).astype("i8"),
+        "latest": latest,
+    }
+
+
+def daily_customer_counts(orders, first_day, days):
+    """Orders and cancellations per (day, customer) in the ``days`` window from ``first_day``.
+
+    Returns ``(day_offset, orders, cancelled)`` arrays, one entry per
+    customer with orders on that day.
+    """
+    offset, mask = _day_window(orders.day, first_day, days)
+    mask &= orders.created >= 0
+    offset = offset[mask]
+    customer = orders.customer_id[mask]
+    cancelled = orders.status[mask] == CANCELLED
+
+    stride = int(customer.max()) + 1 if len(customer) else 1
+    keys, inverse = np.unique(offset * stride + customer, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(keys))
+    cancels = np.bincount(inverse, weights=cancelled, minlength=len(keys)).astype("i8")
+    return keys // stride, counts, cancels
+
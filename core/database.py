@@ -1,7 +1,27 @@
 # core/database.py (Refactored with SQLAlchemy)
 import json
-from sqlalchemy import or_
-from models.models import Session, MenuItem, Order, AuditLog, Favorite, init_database as init_db
+import re
+from sqlalchemy import or_, func, tuple_, text, update, select, case, cast, String
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from models.models import (
+    Session, ReadSession, engine, read_engine, User, MenuItem, Order, OrderItem, MenuItemSales,
+    DailySales, DailyItemSales, OrderStatusEvent, AuditLog, Favorite,
+    init_database as init_db,
+)
+from models.migrations import (
+    rebuild_menu_item_sales as _rebuild_menu_item_sales,
+    rebuild_daily_sales as _rebuild_daily_sales,
+)
+from core.audit import record_audit, flush_audit_log
+from core.audit_archive import query_audit_history
+from core.analytics_cache import bump_data_version
+from core.read_cache import cached_read, invalidate_reads
+from core.menu_facets import category_facets, get_category_facets
+from core.projections import (
+    OrderRow, OrderRowWithItems, MenuItemRow, MenuItemRowFull,
+    ORDER_SELECT, ORDER_WITH_ITEMS_SELECT, MENU_ITEM_SELECT, MENU_ITEM_FULL_SELECT,
+    fetch_rows,
+)
 
 
 def init_database():
@@ -10,18 +30,18 @@ def init_database():
 
 
 # ========== AUDIT LOGGING ==========
-def log_action(user_id, action, details=""):
-    session = Session()
-    try:
-        audit = AuditLog(user_id=user_id, action=action, details=details)
-        session.add(audit)
-        session.commit()
-    finally:
-        session.close()
+def log_action(user_id, action, details="", session=None):
+    """Record an audit entry.
+
+    Pass the caller's ``session`` to commit the entry with the change it
+    describes; otherwise it is buffered and batch-written (see core.audit).
+    """
+    record_audit(user_id, action, details, session=session)
 
 
 def get_audit_logs(limit=100):
-    session = Session()
+    flush_audit_log()
+    session = ReadSession()
     try:
         logs = session.query(AuditLog).order_by(AuditLog.timestamp.desc()).limit(limit).all()
         return [log.to_dict() for log in logs]
@@ -29,10 +49,38 @@ def get_audit_logs(limit=100):
         session.close()
 
 
+def get_audit_history(since=None, until=None, action=None, user_id=None, limit=100):
+    """Audit entries from the live table plus archived day segments (see core.audit_archive)."""
+    return query_audit_history(since=since, until=until, action=action, user_id=user_id, limit=limit)
+
+
 # ========== MENU OPERATIONS ==========
+# Catalog reads are served from core.read_cache and depend on "menu" (catalog
+# rows) only. Stock changes with every order, so cached listings get their stock
+# from a separate id -> stock map that orders invalidate ("stock"), instead of
+# every checkout evicting every listing page. Categories come from core.menu_facets.
+def _load_menu_stock():
+    with read_engine.connect() as conn:
+        return dict(conn.execute(select(MenuItem.id, MenuItem.stock).where(MenuItem.is_available == 1)).all())
+
+
+def _with_live_stock(items):
+    """Copies of cached menu item dicts carrying the current stock."""
+    stock = cached_read("menu_stock", (), _load_menu_stock, depends_on=("menu", "stock"))
+    return [dict(item, stock=stock.get(item["id"], item.get("stock"))) for item in items]
+
+
+def _with_live_stock_page(result):
+    return dict(result, items=_with_live_stock(result["items"]))
+
+
 def get_all_menu_items():
-    """Return all available menu items (legacy helper)."""
-    session = Session()
+    """Return all available menu items (legacy helper), from the read cache."""
+    return _with_live_stock(cached_read("all_menu_items", (), _load_all_menu_items, depends_on=("menu",)))
+
+
+def _load_all_menu_items():
+    session = ReadSession()
     try:
         items = session.query(MenuItem).filter_by(is_available=1).order_by(MenuItem.category, MenuItem.name).all()
         return [item.to_dict() for item in items]
@@ -40,20 +88,115 @@ def get_all_menu_items():
         session.close()
 
 
-def get_menu_items_page(category=None, search=None, limit=10, offset=0):
-    """Server-side pagination with optional category and search filters."""
-    session = Session()
-    try:
-        query = session.query(MenuItem).filter_by(is_available=1)
+def list_menu_items(category=None, include_heavy=False):
+    """Available menu items as projected MenuItemRow tuples.
+
+    image/image_type/ingredients/recipe are only selected when ``include_heavy``.
+    """
+    table = MenuItem.__table__
+    statement = (MENU_ITEM_FULL_SELECT if include_heavy else MENU_ITEM_SELECT).where(table.c.is_available == 1)
+    if category and category != "All":
+        statement = statement.where(table.c.category == category)
+    statement = statement.order_by(table.c.category, table.c.name)
+    with read_engine.connect() as conn:
+        return fetch_rows(conn, statement, MenuItemRowFull if include_heavy else MenuItemRow)
+
+
+def _bump_menu_version():
+    invalidate_reads("menu")
+    bump_data_version("menu")
+
 
-        if category and category != "All":
-            query = query.filter(MenuItem.category == category)
+# BM25 column weights for menu_items_fts(name, description, ingredients, category)
+MENU_SEARCH_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+_menu_search_index = {"available": None}
 
-        if search:
+
+def _has_menu_search_index(session):
+    if _menu_search_index["available"] is None:
+        found = session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='menu_items_fts'")
+        ).first()
+        _menu_search_index["available"] = found is not None
+    return _menu_search_index["available"]
+
+
+def _menu_match_expression(search):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    tokens = re.findall(r"\w+", search or "")
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _filtered_menu_query(session, category=None, search=None):
+    query = session.query(MenuItem).filter_by(is_available=1)
+    if category and category != "All":
+        query = query.filter(MenuItem.category == category)
+    if search:
+        if _has_menu_search_index(session):
+            query = query.filter(text(
+                "menu_items.id IN (SELECT rowid FROM menu_items_fts WHERE menu_items_fts MATCH :match)"
+            ).bindparams(match=_menu_match_expression(search) or '""'))
+        else:
             like = f"%{search}%"
             query = query.filter(or_(MenuItem.name.ilike(like), MenuItem.description.ilike(like)))
+    return query
+
+
+def _cached_menu_count(session, category=None, search=None):
+    return cached_read(
+        "menu_count", (category or "All", search or ""),
+        lambda: _filtered_menu_query(session, category, search).order_by(None).count(),
+        depends_on=("menu",),
+    )
+
+
+def search_menu_items(search, category=None, limit=10, offset=0):
+    """Full-text menu search ranked by BM25 (name > description > ingredients > category).
+
+    Each word is matched as a prefix, so "chick ado" finds "Chicken Adobo".
+    Falls back to unranked LIKE matching if the FTS5 index is unavailable.
+    """
+    session = Session()
+    try:
+        total = _cached_menu_count(session, category, search)
+        match = _menu_match_expression(search)
+        if not match or not _has_menu_search_index(session):
+            items = _filtered_menu_query(session, category, search)\
+                .order_by(MenuItem.category, MenuItem.name).limit(limit).offset(offset).all()
+            return {"total": total, "items": [item.to_dict() for item in items]}
 
-        total = query.count()
+        weights = ", ".join(str(weight) for weight in MENU_SEARCH_WEIGHTS)
+        category_clause = "AND m.category = :category " if category and category != "All" else ""
+        statement = text(
+            "SELECT m.* FROM menu_items_fts f JOIN menu_items m ON m.id = f.rowid "
+            f"WHERE menu_items_fts MATCH :match AND m.is_available = 1 {category_clause}"
+            f"ORDER BY bm25(menu_items_fts, {weights}), m.id LIMIT :limit OFFSET :offset"
+        ).bindparams(match=match, limit=limit, offset=offset)
+        if category_clause:
+            statement = statement.bindparams(category=category)
+        items = session.query(MenuItem).from_statement(statement).all()
+        return {"total": total, "items": [item.to_dict() for item in items]}
+    finally:
+        session.close()
+
+
+def get_menu_items_page(category=None, search=None, limit=10, offset=0):
+    """Server-side pagination with optional category and search filters, from the read cache."""
+    return _with_live_stock_page(cached_read(
+        "menu_items_page", (category or "All", search or "", limit, offset),
+        lambda: _load_menu_items_page(category, search, limit, offset),
+        depends_on=("menu",),
+    ))
+
+
+def _load_menu_items_page(category=None, search=None, limit=10, offset=0):
+    if search:
+        return search_menu_items(search, category=category, limit=limit, offset=offset)
+
+    session = Session()
+    try:
+        query = _filtered_menu_query(session, category, search)
+        total = _cached_menu_count(session, category, search)
         items = query.order_by(MenuItem.category, MenuItem.name).limit(limit).offset(offset).all()
 
         return {"total": total, "items": [item.to_dict() for item in items]}
@@ -61,15 +204,87 @@ def get_menu_items_page(category=None, search=None, limit=10, offset=0):
         session.close()
 
 
-def get_categories():
+def get_menu_items_keyset(category=None, search=None, limit=10, cursor=None, direction="next"):
+    """Cursor-paginated menu listing ordered by (category, name, id).
+
+    ``cursor`` is a ``[category, name, id]`` key taken from a previous page's
+    ``next_cursor``/``prev_cursor``. ``direction`` is ``"next"`` (items after
+    the cursor, or the first page when cursor is None), ``"prev"`` (items
+    before the cursor) or ``"last"`` (the final page). Every page is one
+    index range scan regardless of depth; ``total`` is served from a cache.
+
+    With ``search`` the results are relevance-ranked (see search_menu_items)
+    and the cursors are plain result offsets instead of row keys.
+
+    Pages are served from the read cache, with live stock.
+    """
+    return _with_live_stock_page(cached_read(
+        "menu_items_keyset",
+        (category or "All", search or "", limit, tuple(cursor) if isinstance(cursor, list) else cursor, direction),
+        lambda: _load_menu_items_keyset(category, search, limit, cursor, direction),
+        depends_on=("menu",),
+    ))
+
+
+def _load_menu_items_keyset(category=None, search=None, limit=10, cursor=None, direction="next"):
+    if search:
+        offset = int(cursor or 0)
+        if direction == "last":
+            session = Session()
+            try:
+                total = _cached_menu_count(session, category, search)
+            finally:
+                session.close()
+            offset = max(0, (total - 1) // limit * limit)
+        result = search_menu_items(search, category=category, limit=limit, offset=offset)
+        result["next_cursor"] = offset + limit if offset + limit < result["total"] else None
+        result["prev_cursor"] = max(0, offset - limit) if offset > 0 else None
+        return result
+
     session = Session()
     try:
-        categories = session.query(MenuItem.category).filter_by(is_available=1).distinct().all()
-        return sorted(set(c[0] for c in categories if c[0]))
+        total = _cached_menu_count(session, category, search)
+        key = tuple_(MenuItem.category, MenuItem.name, MenuItem.id)
+        query = _filtered_menu_query(session, category, search)
+
+        if direction == "last":
+            # Size the last page like offset paging would, so page numbers stay aligned
+            tail = total % limit or limit
+            rows = query.order_by(MenuItem.category.desc(), MenuItem.name.desc(), MenuItem.id.desc()).limit(tail).all()
+            rows.reverse()
+            has_prev, has_next = total > len(rows), False
+        elif direction == "prev" and cursor:
+            rows = query.filter(key < tuple_(*cursor))\
+                .order_by(MenuItem.category.desc(), MenuItem.name.desc(), MenuItem.id.desc())\
+                .limit(limit + 1).all()
+            has_prev = len(rows) > limit
+            rows = rows[:limit]
+            rows.reverse()
+            has_next = True
+        else:
+            if cursor:
+                query = query.filter(key > tuple_(*cursor))
+            rows = query.order_by(MenuItem.category, MenuItem.name, MenuItem.id).limit(limit + 1).all()
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+            has_prev = cursor is not None
+
+        items = [item.to_dict() for item in rows]
+        return {
+            "total": total,
+            "items": items,
+            "next_cursor": [rows[-1].category, rows[-1].name, rows[-1].id] if rows and has_next else None,
+            "prev_cursor": [rows[0].category, rows[0].name, rows[0].id] if rows and has_prev else None,
+        }
     finally:
         session.close()
 
 
+def get_categories():
+    """Sorted categories with available items, from the in-memory facet counts."""
+    return [facet.category for facet in get_category_facets()]
+
+
 def create_menu_item(name, description, price, stock, image, image_type='base64', category='Uncategorized', created_by=None, calories=0, ingredients='', recipe='', allergens='', is_on_sale=0, sale_percentage=0):
     """Create menu item with image and nutrition info"""
     session = Session()
@@ -91,19 +306,33 @@ def create_menu_item(name, description, price, stock, image, image_type='base64'
             sale_percentage=sale_percentage
         )
         session.add(item)
-        session.commit()
-        
         if created_by:
-            log_action(created_by, "MENU_ITEM_CREATED", f"Created menu item: {name}")
+            log_action(created_by, "MENU_ITEM_CREATED", f"Created menu item: {name}", session=session)
+        facets_token = category_facets.begin_write()
+        session.commit()
+        category_facets.apply(facets_token, after=(category, is_on_sale))
+        _bump_menu_version()
     finally:
         session.close()
 
 
+def _load_menu_item_for_write(session, item_id):
+    """Load a menu item inside a write transaction that already holds the write lock.
+
+    The no-op UPDATE takes the lock first, so the row read afterwards is the one
+    this write replaces: two concurrent edits cannot both move it out of the
+    same category facet.
+    """
+    session.execute(update(MenuItem).where(MenuItem.id == item_id).values(is_available=MenuItem.is_available))
+    return session.query(MenuItem).filter_by(id=item_id).populate_existing().first()
+
+
 def update_menu_item(item_id, name, description, price, stock, image, image_type='base64', category='Uncategorized', user_id=None, calories=0, ingredients='', recipe='', allergens='', is_on_sale=0, sale_percentage=0):
     session = Session()
     try:
-        item = session.query(MenuItem).filter_by(id=item_id).first()
+        item = _load_menu_item_for_write(session, item_id)
         if item:
+            before = (item.category, item.is_on_sale) if item.is_available else None
             item.name = name
             item.description = description
             item.price = price
@@ -117,10 +346,13 @@ def update_menu_item(item_id, name, description, price, stock, image, image_type
             item.allergens = allergens
             item.is_on_sale = is_on_sale
             item.sale_percentage = sale_percentage
-            session.commit()
-            
             if user_id:
-                log_action(user_id, "MENU_ITEM_UPDATED", f"Updated menu item: {name}")
+                log_action(user_id, "MENU_ITEM_UPDATED", f"Updated menu item: {name}", session=session)
+            after = (category, is_on_sale) if item.is_available else None
+            facets_token = category_facets.begin_write()
+            session.commit()
+            category_facets.apply(facets_token, before=before, after=after)
+            _bump_menu_version()
     finally:
         session.close()
 
@@ -128,14 +360,17 @@ def update_menu_item(item_id, name, description, price, stock, image, image_type
 def delete_menu_item(item_id, user_id=None):
     session = Session()
     try:
-        item = session.query(MenuItem).filter_by(id=item_id).first()
+        item = _load_menu_item_for_write(session, item_id)
         if item:
             item_name = item.name
+            before = (item.category, item.is_on_sale) if item.is_available else None
             item.is_available = 0
-            session.commit()
-            
             if user_id:
-                log_action(user_id, "MENU_ITEM_DELETED", f"Deleted menu item: {item_name}")
+                log_action(user_id, "MENU_ITEM_DELETED", f"Deleted menu item: {item_name}", session=session)
+            facets_token = category_facets.begin_write()
+            session.commit()
+            category_facets.apply(facets_token, before=before)
+            _bump_menu_version()
     finally:
         session.close()
 
@@ -148,63 +383,269 @@ def get_menu_item_stats(item_id):
         if not item:
             return None
         
-        # Get all orders
-        orders = session.query(Order).all()
-        
-        total_orders = 0
-        total_quantity = 0
-        total_revenue = 0.0
-        
-        for order in orders:
-            try:
-                items_list = json.loads(order.items)
-                for order_item in items_list:
-                    if order_item.get("id") == item_id:
-                        quantity = int(order_item.get("quantity", 0))
-                        price = float(order_item.get("price", 0))
-                        total_orders += 1
-                        total_quantity += quantity
-                        total_revenue += (quantity * price)
-            except Exception:
-                continue
-        
+        sales = session.get(MenuItemSales, item_id)
+
         return {
             "item_name": item.name,
             "category": item.category,
             "current_price": item.price,
             "current_stock": item.stock,
-            "total_orders": total_orders,
-            "total_quantity_sold": total_quantity,
-            "total_revenue": total_revenue,
+            "total_orders": sales.total_orders if sales else 0,
+            "total_quantity_sold": sales.quantity_sold if sales else 0,
+            "total_revenue": float(sales.revenue) if sales else 0.0,
             "created_at": item.created_at.isoformat() if item.created_at else None
         }
     finally:
         session.close()
 
 
+def _apply_menu_item_sales(session, line_rows, sign=1):
+    """Add (sign=1) or reverse (sign=-1) order lines in menu_item_sales within the caller's transaction."""
+    from datetime import datetime
+    now = datetime.now()
+    for row in line_rows:
+        if not row or not row.get("menu_item_id"):
+            continue
+        quantity = sign * int(row["quantity"])
+        revenue = sign * int(row["quantity"]) * float(row["unit_price"])
+        stmt = sqlite_insert(MenuItemSales).values(
+            menu_item_id=row["menu_item_id"],
+            total_orders=sign,
+            quantity_sold=quantity,
+            revenue=revenue,
+            updated_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MenuItemSales.menu_item_id],
+            set_={
+                "total_orders": MenuItemSales.total_orders + sign,
+                "quantity_sold": MenuItemSales.quantity_sold + quantity,
+                "revenue": MenuItemSales.revenue + revenue,
+                "updated_at": now,
+            },
+        )
+        session.execute(stmt)
+
+
+def rebuild_menu_item_sales():
+    """Recompute the menu_item_sales counters from the full order history."""
+    with engine.begin() as conn:
+        _rebuild_menu_item_sales(conn)
+
+
+def _apply_daily_sales(session, day, status, amount, sign=1):
+    """Add (sign=1) or remove (sign=-1) one order of ``amount`` in the (day, status) bucket."""
+    revenue = sign * float(amount or 0.0)
+    stmt = sqlite_insert(DailySales).values(day=day, status=status, order_count=sign, revenue=revenue)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailySales.day, DailySales.status],
+        set_={
+            "order_count": DailySales.order_count + sign,
+            "revenue": DailySales.revenue + revenue,
+        },
+    )
+    session.execute(stmt)
+
+
+def _apply_daily_item_sales(session, day, line_rows, sign=1):
+    """Add (sign=1) or reverse (sign=-1) order lines in daily_item_sales within the caller's transaction."""
+    for row in line_rows:
+        if not row or not row.get("menu_item_id"):
+            continue
+        quantity = sign * int(row["quantity"])
+        revenue = sign * int(row["quantity"]) * float(row["unit_price"])
+        stmt = sqlite_insert(DailyItemSales).values(
+            day=day,
+            menu_item_id=row["menu_item_id"],
+            name=row.get("name") or "",
+            quantity=quantity,
+            revenue=revenue,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[DailyItemSales.day, DailyItemSales.menu_item_id],
+            set_={
+                "quantity": DailyItemSales.quantity + quantity,
+                "revenue": DailyItemSales.revenue + revenue,
+            },
+        )
+        session.execute(stmt)
+
+
+def rebuild_daily_sales():
+    """Recompute the daily_sales / daily_item_sales rollups from the full order history."""
+    with engine.begin() as conn:
+        _rebuild_daily_sales(conn)
+
+
+def get_daily_sales(since=None, until=None):
+    """Rows of the daily_sales rollup with ``since <= day <= until`` (dates), oldest first."""
+    session = ReadSession()
+    try:
+        query = session.query(DailySales.day, DailySales.status, DailySales.order_count, DailySales.revenue)
+        if since is not None:
+            query = query.filter(DailySales.day >= since)
+        if until is not None:
+            query = query.filter(DailySales.day <= until)
+        return [
+            {"day": day, "status": status, "order_count": int(count or 0), "revenue": float(revenue or 0.0)}
+            for day, status, count, revenue in query.order_by(DailySales.day).all()
+            if count
+        ]
+    finally:
+        session.close()
+
+
+def get_daily_customer_order_counts(since, until=None):
+    """Orders, cancellations and deliveries per (order date, customer) in one GROUP BY.
+
+    ``since``/``until`` are dates (``until`` inclusive). Rows are dicts with
+    ``day`` (date), ``customer_id``, ``orders``, ``cancelled`` and ``delivered``.
+    """
+    from datetime import date, datetime, timedelta
+    table = Order.__table__
+    status = func.lower(func.trim(table.c.status))
+    day = func.date(func.coalesce(table.c.created_at, table.c.placed_at))
+    statement = select(
+        day,
+        table.c.customer_id,
+        func.count(),
+        func.sum(case((status == "cancelled", 1), else_=0)),
+        func.sum(case((status == "delivered", 1), else_=0)),
+    ).where(table.c.created_at >= datetime.combine(since, datetime.min.time()))
+    if until is not None:
+        statement = statement.where(table.c.created_at < datetime.combine(until + timedelta(days=1), datetime.min.time()))
+    statement = statement.group_by(day, table.c.customer_id)
+
+    with read_engine.connect() as conn:
+        return [
+            {
+                "day": date.fromisoformat(order_day), "customer_id": customer_id,
+                "orders": orders, "cancelled": cancelled or 0, "delivered": delivered or 0,
+            }
+            for order_day, customer_id, orders, cancelled, delivered in conn.execute(statement)
+            if order_day
+        ]
+
+
+def get_daily_item_sales(since=None, until=None):
+    """Per-item totals of non-cancelled orders with ``since <= day <= until`` (dates).
+
+    Returns a dict keyed by menu_item_id of ``{name, quantity_sold, revenue}``,
+    read from the daily_item_sales rollup.
+    """
+    session = ReadSession()
+    try:
+        query = session.query(
+            DailyItemSales.menu_item_id,
+            func.max(DailyItemSales.name),
+            func.sum(DailyItemSales.quantity),
+            func.sum(DailyItemSales.revenue),
+        )
+        if since is not None:
+            query = query.filter(DailyItemSales.day >= since)
+        if until is not None:
+            query = query.filter(DailyItemSales.day <= until)
+
+        rows = query.group_by(DailyItemSales.menu_item_id).all()
+        return {
+            menu_item_id: {
+                "name": name or f"Item #{menu_item_id}",
+                "quantity_sold": int(quantity or 0),
+                "revenue": float(revenue or 0.0),
+            }
+            for menu_item_id, name, quantity, revenue in rows
+            if quantity
+        }
+    finally:
+        session.close()
+
+
 # ========== ORDER OPERATIONS ==========
+def _cart_quantities(items):
+    """Total requested quantity per menu item id, skipping malformed cart lines."""
+    quantities = {}
+    for item in items or []:
+        try:
+            item_id = int(item.get("id"))
+            qty = int(item.get("quantity", 0))
+        except Exception:
+            continue
+        if item_id and qty > 0:
+            quantities[item_id] = quantities.get(item_id, 0) + qty
+    return quantities
+
+
+def _load_stock(session, item_ids):
+    rows = session.query(MenuItem.id, MenuItem.name, MenuItem.stock, MenuItem.is_available)\
+        .filter(MenuItem.id.in_(list(item_ids)))\
+        .all()
+    return {row.id: row for row in rows}
+
+
+def _stock_conflicts(stock_rows, quantities, names, force=False):
+    """Cart lines asking for more than is in stock (all of ``quantities`` when ``force``)."""
+    conflicts = []
+    for item_id, qty in quantities.items():
+        row = stock_rows.get(item_id)
+        available = int(row.stock or 0) if row is not None and row.is_available else 0
+        if force or available < qty:
+            conflicts.append({
+                "id": item_id,
+                "name": row.name if row is not None else names.get(item_id, f"Item #{item_id}"),
+                "requested": qty,
+                "available": max(0, available),
+            })
+    return conflicts
+
+
 def create_order(customer_id, customer_name, address, contact, items, total, payment_method="Cash on Delivery"):
+    """Place an order and reserve its stock in one transaction.
+
+    Returns ``(True, order_id, [])`` on success. If any line cannot be filled,
+    nothing is written and ``(False, None, conflicts)`` is returned, each
+    conflict being ``{"id", "name", "requested", "available"}``.
+    """
+    quantities = _cart_quantities(items)
+    names = {}
+    for item in items or []:
+        if isinstance(item, dict) and item.get("id") is not None:
+            names.setdefault(item.get("id"), item.get("name"))
+
     session = Session()
     try:
-        # Decrease stock on order placement
-        for item in items or []:
-            try:
-                item_id = item.get("id")
-                qty = int(item.get("quantity", 0))
-            except Exception:
-                item_id = None
-                qty = 0
-            if not item_id or qty <= 0:
-                continue
-            menu_item = session.query(MenuItem).filter_by(id=item_id).first()
-            if menu_item:
-                current_stock = menu_item.stock or 0
-                menu_item.stock = max(0, current_stock - qty)
+        if quantities:
+            # One IN query for every cart line; fail fast without taking the write lock
+            conflicts = _stock_conflicts(_load_stock(session, quantities), quantities, names)
+            if conflicts:
+                return False, None, conflicts
+
+            # Conditional decrements: a concurrent checkout that took the last units
+            # makes the UPDATE match no row instead of driving stock negative
+            short = {}
+            for item_id, qty in quantities.items():
+                result = session.execute(
+                    update(MenuItem)
+                    .where(MenuItem.id == item_id, MenuItem.is_available == 1, MenuItem.stock >= qty)
+                    .values(stock=MenuItem.stock - qty)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount != 1:
+                    short[item_id] = qty
+            if short:
+                session.rollback()
+                return False, None, _stock_conflicts(_load_stock(session, short), short, names, force=True)
+
+        # Stock UPDATEs above already hold the write lock, so MAX()+1 cannot race
+        # (the unique index on (customer_id, customer_order_number) backs this up)
+        last_number = session.query(func.max(Order.customer_order_number))\
+            .filter(Order.customer_id == customer_id)\
+            .scalar()
 
         items_json = json.dumps(items)
         from datetime import datetime
         order = Order(
             customer_id=customer_id,
+            customer_order_number=(last_number or 0) + 1,
             customer_name=customer_name,
             delivery_address=address,
             contact_number=contact,
@@ -214,60 +655,157 @@ def create_order(customer_id, customer_name, address, contact, items, total, pay
             placed_at=datetime.now()
         )
         session.add(order)
-        session.commit()
-        
+        session.flush()
+
+        # Dual-write: keep the normalized order_items table in step with the JSON blob
+        line_rows = [row for row in (OrderItem.row_from_cart_item(order.id, item) for item in items or []) if row]
+        session.add_all([OrderItem(**row) for row in line_rows])
+        _apply_menu_item_sales(session, line_rows)
+        order_day = order.created_at.date()
+        _apply_daily_sales(session, order_day, order.status or "placed", total)
+        _apply_daily_item_sales(session, order_day, line_rows)
+        session.add(OrderStatusEvent(
+            order_id=order.id, from_status=None, to_status="placed",
+            actor_id=customer_id, actor_role="customer", at=order.placed_at,
+        ))
         order_id = order.id
-        log_action(customer_id, "ORDER_PLACED", f"Order #{order_id} - Amount: {total} - Payment: {payment_method}")
+        log_action(customer_id, "ORDER_PLACED", f"Order #{order_id} - Amount: {total} - Payment: {payment_method}", session=session)
+        session.commit()
+        bump_data_version("orders", "menu")
+        invalidate_reads("stock")
+        return True, order_id, []
+    except Exception:
+        session.rollback()
+        raise
     finally:
         session.close()
 
 
 def get_orders_by_customer(customer_id):
-    """Get orders with per-customer numbering"""
+    """Get a customer's orders, newest first"""
     session = Session()
     try:
         orders = session.query(Order)\
             .filter_by(customer_id=customer_id)\
-            .order_by(Order.created_at.asc())\
+            .order_by(Order.created_at.desc())\
             .all()
-        
-        # Add customer-specific order number (chronological order)
-        order_dicts = []
-        for idx, order in enumerate(orders, start=1):
-            order_dict = order.to_dict()
-            order_dict['customer_order_number'] = idx
-            order_dicts.append(order_dict)
-        
-        # Reverse to show newest first
-        return list(reversed(order_dicts))
+        return [order.to_dict() for order in orders]
     finally:
         session.close()
 
 
 def get_all_orders():
-    """Get all orders with per-customer numbering for each customer"""
-    session = Session()
+    """Get all orders, newest first"""
+    session = ReadSession()
     try:
         orders = session.query(Order).order_by(Order.created_at.desc()).all()
-        order_dicts = [order.to_dict() for order in orders]
-        
-        # Group orders by customer_id and count them chronologically
-        from collections import defaultdict
-        customer_orders_by_time = defaultdict(list)
-        
-        # Group all orders by customer
-        for order in order_dicts:
-            customer_orders_by_time[order['customer_id']].append(order)
-        
-        # Sort each customer's orders chronologically and assign numbers
-        for customer_id, customer_orders in customer_orders_by_time.items():
-            # Sort by created_at ascending (oldest first)
-            customer_orders.sort(key=lambda x: x['created_at'])
-            # Assign numbers 1, 2, 3...
-            for idx, order in enumerate(customer_orders, start=1):
-                order['customer_order_number'] = idx
-        
-        return order_dicts
+        return [order.to_dict() for order in orders]
+    finally:
+        session.close()
+
+
+def list_orders(status=None, since=None, until=None, include_items=False, after_id=None, order_ids=None):
+    """Matching orders, newest first, as projected OrderRow tuples.
+
+    Datetimes are native; ``items`` (parsed cart JSON) is only loaded when
+    ``include_items``. ``after_id`` keeps orders with a larger id (new since a
+    previous read); ``order_ids`` keeps only those ids. Use this instead of
+    get_all_orders for analytics.
+    """
+    table = Order.__table__
+    statement = ORDER_WITH_ITEMS_SELECT if include_items else ORDER_SELECT
+    if status:
+        statement = statement.where(table.c.status == status)
+    if after_id is not None:
+        statement = statement.where(table.c.id > after_id)
+    if order_ids is not None:
+        statement = statement.where(table.c.id.in_(list(order_ids)))
+    if since is not None:
+        statement = statement.where(table.c.created_at >= since)
+    if until is not None:
+        statement = statement.where(table.c.created_at < until)
+    statement = statement.order_by(table.c.created_at.desc())
+
+    with read_engine.connect() as conn:
+        rows = fetch_rows(conn, statement, OrderRowWithItems if include_items else OrderRow)
+    if include_items:
+        rows = [row._replace(items=json.loads(row.items) if row.items else []) for row in rows]
+    return rows
+
+
+ORDER_PAGE_SIZE = 50
+
+
+def _filtered_orders_query(session, status=None, search=None, since=None, until=None):
+    query = session.query(Order)
+    if status and status != "all":
+        query = query.filter(Order.status == status)
+    if since is not None:
+        query = query.filter(Order.created_at >= since)
+    if until is not None:
+        query = query.filter(Order.created_at < until)
+
+    search = (search or "").strip()
+    if search:
+        # Match the typed text literally: % and _ are not wildcards here
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        like = f"%{escaped}%"
+        conditions = [
+            Order.customer_name.ilike(like, escape="\\"),
+            Order.id.in_(select(OrderItem.order_id).where(OrderItem.name.ilike(like, escape="\\"))),
+        ]
+        if search.isdigit():
+            conditions.append(cast(Order.customer_order_number, String).like(like, escape="\\"))
+        query = query.filter(or_(*conditions))
+    return query
+
+
+def get_orders_page(status=None, search=None, since=None, until=None, limit=ORDER_PAGE_SIZE, cursor=None):
+    """One page of orders, newest first, with status/search/date filters applied in SQL.
+
+    ``search`` is a case-insensitive substring of the customer name, an item
+    name or the per-customer order number. Orders without ``created_at``
+    (legacy rows) come last. ``cursor`` is the ``next_cursor`` of the previous page. Returns
+    ``{"total", "orders", "next_cursor"}``; ``total`` is only counted for the
+    first page (``None`` when a cursor is given).
+    """
+    from datetime import datetime
+    session = ReadSession()
+    try:
+        query = _filtered_orders_query(session, status, search, since, until)
+        total = query.count() if not cursor else None
+
+        if cursor:
+            created_at, order_id = cursor
+            if created_at is None:
+                query = query.filter(Order.created_at.is_(None), Order.id < order_id)
+            else:
+                # NULL created_at sorts after every date in descending order
+                query = query.filter(or_(
+                    tuple_(Order.created_at, Order.id) < (datetime.fromisoformat(created_at), order_id),
+                    Order.created_at.is_(None),
+                ))
+
+        rows = query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit + 1).all()
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+
+        last = rows[-1] if rows else None
+        return {
+            "total": total,
+            "orders": [order.to_dict() for order in rows],
+            "next_cursor": [last.created_at.isoformat() if last.created_at else None, last.id] if has_next else None,
+        }
+    finally:
+        session.close()
+
+
+def get_order(order_id):
+    """Single order as a dict, or None."""
+    session = ReadSession()
+    try:
+        order = session.get(Order, order_id)
+        return order.to_dict() if order else None
     finally:
         session.close()
 
@@ -310,7 +848,8 @@ def update_order_status(order_id, new_status, user_id=None):
             return False, f"Invalid status transition: {current} → {new_status}"
 
         # If cancelled before preparation, restore stock
-        if new_status == "cancelled" and current == "placed":
+        restock = new_status == "cancelled" and current == "placed"
+        if restock:
             try:
                 items = json.loads(order.items) if order.items else []
             except Exception:
@@ -329,23 +868,48 @@ def update_order_status(order_id, new_status, user_id=None):
                     current_stock = menu_item.stock or 0
                     menu_item.stock = current_stock + qty
 
+        # Cancelled orders no longer count towards the per-item sales counters
+        if new_status == "cancelled":
+            line_rows = [
+                {"menu_item_id": line.menu_item_id, "quantity": line.quantity, "unit_price": line.unit_price}
+                for line in session.query(OrderItem).filter_by(order_id=order.id).all()
+            ]
+            _apply_menu_item_sales(session, line_rows, sign=-1)
+            if order.created_at:
+                _apply_daily_item_sales(session, order.created_at.date(), line_rows, sign=-1)
+
+        # Move the order between status buckets of its day's sales rollup
+        if order.created_at:
+            order_day = order.created_at.date()
+            _apply_daily_sales(session, order_day, order.status, order.total_amount, sign=-1)
+            _apply_daily_sales(session, order_day, new_status, order.total_amount)
+
         # Update timeline based on status change
         from datetime import datetime
+        changed_at = datetime.now()
         if new_status == "preparing":
-            order.preparing_at = datetime.now()
+            order.preparing_at = changed_at
         elif new_status == "out for delivery":
-            order.out_for_delivery_at = datetime.now()
+            order.out_for_delivery_at = changed_at
         elif new_status == "delivered":
-            order.delivered_at = datetime.now()
+            order.delivered_at = changed_at
         elif new_status == "cancelled":
-            order.cancelled_at = datetime.now()
+            order.cancelled_at = changed_at
 
-        order.status = new_status
-        session.commit()
+        actor_role = session.query(User.role).filter(User.id == user_id).scalar() if user_id else None
+        session.add(OrderStatusEvent(
+            order_id=order.id, from_status=current, to_status=new_status,
+            actor_id=user_id, actor_role=actor_role, at=changed_at,
+        ))
 
+        order.status = new_status
         if user_id:
             log_action(user_id, "ORDER_STATUS_UPDATED",
-                      f"Order #{order_id} : {current} → {new_status}")
+                      f"Order #{order_id} : {current} → {new_status}", session=session)
+        session.commit()
+        bump_data_version("orders", "menu")
+        if restock:
+            invalidate_reads("stock")
 
         return True, "Status updated"
     except Exception as e:
@@ -355,9 +919,73 @@ def update_order_status(order_id, new_status, user_id=None):
         session.close()
 
 
+def get_order_status_events(order_id):
+    """Status changes of one order, oldest first, from order_status_events."""
+    session = ReadSession()
+    try:
+        events = session.query(OrderStatusEvent)\
+            .filter(OrderStatusEvent.order_id == order_id)\
+            .order_by(OrderStatusEvent.id)\
+            .all()
+        return [event.to_dict() for event in events]
+    finally:
+        session.close()
+
+
+def get_staff_cancelled_order_ids(since=None, order_ids=None):
+    """Ids of orders cancelled by an admin or owner (optionally at or after ``since``).
+
+    ``order_ids`` only checks those orders.
+    """
+    session = ReadSession()
+    try:
+        query = session.query(OrderStatusEvent.order_id)\
+            .filter(OrderStatusEvent.to_status == "cancelled")\
+            .filter(OrderStatusEvent.actor_role.in_(("admin", "owner")))
+        if since is not None:
+            query = query.filter(OrderStatusEvent.at >= since)
+        if order_ids is not None:
+            query = query.filter(OrderStatusEvent.order_id.in_(list(order_ids)))
+        return {order_id for (order_id,) in query.all()}
+    finally:
+        session.close()
+
+
+def get_stage_durations(since=None, until=None):
+    """Average time spent in each status before the next one, for changes in ``[since, until)``.
+
+    Returns ``[{from_status, to_status, count, avg_seconds}]``, e.g. how long
+    orders waited in "placed" before "preparing".
+    """
+    entered = OrderStatusEvent.__table__.alias("entered")
+    left = OrderStatusEvent.__table__.alias("left_status")
+    seconds = (func.julianday(left.c.at) - func.julianday(entered.c.at)) * 86400.0
+    statement = select(left.c.from_status, left.c.to_status, func.count(), func.avg(seconds))\
+        .select_from(left.join(entered, (entered.c.order_id == left.c.order_id) & (entered.c.to_status == left.c.from_status)))\
+        .where(left.c.to_status.in_(("preparing", "out for delivery", "delivered", "cancelled")))\
+        .where(left.c.from_status.isnot(None))
+    if since is not None:
+        statement = statement.where(left.c.at >= since)
+    if until is not None:
+        statement = statement.where(left.c.at < until)
+    statement = statement.group_by(left.c.from_status, left.c.to_status)
+
+    with read_engine.connect() as conn:
+        return [
+            {"from_status": from_status, "to_status": to_status, "count": count, "avg_seconds": float(avg or 0.0)}
+            for from_status, to_status, count, avg in conn.execute(statement)
+        ]
+
+
 # ========== FAVORITE OPERATIONS ==========
 def get_user_favorites(user_id):
-    """Get all favorited menu items for a user"""
+    """Get all favorited menu items for a user (cached; treat as read-only)"""
+    return cached_read(
+        "user_favorites", user_id, lambda: _load_user_favorites(user_id), depends_on=(("favorites", user_id),),
+    )
+
+
+def _load_user_favorites(user_id):
     session = Session()
     try:
         favorites = session.query(Favorite).filter_by(user_id=user_id).all()
@@ -366,6 +994,68 @@ def get_user_favorites(user_id):
         session.close()
 
 
+def get_favorite_menu_items_page(user_id, limit=10, cursor=None, direction="next"):
+    """Available favorited menu items of a user, cursor-paginated by menu item id.
+
+    One query joins ``favorites`` (range scan of its ``(user_id, menu_item_id)``
+    index) to ``menu_items`` by primary key and carries the total as a scalar
+    subquery. ``cursor``/``direction`` work like get_menu_items_keyset, with
+    the menu item id as the cursor. Pages are served from the read cache,
+    with live stock.
+    """
+    return _with_live_stock_page(cached_read(
+        "favorite_menu_items", (user_id, limit, cursor, direction),
+        lambda: _load_favorite_menu_items_page(user_id, limit, cursor, direction),
+        depends_on=("menu", ("favorites", user_id)),
+    ))
+
+
+def _load_favorite_menu_items_page(user_id, limit=10, cursor=None, direction="next"):
+    session = Session()
+    try:
+        def favorites_query():
+            return session.query(MenuItem)\
+                .join(Favorite, Favorite.menu_item_id == MenuItem.id)\
+                .filter(Favorite.user_id == user_id, MenuItem.is_available == 1)
+
+        total_query = favorites_query().with_entities(func.count()).scalar_subquery()
+        query = favorites_query().add_columns(total_query)
+
+        if direction == "last":
+            rows = query.order_by(Favorite.menu_item_id.desc()).limit(limit).all()
+            total = rows[0][1] if rows else 0
+            # Size the last page like offset paging would, so page numbers stay aligned
+            rows = rows[:total % limit or limit]
+            rows.reverse()
+            has_prev, has_next = total > len(rows), False
+        elif direction == "prev" and cursor:
+            rows = query.filter(Favorite.menu_item_id < cursor)\
+                .order_by(Favorite.menu_item_id.desc()).limit(limit + 1).all()
+            has_prev = len(rows) > limit
+            rows = rows[:limit]
+            rows.reverse()
+            has_next = True
+        else:
+            if cursor:
+                query = query.filter(Favorite.menu_item_id > cursor)
+            rows = query.order_by(Favorite.menu_item_id).limit(limit + 1).all()
+            has_next = len(rows) > limit
+            rows = rows[:limit]
+            has_prev = cursor is not None
+
+        # An empty page carries no total column (no favorites, or a cursor past the end)
+        total = rows[0][1] if rows else favorites_query().count()
+        items = [item for item, _ in rows]
+        return {
+            "total": total,
+            "items": [item.to_dict() for item in items],
+            "next_cursor": items[-1].id if items and has_next else None,
+            "prev_cursor": items[0].id if items and has_prev else None,
+        }
+    finally:
+        session.close()
+
+
 def add_favorite(user_id, menu_item_id):
     """Add a menu item to user's favorites"""
     session = Session()
@@ -380,6 +1070,7 @@ def add_favorite(user_id, menu_item_id):
             favorite = Favorite(user_id=user_id, menu_item_id=menu_item_id)
             session.add(favorite)
             session.commit()
+            invalidate_reads(("favorites", user_id))
             return True, "Added to favorites"
         return False, "Already in favorites"
     except Exception as e:
@@ -398,6 +1089,7 @@ def remove_favorite(user_id, menu_item_id):
             menu_item_id=menu_item_id
         ).delete()
         session.commit()
+        invalidate_reads(("favorites", user_id))
         return True, "Removed from favorites"
     except Exception as e:
         session.rollback()
@@ -90,4 +90,26 @@ def format_time_only(dt_string):
         return dt.strftime("%I:%M %p")
     except Exception as e:
         print(f"Error formatting datetime: {e}")
-        return dt_string
\ No newline at end of file
+        return dt_string
+
+def format_duration(seconds):
+    """
+    Format a number of seconds as a short duration
+    
+    Args:
+        seconds: Duration in seconds
+    
+    Returns:
+        Formatted string like "45s", "12m", "2h 05m" or "3d 4h"
+    """
+    seconds = int(seconds or 0)
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
@@ -0,0 +1,153 @@
+# core/export_jobs.py
+"""Background sales CSV export jobs.
+
+``start_sales_export`` runs an export on a worker thread instead of the UI
+event thread. Orders are streamed from the read engine with ``yield_per``
+(the driver hands over ``chunk_size`` rows at a time instead of the whole
+result), written chunk by chunk to ``<name>.csv`` or ``<name>.csv.gz``, and
+the returned ``ExportJob`` exposes progress, row counts and ``cancel()``.
+
+The file is written under a ``.part`` name and renamed when complete, so a
+cancelled or failed export never leaves a truncated CSV behind.
+"""
+import csv
+import gzip
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from models.models import read_engine, Order
+
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_FIELDS = ["order_id", "date", "customer", "status", "amount"]
+
+_EXPORT_SELECT = select(
+    Order.id, Order.created_at, Order.customer_name, Order.status, Order.total_amount,
+)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportJob:
+    """State of one export; updated by the worker thread, read by the UI."""
+
+    def __init__(self, path, total_rows=0):
+        self.path = path
+        self.status = "running"  # running | done | cancelled | failed
+        self.total_rows = total_rows
+        self.rows_written = 0
+        self.revenue = 0.0
+        self.error = None
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def progress(self):
+        if self.status == "done":
+            return 1.0
+        if not self.total_rows:
+            return 0.0
+        return min(1.0, self.rows_written / self.total_rows)
+
+    @property
+    def finished(self):
+        return self.status != "running"
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.finished
+
+
+def _open_output(path, compress):
+    if compress:
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def _count_orders(since):
+    with read_engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(Order).where(Order.created_at >= since)).scalar() or 0
+
+
+def _write_sales_csv(job, since, period_label, compress, chunk_size, on_progress):
+    part_path = job.path + ".part"
+    try:
+        with _open_output(part_path, compress) as output:
+            writer = csv.DictWriter(output, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+
+            statement = _EXPORT_SELECT.where(Order.created_at >= since).order_by(Order.created_at.desc())
+            with read_engine.connect() as conn:
+                result = conn.execution_options(yield_per=chunk_size).execute(statement)
+                for chunk in result.partitions():
+                    if job._cancel.is_set():
+                        raise ExportCancelled()
+                    rows = []
+                    for order_id, created_at, customer_name, status, amount in chunk:
+                        status = (status or "").lower().strip()
+                        amount = float(amount or 0.0)
+                        if status != "cancelled":
+                            job.revenue += amount
+                        rows.append({
+                            "order_id": order_id,
+                            "date": created_at.strftime("%Y-%m-%d %H:%M"),
+                            "customer": customer_name or "",
+                            "status": status,
+                            "amount": f"{amount:.2f}",
+                        })
+                    writer.writerows(rows)
+                    job.rows_written += len(rows)
+                    if on_progress:
+                        on_progress(job)
+
+            writer.writerow({})
+            writer.writerow({"order_id": "SUMMARY"})
+            writer.writerow({"order_id": "period", "date": period_label})
+            writer.writerow({"order_id": "orders_count", "date": str(job.rows_written)})
+            writer.writerow({"order_id": "non_cancelled_revenue", "date": f"{job.revenue:.2f}"})
+
+        os.replace(part_path, job.path)
+        job.status = "done"
+    except ExportCancelled:
+        job.status = "cancelled"
+    except Exception as e:
+        job.error = e
+        job.status = "failed"
+    finally:
+        if job.status != "done" and os.path.exists(part_path):
+            os.remove(part_path)
+        if on_progress:
+            on_progress(job)
+
+
+def start_sales_export(since, export_dir, period_label="", compress=False,
+                       chunk_size=EXPORT_CHUNK_SIZE, on_progress=None):
+    """Export orders created at or after ``since`` on a background thread.
+
+    ``on_progress(job)`` is called from the worker after every chunk and once
+    when the job finishes (``job.status`` is then done/cancelled/failed).
+    """
+    os.makedirs(export_dir, exist_ok=True)
+    slug = period_label.lower().replace(" ", "") or "all"
+    file_name = f"sales_{slug}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    if compress:
+        file_name += ".gz"
+
+    job = ExportJob(os.path.join(export_dir, file_name), total_rows=_count_orders(since))
+    job._thread = threading.Thread(
+        target=_write_sales_csv,
+        args=(job, since, period_label, compress, chunk_size, on_progress),
+        name="sales-export",
+        daemon=True,
+    )
+    job._thread.start()
+    return job
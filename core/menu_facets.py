@@ -0,0 +1,108 @@
+# core/menu_facets.py
+"""In-memory category facet counts for the menu browser.
+
+``CategoryFacets`` keeps, per category, how many available menu items it has
+and how many of those are on sale. It is built with one ``GROUP BY`` on first
+use and then kept current by the menu write paths in ``core.database``, which
+apply the before/after state of the row they changed after committing. The
+browse screen reads the counts without touching the database.
+
+A write that commits while the index is being rebuilt may or may not be part
+of the rebuilt counts, so its delta is dropped and the next read rebuilds
+instead. The index is also rebuilt after ``max_age`` to pick up writes made by
+other processes.
+
+Environment variables:
+    FOOD_READ_CACHE_TTL_SECONDS  Rebuild the counts at least this often (default: 60).
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+from sqlalchemy import case, func, select
+
+from models.models import read_engine, MenuItem
+
+
+CategoryFacet = namedtuple("CategoryFacet", ["category", "available", "on_sale"])
+
+_FACETS_SELECT = select(
+    MenuItem.category,
+    func.count(),
+    func.sum(case((MenuItem.is_on_sale != 0, 1), else_=0)),
+).where(MenuItem.is_available == 1).group_by(MenuItem.category)
+
+
+class CategoryFacets:
+    def __init__(self, max_age_seconds=None):
+        self.max_age = float(max_age_seconds or os.getenv("FOOD_READ_CACHE_TTL_SECONDS") or 60)
+        self._lock = threading.Lock()
+        self._counts = None        # category -> [available, on_sale]
+        self._built_at = 0.0
+        self._generation = 0       # bumped by every rebuild
+        self.stats = {"reads": 0, "rebuilds": 0, "deltas": 0, "dropped_deltas": 0}
+
+    def _rebuild_locked(self):
+        with read_engine.connect() as conn:
+            rows = conn.execute(_FACETS_SELECT).all()
+        self._counts = {category: [available, on_sale] for category, available, on_sale in rows if category}
+        self._built_at = time.monotonic()
+        self._generation += 1
+        self.stats["rebuilds"] += 1
+
+    def facets(self):
+        """``[CategoryFacet]`` of categories with available items, sorted by name."""
+        with self._lock:
+            self.stats["reads"] += 1
+            if self._counts is None or time.monotonic() - self._built_at >= self.max_age:
+                self._rebuild_locked()
+            return [
+                CategoryFacet(category, available, on_sale)
+                for category, (available, on_sale) in sorted(self._counts.items())
+            ]
+
+    def rebuild(self):
+        with self._lock:
+            self._rebuild_locked()
+
+    def invalidate(self):
+        with self._lock:
+            self._counts = None
+
+    # ---------- writes ----------
+    def begin_write(self):
+        """Token to take before committing a menu write and pass to ``apply``."""
+        with self._lock:
+            return self._generation
+
+    def apply(self, token, before=None, after=None):
+        """Move one menu item between facets after its write committed.
+
+        ``before``/``after`` are ``(category, is_on_sale)`` of the item while it
+        was / is available, or None when it was not / is no longer available.
+        """
+        with self._lock:
+            if self._counts is None:
+                return
+            if token != self._generation:
+                self.stats["dropped_deltas"] += 1
+                self._counts = None
+                return
+            self.stats["deltas"] += 1
+            for state, sign in ((before, -1), (after, 1)):
+                if state is None or not state[0]:
+                    continue
+                category, is_on_sale = state
+                counts = self._counts.setdefault(category, [0, 0])
+                counts[0] += sign
+                counts[1] += sign if is_on_sale else 0
+                if counts[0] <= 0:
+                    del self._counts[category]
+
+
+category_facets = CategoryFacets()
+
+
+def get_category_facets():
+    return category_facets.facets()
@@ -0,0 +1,84 @@
+# core/projections.py
+"""Column-projected row types for list and analytics views.
+
+The ``list_*`` functions in core.database / core.auth select only the columns
+a list needs with SQLAlchemy Core and return compact namedtuple rows instead
+of hydrating ORM objects and calling ``to_dict()``:
+
+* datetimes stay native ``datetime`` objects (no ISO formatting/parsing);
+* heavy columns (order item JSON, images, recipes, profile pictures,
+  password/token hashes) are left out unless explicitly requested.
+
+Rows also support ``row.get("field")`` / ``row["field"]`` so code written
+against the dict API keeps working.
+"""
+from collections import namedtuple
+
+from sqlalchemy import select
+
+from models.models import Order, User, MenuItem
+
+
+def _row_type(name, fields):
+    base = namedtuple(name, fields)
+
+    # Only the fields are keys: getattr alone would also expose tuple methods ("count", "index")
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._fields else default
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self._fields:
+                raise KeyError(key)
+            return getattr(self, key)
+        return tuple.__getitem__(self, key)
+
+    return type(name, (base,), {"__slots__": (), "get": get, "__getitem__": __getitem__})
+
+
+# ---------- orders ----------
+ORDER_COLUMNS = (
+    "id", "customer_id", "customer_order_number", "customer_name", "delivery_address", "contact_number",
+    "total_amount", "status", "payment_method", "created_at", "placed_at", "preparing_at",
+    "out_for_delivery_at", "delivered_at", "cancelled_at",
+)
+OrderRow = _row_type("OrderRow", ORDER_COLUMNS)
+OrderRowWithItems = _row_type("OrderRowWithItems", ORDER_COLUMNS + ("items",))
+
+# ---------- users ----------
+USER_COLUMNS = (
+    "id", "email", "email_verified", "full_name", "role", "address", "contact", "is_active",
+    "failed_login_attempts", "locked_until", "last_login", "created_at",
+)
+UserRow = _row_type("UserRow", USER_COLUMNS)
+UserRowWithPicture = _row_type("UserRowWithPicture", USER_COLUMNS + ("profile_picture", "pic_type"))
+
+# ---------- menu items ----------
+MENU_ITEM_COLUMNS = (
+    "id", "name", "description", "price", "stock", "category", "calories", "allergens",
+    "is_on_sale", "sale_percentage", "created_at",
+)
+MENU_ITEM_HEAVY_COLUMNS = ("image", "image_type", "ingredients", "recipe")
+MenuItemRow = _row_type("MenuItemRow", MENU_ITEM_COLUMNS)
+MenuItemRowFull = _row_type("MenuItemRowFull", MENU_ITEM_COLUMNS + MENU_ITEM_HEAVY_COLUMNS)
+
+
+def _columns(model, names):
+    table = model.__table__
+    return [table.c[name] for name in names]
+
+
+# Built once at import: SQLAlchemy's compiled cache then reuses their SQL
+# for every call (filters added with .where() share the cached prefix).
+ORDER_SELECT = select(*_columns(Order, ORDER_COLUMNS))
+ORDER_WITH_ITEMS_SELECT = select(*_columns(Order, ORDER_COLUMNS + ("items",)))
+USER_SELECT = select(*_columns(User, USER_COLUMNS))
+USER_WITH_PICTURE_SELECT = select(*_columns(User, USER_COLUMNS + ("profile_picture", "pic_type")))
+MENU_ITEM_SELECT = select(*_columns(MenuItem, MENU_ITEM_COLUMNS))
+MENU_ITEM_FULL_SELECT = select(*_columns(MenuItem, MENU_ITEM_COLUMNS + MENU_ITEM_HEAVY_COLUMNS))
+
+
+def fetch_rows(conn, statement, row_type):
+    """Execute a projected statement and wrap each result tuple in ``row_type``."""
+    make = row_type._make
+    return [make(row) for row in conn.execute(statement)]
@@ -0,0 +1,105 @@
+# core/read_cache.py
+"""Process-wide read-through cache for catalog and user lookups.
+
+Menu listings, categories, favorites and profile lookups are read on every
+screen build and chip click but change rarely, so they are served from memory:
+
+* entries are keyed by ``(name, params)`` and stamped with the versions of the
+  entities they were built from: ``"menu"`` (catalog rows), ``"stock"`` (the
+  id -> stock map, changed by orders), ``("favorites", user_id)`` and
+  ``("user", user_id)``;
+* writers call ``invalidate(*entities)`` after committing, which only makes the
+  entries depending on those entities stale (a favorite toggle does not evict
+  the catalog, an order only reloads the stock map, not the listings);
+* entries also expire after a TTL, bounding staleness from writes made by
+  other processes, and the least recently used entries are evicted beyond
+  ``max_entries``.
+
+Cached values are shared between sessions: callers must treat them as read-only.
+
+Environment variables:
+    FOOD_READ_CACHE_TTL_SECONDS  Lifetime of an entry (default: 60).
+    FOOD_READ_CACHE_MAX_ENTRIES  Entries kept before LRU eviction (default: 2048).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class ReadCache:
+    def __init__(self, max_entries=None, ttl_seconds=None):
+        self.max_entries = int(max_entries or os.getenv("FOOD_READ_CACHE_MAX_ENTRIES") or 2048)
+        self.ttl = float(ttl_seconds or os.getenv("FOOD_READ_CACHE_TTL_SECONDS") or 60)
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._entries = OrderedDict()   # key -> (value, stamp, expires_at), LRU order
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0, "expired": 0, "evicted": 0}
+
+    # ---------- versions ----------
+    def invalidate(self, *entities):
+        with self._lock:
+            for entity in entities:
+                self._versions[entity] = self._versions.get(entity, 0) + 1
+
+    def _stamp(self, depends_on):
+        return tuple(self._versions.get(entity, 0) for entity in depends_on)
+
+    # ---------- lookups ----------
+    def get(self, name, params, compute, depends_on=()):
+        """Return the cached value for (name, params), or compute and store it."""
+        key = (name, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stamp, expires_at = entry
+                if stamp != self._stamp(depends_on):
+                    self.stats["invalidated"] += 1
+                    del self._entries[key]
+                elif time.monotonic() >= expires_at:
+                    self.stats["expired"] += 1
+                    del self._entries[key]
+                else:
+                    self.stats["hits"] += 1
+                    self._entries.move_to_end(key)
+                    return value
+            self.stats["misses"] += 1
+            # Stamp taken before computing: a write during the computation leaves the entry stale
+            stamp = self._stamp(depends_on)
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (value, stamp, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evicted"] += 1
+        return value
+
+    def snapshot_stats(self):
+        with self._lock:
+            stats = dict(self.stats, size=len(self._entries))
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+read_cache = ReadCache()
+
+
+def cached_read(name, params, compute, depends_on=()):
+    return read_cache.get(name, params, compute, depends_on)
+
+
+def invalidate_reads(*entities):
+    """Mark cached reads built from ``entities`` (see module docstring) as stale."""
+    read_cache.invalidate(*entities)
+
+
+def read_cache_stats():
+    """Hit/miss/eviction counters, current size and hit rate of the read cache."""
+    return read_cache.snapshot_stats()
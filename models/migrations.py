@@ -0,0 +1,518 @@
+# models/migrations.py
+"""Versioned schema migrations.
+
+Each migration is a numbered step recorded in the ``schema_version`` table.
+``run_migrations`` applies the pending ones in order, each in its own
+transaction, the first time it is called in a process; later calls return
+immediately without touching the database.
+
+To ship a schema change, append a new ``(version, name, function)`` entry to
+``MIGRATIONS``. Never renumber or edit a migration that has already shipped.
+"""
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from sqlalchemy import text
+
+from models.models import (
+    Base, fold_search_text, User, MenuItem, OrderItem, MenuItemSales, DailySales, DailyItemSales, OrderStatusEvent,
+)
+
+
+_migrated_engines = set()
+_migration_lock = threading.Lock()
+
+
+# ========== MIGRATION HELPERS ==========
+def _column_names(conn, table):
+    return [row[1] for row in conn.execute(text(f"PRAGMA table_info({table})")).fetchall()]
+
+
+def backfill_order_items(conn):
+    """Copy legacy Order.items JSON blobs into order_items for orders that have no lines yet."""
+    batch = []
+    result = conn.execute(text(
+        "SELECT id, items FROM orders WHERE id NOT IN (SELECT DISTINCT order_id FROM order_items)"
+    ))
+    for order_id, items_json in result:
+        try:
+            items = json.loads(items_json) if items_json else []
+        except Exception:
+            continue
+        for item in items if isinstance(items, list) else []:
+            row = OrderItem.row_from_cart_item(order_id, item)
+            if row:
+                batch.append(row)
+        if len(batch) >= 1000:
+            conn.execute(OrderItem.__table__.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(OrderItem.__table__.insert(), batch)
+
+
+def rebuild_menu_item_sales(conn):
+    """Recompute menu_item_sales from order_items of non-cancelled orders."""
+    conn.execute(text("DELETE FROM menu_item_sales"))
+    conn.execute(text(
+        "INSERT INTO menu_item_sales (menu_item_id, total_orders, quantity_sold, revenue, updated_at) "
+        "SELECT oi.menu_item_id, COUNT(oi.id), SUM(oi.quantity), SUM(oi.quantity * oi.unit_price), :now "
+        "FROM order_items oi JOIN orders o ON o.id = oi.order_id "
+        "WHERE oi.menu_item_id IS NOT NULL AND o.status != 'cancelled' "
+        "GROUP BY oi.menu_item_id"
+    ), {"now": datetime.now()})
+
+
+def rebuild_daily_sales(conn):
+    """Recompute the daily_sales / daily_item_sales rollups from orders and order_items."""
+    conn.execute(text("DELETE FROM daily_sales"))
+    conn.execute(text("DELETE FROM daily_item_sales"))
+    conn.execute(text(
+        "INSERT INTO daily_sales (day, status, order_count, revenue) "
+        "SELECT date(created_at), COALESCE(status, 'placed'), COUNT(*), SUM(total_amount) "
+        "FROM orders WHERE created_at IS NOT NULL "
+        "GROUP BY date(created_at), COALESCE(status, 'placed')"
+    ))
+    conn.execute(text(
+        "INSERT INTO daily_item_sales (day, menu_item_id, name, quantity, revenue) "
+        "SELECT date(o.created_at), oi.menu_item_id, MAX(oi.name), SUM(oi.quantity), SUM(oi.quantity * oi.unit_price) "
+        "FROM order_items oi JOIN orders o ON o.id = oi.order_id "
+        "WHERE oi.menu_item_id IS NOT NULL AND o.status != 'cancelled' AND o.created_at IS NOT NULL "
+        "GROUP BY date(o.created_at), oi.menu_item_id"
+    ))
+
+
+def create_declared_indexes(conn):
+    """Create every index declared in __table_args__ that the database is missing."""
+    existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type='index'"))}
+
+    if "uq_favorites_user_item" not in existing:
+        # Drop duplicate favorites left by the old check-then-insert path before enforcing uniqueness
+        conn.execute(text(
+            "DELETE FROM favorites WHERE id NOT IN "
+            "(SELECT MIN(id) FROM favorites GROUP BY user_id, menu_item_id)"
+        ))
+
+    # Superseded by the covering indexes on order_items
+    conn.execute(text("DROP INDEX IF EXISTS ix_order_items_order_id"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_order_items_menu_item_id"))
+    # Superseded by the folded search columns and the id-ordered directory paging
+    conn.execute(text("DROP INDEX IF EXISTS ix_users_full_name_normalized"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_users_role_created_at"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_users_is_active_created_at"))
+
+    for table in Base.metadata.sorted_tables:
+        columns = set(_column_names(conn, table.name))
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            if any(column.name not in columns for column in index.columns):
+                continue  # Column added by a later migration, which creates the index itself
+            index.create(conn)
+
+
+def backfill_customer_order_numbers(conn):
+    """Number each customer's orders 1, 2, 3... by (created_at, id)."""
+    rows = conn.execute(text(
+        "SELECT id, ROW_NUMBER() OVER (PARTITION BY customer_id ORDER BY created_at, id) FROM orders"
+    )).fetchall()
+    if rows:
+        conn.execute(
+            text("UPDATE orders SET customer_order_number = :number WHERE id = :id"),
+            [{"id": order_id, "number": number} for order_id, number in rows],
+        )
+
+
+def backfill_order_status_events(conn):
+    """Derive order_status_events from the per-status timestamps of orders that have none.
+
+    Actors come from the ORDER_STATUS_UPDATED audit entries still in the live
+    table ("Order #<id> : <from> → <to>"); placements are attributed to the customer.
+    """
+    actors = {}
+    result = conn.execute(text(
+        "SELECT a.details, a.user_id, u.role FROM audit_logs a LEFT JOIN users u ON u.id = a.user_id "
+        "WHERE a.action = 'ORDER_STATUS_UPDATED'"
+    ))
+    for details, user_id, role in result:
+        match = re.search(r"Order #(\d+) : .+? (?:→|->) (.+)$", details or "")
+        if match:
+            actors[(int(match.group(1)), match.group(2).strip().lower())] = (user_id, role)
+
+    batch = []
+    result = conn.execute(text(
+        "SELECT id, customer_id, COALESCE(placed_at, created_at), preparing_at, out_for_delivery_at, "
+        "delivered_at, cancelled_at FROM orders "
+        "WHERE id NOT IN (SELECT DISTINCT order_id FROM order_status_events)"
+    ))
+    statuses = ("placed", "preparing", "out for delivery", "delivered", "cancelled")
+    for order_id, customer_id, *stamps in result:
+        previous = None
+        for status, at in zip(statuses, stamps):
+            if at is None:
+                continue
+            if isinstance(at, str):
+                at = datetime.fromisoformat(at)
+            if previous is None:
+                actor_id, actor_role = customer_id, "customer"
+            else:
+                actor_id, actor_role = actors.get((order_id, status), (None, None))
+            batch.append({
+                "order_id": order_id, "from_status": previous, "to_status": status,
+                "actor_id": actor_id, "actor_role": actor_role, "at": at,
+            })
+            previous = status
+        if len(batch) >= 1000:
+            conn.execute(OrderStatusEvent.__table__.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(OrderStatusEvent.__table__.insert(), batch)
+
+
+def rebuild_menu_search_index(conn):
+    """Repopulate menu_items_fts from menu_items (external-content 'rebuild')."""
+    conn.execute(text("INSERT INTO menu_items_fts(menu_items_fts) VALUES ('rebuild')"))
+
+
+# ========== MIGRATIONS ==========
+# Schema of the last release before versioned migrations, frozen: later
+# migrations add to it, so it must not follow the live models.
+_BASELINE_TABLES = [
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER NOT NULL,
+        email VARCHAR NOT NULL,
+        password VARCHAR NOT NULL,
+        email_verified INTEGER,
+        verification_token_hash VARCHAR,
+        verification_token_expires_at DATETIME,
+        verification_sent_at DATETIME,
+        reset_token_hash VARCHAR,
+        reset_token_expires_at DATETIME,
+        reset_sent_at DATETIME,
+        reset_resend_count INTEGER,
+        full_name VARCHAR NOT NULL,
+        role VARCHAR NOT NULL,
+        address VARCHAR,
+        contact VARCHAR,
+        profile_picture VARCHAR,
+        pic_type VARCHAR,
+        is_active INTEGER,
+        failed_login_attempts INTEGER,
+        locked_until DATETIME,
+        last_login DATETIME,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (email)
+    )""",
+    """CREATE TABLE IF NOT EXISTS pending_signups (
+        id INTEGER NOT NULL,
+        email VARCHAR NOT NULL,
+        password VARCHAR NOT NULL,
+        full_name VARCHAR NOT NULL,
+        role VARCHAR NOT NULL,
+        verification_token_hash VARCHAR NOT NULL,
+        verification_token_expires_at DATETIME NOT NULL,
+        verification_sent_at DATETIME,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        UNIQUE (email)
+    )""",
+    """CREATE TABLE IF NOT EXISTS menu_items (
+        id INTEGER NOT NULL,
+        name VARCHAR NOT NULL,
+        description TEXT,
+        price FLOAT NOT NULL,
+        stock INTEGER,
+        image VARCHAR,
+        image_type VARCHAR,
+        is_available INTEGER,
+        created_by INTEGER,
+        created_at DATETIME,
+        category VARCHAR,
+        calories INTEGER,
+        ingredients TEXT,
+        recipe TEXT,
+        allergens VARCHAR,
+        is_on_sale INTEGER,
+        sale_percentage INTEGER,
+        PRIMARY KEY (id),
+        FOREIGN KEY(created_by) REFERENCES users (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS orders (
+        id INTEGER NOT NULL,
+        customer_id INTEGER NOT NULL,
+        customer_name VARCHAR NOT NULL,
+        delivery_address VARCHAR NOT NULL,
+        contact_number VARCHAR NOT NULL,
+        total_amount FLOAT NOT NULL,
+        items TEXT NOT NULL,
+        status VARCHAR,
+        payment_method VARCHAR,
+        created_at DATETIME,
+        placed_at DATETIME,
+        preparing_at DATETIME,
+        out_for_delivery_at DATETIME,
+        delivered_at DATETIME,
+        cancelled_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(customer_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS audit_logs (
+        id INTEGER NOT NULL,
+        user_id INTEGER,
+        action VARCHAR NOT NULL,
+        details TEXT,
+        timestamp DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS favorites (
+        id INTEGER NOT NULL,
+        user_id INTEGER NOT NULL,
+        menu_item_id INTEGER NOT NULL,
+        created_at DATETIME,
+        PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES users (id),
+        FOREIGN KEY(menu_item_id) REFERENCES menu_items (id)
+    )""",
+]
+
+
+def _create_tables(conn):
+    for ddl in _BASELINE_TABLES:
+        conn.execute(text(ddl))
+
+
+def _add_legacy_columns(conn):
+    """Columns added to menu_items/orders/users/pending_signups before versioned migrations existed."""
+    columns = _column_names(conn, "menu_items")
+    if "stock" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN stock INTEGER DEFAULT 0"))
+    if "calories" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN calories INTEGER DEFAULT 0"))
+    if "ingredients" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN ingredients TEXT DEFAULT ''"))
+    if "recipe" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN recipe TEXT DEFAULT ''"))
+    if "allergens" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN allergens STRING DEFAULT ''"))
+    if "is_on_sale" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN is_on_sale INTEGER DEFAULT 0"))
+    if "sale_percentage" not in columns:
+        conn.execute(text("ALTER TABLE menu_items ADD COLUMN sale_percentage INTEGER DEFAULT 0"))
+
+    columns = _column_names(conn, "orders")
+    for col in ["placed_at", "preparing_at", "out_for_delivery_at", "delivered_at", "cancelled_at"]:
+        if col not in columns:
+            conn.execute(text(f"ALTER TABLE orders ADD COLUMN {col} DATETIME DEFAULT NULL"))
+    if "payment_method" not in columns:
+        conn.execute(text("ALTER TABLE orders ADD COLUMN payment_method STRING DEFAULT 'Cash on Delivery'"))
+
+    user_columns = _column_names(conn, "users")
+    if "email_verified" not in user_columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN email_verified INTEGER DEFAULT 1"))
+        conn.execute(text("UPDATE users SET email_verified = 1"))
+    for col, ddl in [
+        ("verification_token_hash", "STRING DEFAULT NULL"),
+        ("verification_token_expires_at", "DATETIME DEFAULT NULL"),
+        ("verification_sent_at", "DATETIME DEFAULT NULL"),
+        ("reset_token_hash", "STRING DEFAULT NULL"),
+        ("reset_token_expires_at", "DATETIME DEFAULT NULL"),
+        ("reset_sent_at", "DATETIME DEFAULT NULL"),
+        ("reset_resend_count", "INTEGER DEFAULT 0"),
+    ]:
+        if col not in user_columns:
+            conn.execute(text(f"ALTER TABLE users ADD COLUMN {col} {ddl}"))
+
+    # Align pending_signups password column naming across versions
+    pending_columns = _column_names(conn, "pending_signups")
+    if "password" not in pending_columns and "password_hash" in pending_columns:
+        conn.execute(text("ALTER TABLE pending_signups ADD COLUMN password STRING DEFAULT ''"))
+        conn.execute(text("UPDATE pending_signups SET password = password_hash WHERE password IS NULL OR password = ''"))
+
+
+def _seed_defaults(conn):
+    """Create the default accounts from .env and sample menu items on a brand-new database."""
+    if conn.execute(text("SELECT 1 FROM users LIMIT 1")).first() is not None:
+        return
+
+    from core.auth import hash_password
+
+    # Core inserts of the columns that exist at this version (the ORM would also
+    # write columns added by later migrations); Python-side defaults still apply
+    conn.execute(User.__table__.insert(), [
+        {
+            "email": os.getenv("ADMIN_EMAIL"),
+            "password": hash_password(os.getenv("ADMIN_PASSWORD")),
+            "email_verified": 1,
+            "full_name": 'System Administrator',
+            "role": 'admin',
+        },
+        {
+            "email": os.getenv("CUSTOMER_EMAIL"),
+            "password": hash_password(os.getenv("CUSTOMER_PASSWORD")),
+            "email_verified": 1,
+            "full_name": 'John Doe',
+            "role": 'customer',
+        },
+        {
+            "email": os.getenv("OWNER_EMAIL"),
+            "password": hash_password(os.getenv("OWNER_PASSWORD")),
+            "email_verified": 1,
+            "full_name": 'Restaurant Owner',
+            "role": 'owner',
+        },
+    ])
+    conn.execute(MenuItem.__table__.insert(), [
+        {
+            "name": 'Lechon',
+            "description": 'Classic pinoy lechon',
+            "price": 240.0,
+            "stock": 20,
+            "image": '🐷',
+            "image_type": 'emoji',
+            "category": 'Mains',
+        },
+        {
+            "name": 'Sisig',
+            "description": 'Classic Sisig',
+            "price": 140.0,
+            "stock": 25,
+            "image": '🍳',
+            "image_type": 'emoji',
+            "category": 'Appetizers',
+        },
+    ])
+
+
+def _create_menu_search_index(conn):
+    """FTS5 index over menu name/description/ingredients/category, kept in sync by triggers."""
+    try:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS menu_items_fts USING fts5("
+            "name, description, ingredients, category, "
+            "content='menu_items', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+    except Exception as e:
+        if "fts5" not in str(e).lower():
+            raise
+        return  # SQLite built without FTS5: search falls back to LIKE
+
+    columns = "name, description, ingredients, category"
+    new_values = "new.id, new.name, new.description, new.ingredients, new.category"
+    old_values = "'delete', old.id, old.name, old.description, old.ingredients, old.category"
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS menu_items_fts_ai AFTER INSERT ON menu_items BEGIN "
+        f"INSERT INTO menu_items_fts(rowid, {columns}) VALUES ({new_values}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS menu_items_fts_ad AFTER DELETE ON menu_items BEGIN "
+        f"INSERT INTO menu_items_fts(menu_items_fts, rowid, {columns}) VALUES ({old_values}); END"
+    ))
+    conn.execute(text(
+        f"CREATE TRIGGER IF NOT EXISTS menu_items_fts_au "
+        f"AFTER UPDATE OF name, description, ingredients, category ON menu_items BEGIN "
+        f"INSERT INTO menu_items_fts(menu_items_fts, rowid, {columns}) VALUES ({old_values}); "
+        f"INSERT INTO menu_items_fts(rowid, {columns}) VALUES ({new_values}); END"
+    ))
+    rebuild_menu_search_index(conn)
+
+
+def _add_customer_order_number(conn):
+    if "customer_order_number" not in _column_names(conn, "orders"):
+        conn.execute(text("ALTER TABLE orders ADD COLUMN customer_order_number INTEGER DEFAULT NULL"))
+    backfill_customer_order_numbers(conn)
+    create_declared_indexes(conn)
+
+
+def _add_user_search_columns(conn):
+    columns = _column_names(conn, "users")
+    for col in ["search_name", "search_email"]:
+        if col not in columns:
+            conn.execute(text(f"ALTER TABLE users ADD COLUMN {col} VARCHAR DEFAULT NULL"))
+    batch = [
+        {"user_id": user_id, "search_name": fold_search_text(full_name), "search_email": fold_search_text(email)}
+        for user_id, full_name, email in conn.execute(text("SELECT id, full_name, email FROM users"))
+    ]
+    if batch:
+        conn.execute(text(
+            "UPDATE users SET search_name = :search_name, search_email = :search_email WHERE id = :user_id"
+        ), batch)
+    create_declared_indexes(conn)
+
+
+def _create_order_items(conn):
+    Base.metadata.create_all(conn, tables=[OrderItem.__table__])
+    backfill_order_items(conn)
+
+
+def _create_menu_item_sales(conn):
+    Base.metadata.create_all(conn, tables=[MenuItemSales.__table__])
+    rebuild_menu_item_sales(conn)
+
+
+def _create_daily_sales(conn):
+    Base.metadata.create_all(conn, tables=[DailySales.__table__, DailyItemSales.__table__])
+    rebuild_daily_sales(conn)
+
+
+def _create_order_status_events(conn):
+    Base.metadata.create_all(conn, tables=[OrderStatusEvent.__table__])
+    backfill_order_status_events(conn)
+
+
+MIGRATIONS = [
+    (1, "create_tables", _create_tables),
+    (2, "legacy_columns", _add_legacy_columns),
+    (3, "backfill_order_items", _create_order_items),
+    (4, "seed_menu_item_sales", _create_menu_item_sales),
+    (5, "declared_indexes", create_declared_indexes),
+    (6, "seed_defaults", _seed_defaults),
+    (7, "menu_search_index", _create_menu_search_index),
+    (8, "customer_order_number", _add_customer_order_number),
+    (9, "daily_sales_rollups", _create_daily_sales),
+    (10, "order_status_events", _create_order_status_events),
+    (11, "user_directory_indexes", create_declared_indexes),
+    (12, "user_search_columns", _add_user_search_columns),
+]
+
+
+# ========== RUNNER ==========
+def get_schema_version(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at DATETIME NOT NULL)"
+    ))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+
+def run_migrations(engine):
+    """Apply pending migrations once per process; returns the names applied by this call."""
+    key = str(engine.url)
+    if key in _migrated_engines:
+        return []
+
+    with _migration_lock:
+        if key in _migrated_engines:
+            return []
+
+        with engine.begin() as conn:
+            current = get_schema_version(conn)
+
+        applied = []
+        for version, name, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            with engine.begin() as conn:
+                migrate(conn)
+                conn.execute(
+                    text("INSERT INTO schema_version (version, name, applied_at) VALUES (:v, :n, :at)"),
+                    {"v": version, "n": name, "at": datetime.now()},
+                )
+            applied.append(name)
+
+        _migrated_engines.add(key)
+        return applied
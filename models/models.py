@@ -1,26 +1,34 @@
 # core/models.py
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text, DateTime, ForeignKey, text
+from sqlalchemy import Column, Integer, String, Float, Text, Date, DateTime, ForeignKey, Index, func
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship, scoped_session
+from sqlalchemy.orm import sessionmaker, relationship, scoped_session, validates
 from datetime import datetime
 from dotenv import load_dotenv
-import os
+from models.storage import create_storage_engine, create_read_engine
 
 # Load .env file
 load_dotenv()
 
 Base = declarative_base()
-DB_FILE = "food_delivery.db"
-
-# Thread-safe session
-engine = create_engine(
-    f'sqlite:///{DB_FILE}',
-    connect_args={'check_same_thread': False, 'timeout': 10.0},
-    echo=False
-)
+
+# Thread-safe session; engine settings come from FOOD_DB_* env vars (see models/storage.py)
+engine = create_storage_engine()
 session_factory = sessionmaker(bind=engine, expire_on_commit=False)
 Session = scoped_session(session_factory)
 
+# Read-only pool for dashboards/analytics so large reads never contend with checkout writes
+read_engine = create_read_engine(engine)
+ReadSession = scoped_session(sessionmaker(bind=read_engine, expire_on_commit=False))
+
+
+def fold_search_text(value):
+    """Trimmed, case-folded form of a name/email used for prefix search.
+
+    SQLite's lower() only folds ASCII, so the folded text is computed in
+    Python and stored next to the original column.
+    """
+    return (value or "").strip().casefold()
+
 
 class User(Base):
     __tablename__ = 'users'
@@ -47,12 +55,30 @@ class User(Base):
     locked_until = Column(DateTime, nullable=True)
     last_login = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.now)
+    # fold_search_text(full_name/email), kept in sync by _fold_search_columns
+    search_name = Column(String, nullable=True)
+    search_email = Column(String, nullable=True)
+
+    __table_args__ = (
+        Index('ix_users_email_normalized', func.lower(func.trim(email))),
+        Index('ix_users_search_name', search_name),
+        Index('ix_users_search_email', search_email),
+        Index('ix_users_created_at', created_at),
+        Index('ix_users_role', role),
+        Index('ix_users_is_active', is_active),
+        Index('ix_users_locked_until', locked_until),
+    )
 
     # Relationships
     orders = relationship("Order", back_populates="customer")
     menu_items = relationship("MenuItem", back_populates="creator")
     audit_logs = relationship("AuditLog", back_populates="user")
 
+    @validates("full_name", "email")
+    def _fold_search_columns(self, key, value):
+        setattr(self, "search_name" if key == "full_name" else "search_email", fold_search_text(value))
+        return value
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -85,6 +111,10 @@ class PendingSignup(Base):
     verification_sent_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.now)
 
+    __table_args__ = (
+        Index('ix_pending_signups_email_normalized', func.lower(func.trim(email))),
+    )
+
 
 class MenuItem(Base):
     __tablename__ = 'menu_items'
@@ -107,6 +137,11 @@ class MenuItem(Base):
     is_on_sale = Column(Integer, default=0)
     sale_percentage = Column(Integer, default=0)
 
+    __table_args__ = (
+        # Covers the browse listing: WHERE is_available [AND category] ORDER BY category, name, id
+        Index('ix_menu_items_available_category_name', is_available, category, name, id),
+    )
+
     # Relationships
     creator = relationship("User", back_populates="menu_items")
 
@@ -137,6 +172,7 @@ class Order(Base):
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     customer_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    customer_order_number = Column(Integer, nullable=True)  # 1, 2, 3... per customer, assigned by create_order
     customer_name = Column(String, nullable=False)
     delivery_address = Column(String, nullable=False)
     contact_number = Column(String, nullable=False)
@@ -151,14 +187,23 @@ class Order(Base):
     delivered_at = Column(DateTime, nullable=True)
     cancelled_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        Index('ix_orders_customer_created', customer_id, created_at),
+        Index('ix_orders_status_created', status, created_at),
+        Index('ix_orders_created_at', created_at),
+        Index('uq_orders_customer_number', customer_id, customer_order_number, unique=True),
+    )
+
     # Relationships
     customer = relationship("User", back_populates="orders")
+    line_items = relationship("OrderItem", back_populates="order")
 
     def to_dict(self):
         import json
         return {
             'id': self.id,
             'customer_id': self.customer_id,
+            'customer_order_number': self.customer_order_number,
             'customer_name': self.customer_name,
             'delivery_address': self.delivery_address,
             'contact_number': self.contact_number,
@@ -175,6 +220,133 @@ class Order(Base):
         }
 
 
+class OrderItem(Base):
+    __tablename__ = 'order_items'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, ForeignKey('orders.id'), nullable=False)
+    menu_item_id = Column(Integer, ForeignKey('menu_items.id'), nullable=True)
+    name = Column(String, nullable=False, default='')  # snapshot at order time
+    unit_price = Column(Float, nullable=False, default=0.0)
+    quantity = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Covering indexes for order -> lines joins and per-item aggregates
+        Index('ix_order_items_order_covering', order_id, menu_item_id, quantity, unit_price),
+        Index('ix_order_items_menu_item_covering', menu_item_id, order_id, quantity, unit_price),
+    )
+
+    # Relationships
+    order = relationship("Order", back_populates="line_items")
+
+    @staticmethod
+    def row_from_cart_item(order_id, item):
+        """Normalize one cart/JSON line item into an order_items row dict (or None)."""
+        if not isinstance(item, dict):
+            return None
+        try:
+            quantity = int(item.get("quantity", 0))
+            unit_price = float(item.get("price", 0))
+        except Exception:
+            return None
+        menu_item_id = item.get("id")
+        if not isinstance(menu_item_id, int):
+            try:
+                menu_item_id = int(menu_item_id)
+            except Exception:
+                menu_item_id = None
+        return {
+            'order_id': order_id,
+            'menu_item_id': menu_item_id,
+            'name': item.get("name") or (f"Item #{menu_item_id}" if menu_item_id else "Unknown"),
+            'unit_price': unit_price,
+            'quantity': quantity,
+        }
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'menu_item_id': self.menu_item_id,
+            'name': self.name,
+            'unit_price': self.unit_price,
+            'quantity': self.quantity
+        }
+
+
+class OrderStatusEvent(Base):
+    """One status change of an order: who moved it from which status to which, and when.
+
+    ``from_status`` is NULL for the placement event written by create_order.
+    """
+    __tablename__ = 'order_status_events'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    order_id = Column(Integer, ForeignKey('orders.id'), nullable=False)
+    from_status = Column(String, nullable=True)
+    to_status = Column(String, nullable=False)
+    actor_id = Column(Integer, ForeignKey('users.id'), nullable=True)
+    actor_role = Column(String, nullable=True)  # role of the actor when the change was made
+    at = Column(DateTime, nullable=False, default=datetime.now)
+
+    __table_args__ = (
+        Index('ix_order_status_events_to_status_at', to_status, at),
+        Index('ix_order_status_events_order_id', order_id),
+    )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'order_id': self.order_id,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'actor_id': self.actor_id,
+            'actor_role': self.actor_role,
+            'at': self.at.isoformat() if self.at else None
+        }
+
+
+class MenuItemSales(Base):
+    """Running sales totals per menu item (non-cancelled orders only)."""
+    __tablename__ = 'menu_item_sales'
+
+    menu_item_id = Column(Integer, ForeignKey('menu_items.id'), primary_key=True)
+    total_orders = Column(Integer, nullable=False, default=0)
+    quantity_sold = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)
+
+    def to_dict(self):
+        return {
+            'menu_item_id': self.menu_item_id,
+            'total_orders': self.total_orders,
+            'quantity_sold': self.quantity_sold,
+            'revenue': self.revenue,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class DailySales(Base):
+    """Order count and revenue per (order date, current status); moved between statuses on update."""
+    __tablename__ = 'daily_sales'
+
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class DailyItemSales(Base):
+    """Quantity and revenue per (order date, menu item) for non-cancelled orders."""
+    __tablename__ = 'daily_item_sales'
+
+    day = Column(Date, primary_key=True)
+    menu_item_id = Column(Integer, ForeignKey('menu_items.id'), primary_key=True)
+    name = Column(String, nullable=False, default='')  # latest line-item name
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
 class AuditLog(Base):
     __tablename__ = 'audit_logs'
 
@@ -184,6 +356,12 @@ class AuditLog(Base):
     details = Column(Text)
     timestamp = Column(DateTime, default=datetime.now)
 
+    __table_args__ = (
+        Index('ix_audit_logs_timestamp', timestamp),
+        Index('ix_audit_logs_action_timestamp', action, timestamp),
+        Index('ix_audit_logs_user_id', user_id),
+    )
+
     # Relationships
     user = relationship("User", back_populates="audit_logs")
 
@@ -205,6 +383,11 @@ class Favorite(Base):
     menu_item_id = Column(Integer, ForeignKey('menu_items.id'), nullable=False)
     created_at = Column(DateTime, default=datetime.now)
 
+    __table_args__ = (
+        Index('uq_favorites_user_item', user_id, menu_item_id, unique=True),
+        Index('ix_favorites_menu_item_id', menu_item_id),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -215,156 +398,9 @@ class Favorite(Base):
 
 
 def init_database():
-    """Initialize database and create default users from .env"""
-    Base.metadata.create_all(engine)
-
-    # Lightweight migration for existing DBs
-    with engine.connect() as conn:
-        # Migrate: Add stock column to menu_items if it doesn't exist
-        result = conn.execute(text("PRAGMA table_info(menu_items)"))
-        columns = [row[1] for row in result.fetchall()]
-        if "stock" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN stock INTEGER DEFAULT 0"))
-        
-        # Migrate: Add nutrition and recipe columns to menu_items if they don't exist
-        if "calories" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN calories INTEGER DEFAULT 0"))
-        if "ingredients" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN ingredients TEXT DEFAULT ''"))
-        if "recipe" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN recipe TEXT DEFAULT ''"))
-        if "allergens" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN allergens STRING DEFAULT ''"))
-        
-        # Migrate: Add sale columns to menu_items if they don't exist
-        sale_columns_added = False
-        if "is_on_sale" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN is_on_sale INTEGER DEFAULT 0"))
-            sale_columns_added = True
-        if "sale_percentage" not in columns:
-            conn.execute(text("ALTER TABLE menu_items ADD COLUMN sale_percentage INTEGER DEFAULT 0"))
-            sale_columns_added = True
-        
-        if sale_columns_added:
-            conn.commit()
-
-        # Migrate: Add timestamp columns to orders if they don't exist
-        result = conn.execute(text("PRAGMA table_info(orders)"))
-        columns = [row[1] for row in result.fetchall()]
-        
-        timestamp_columns = ["placed_at", "preparing_at", "out_for_delivery_at", "delivered_at", "cancelled_at"]
-        for col in timestamp_columns:
-            if col not in columns:
-                conn.execute(text(f"ALTER TABLE orders ADD COLUMN {col} DATETIME DEFAULT NULL"))
-        
-        # Migrate: Add payment_method column to orders if it doesn't exist
-        if "payment_method" not in columns:
-            conn.execute(text("ALTER TABLE orders ADD COLUMN payment_method STRING DEFAULT 'Cash on Delivery'"))
-            conn.commit()
-
-        # Migrate: Add verification/reset columns to users if they don't exist
-        result = conn.execute(text("PRAGMA table_info(users)"))
-        user_columns = [row[1] for row in result.fetchall()]
-
-        email_verified_added = False
-        if "email_verified" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN email_verified INTEGER DEFAULT 1"))
-            email_verified_added = True
-
-        if "verification_token_hash" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN verification_token_hash STRING DEFAULT NULL"))
-
-        if "verification_token_expires_at" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN verification_token_expires_at DATETIME DEFAULT NULL"))
-
-        if "verification_sent_at" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN verification_sent_at DATETIME DEFAULT NULL"))
-
-        if "reset_token_hash" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_hash STRING DEFAULT NULL"))
-
-        if "reset_token_expires_at" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN reset_token_expires_at DATETIME DEFAULT NULL"))
-
-        if "reset_sent_at" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN reset_sent_at DATETIME DEFAULT NULL"))
-
-        if "reset_resend_count" not in user_columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN reset_resend_count INTEGER DEFAULT 0"))
-
-        if email_verified_added:
-            conn.execute(text("UPDATE users SET email_verified = 1"))
-
-        # Migrate: Align pending_signups password column naming across versions
-        result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table' AND name='pending_signups'"))
-        has_pending_signups = result.fetchone() is not None
-        if has_pending_signups:
-            result = conn.execute(text("PRAGMA table_info(pending_signups)"))
-            pending_columns = [row[1] for row in result.fetchall()]
-
-            if "password" not in pending_columns and "password_hash" in pending_columns:
-                conn.execute(text("ALTER TABLE pending_signups ADD COLUMN password STRING DEFAULT ''"))
-                conn.execute(text("UPDATE pending_signups SET password = password_hash WHERE password IS NULL OR password = ''"))
-
-        conn.commit()
-
-    session = Session()
-    try:
-        if session.query(User).count() == 0:
-            from core.auth import hash_password
-
-            admin = User(
-                email=os.getenv("ADMIN_EMAIL"),
-                password=hash_password(os.getenv("ADMIN_PASSWORD")),
-                email_verified=1,
-                full_name='System Administrator',
-                role='admin'
-            )
-
-            customer = User(
-                email=os.getenv("CUSTOMER_EMAIL"),
-                password=hash_password(os.getenv("CUSTOMER_PASSWORD")),
-                email_verified=1,
-                full_name='John Doe',
-                role='customer'
-            )
-
-            owner = User(
-                email=os.getenv("OWNER_EMAIL"),
-                password=hash_password(os.getenv("OWNER_PASSWORD")),
-                email_verified=1,
-                full_name='Restaurant Owner',
-                role='owner'
-            )
-
-            session.add_all([admin, customer, owner])
-            session.commit()
-
-            # Sample menu items
-            lechon = MenuItem(
-                name='Lechon',
-                description='Classic pinoy lechon',
-                price=240.0,
-                stock=20,
-                image='🐷',
-                image_type='emoji',
-                category='Mains'
-            )
-
-            sisig = MenuItem(
-                name='Sisig',
-                description='Classic Sisig',
-                price=140.0,
-                stock=25,
-                image='🍳',
-                image_type='emoji',
-                category='Appetizers'
-            )
-
-            session.add_all([lechon, sisig])
-            session.commit()
-    finally:
-        session.close()
+    """Bring the schema up to date and seed defaults (runs once per process)."""
+    from models.migrations import run_migrations
+    run_migrations(engine)
 
 
 def get_session():
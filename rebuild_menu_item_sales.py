@@ -0,0 +1,18 @@
+"""Recompute the sales counters (menu_item_sales) and daily rollups (daily_sales, daily_item_sales) from order history"""
+from core.database import rebuild_menu_item_sales, rebuild_daily_sales
+from models.models import Session, MenuItemSales, DailySales
+
+rebuild_menu_item_sales()
+rebuild_daily_sales()
+
+session = Session()
+
+try:
+    rows = session.query(MenuItemSales).order_by(MenuItemSales.quantity_sold.desc()).all()
+    print(f"\n✓ Rebuilt sales counters for {len(rows)} menu item(s)\n")
+    for row in rows:
+        print(f"Item #{row.menu_item_id}: {row.total_orders} order(s), {row.quantity_sold} sold, ₱{row.revenue:.2f}")
+    days = session.query(DailySales.day).distinct().count()
+    print(f"\n✓ Rebuilt daily sales rollups for {days} day(s)")
+finally:
+    session.close()
@@ -12,7 +12,7 @@ from utils import (
     TEXT_DARK,
     show_snackbar,
 )
-from .fraud_risk_data import RULES, _compute_risk_data, _normalize_text, _time_ago
+from .fraud_risk_data import RULES, get_risk_data, _time_ago
 
 
 def _build_kpi_card(title: str, value_ref: ft.Text, tone: str = "default"):
@@ -63,6 +63,27 @@ def _set_sparkline(card: ft.Container, values):
     ]
 
 
+# Longer trend windows are merged into at most this many bars/sparkline points
+MAX_CHART_POINTS = 14
+
+
+def _bucket_daily_series(daily_series, max_points=MAX_CHART_POINTS):
+    """Sum consecutive days so 30/90-day windows fit the sparklines and bar charts."""
+    size = max(1, -(-len(daily_series) // max_points))
+    if size == 1:
+        return daily_series
+    buckets = []
+    for start in range(0, len(daily_series), size):
+        chunk = daily_series[start:start + size]
+        bucket = {
+            key: sum(point[key] for point in chunk)
+            for key in ("high", "medium", "low", "total", "cancelled", "delivered")
+        }
+        bucket["label"] = chunk[0]["day"].strftime("%m/%d")
+        buckets.append(bucket)
+    return buckets
+
+
 def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None):
     threshold_options = {
         "Low (30+)": 30,
@@ -70,6 +91,12 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
         "High (80+)": 80,
     }
     threshold_state = {"label": "Medium (50+)"}
+    window_options = {
+        "Last 7 days": 7,
+        "Last 30 days": 30,
+        "Last 90 days": 90,
+    }
+    window_state = {"label": "Last 7 days"}
     rules_state = {"visible": False}
 
     summary_text = ft.Text(size=12, color="#555555")
@@ -171,25 +198,46 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
         text_style=ft.TextStyle(color=TEXT_DARK, size=12, weight=ft.FontWeight.W_500),
     )
 
+    window_dropdown = ft.Dropdown(
+        width=150,
+        value=window_state["label"],
+        options=[
+            ft.dropdown.Option(
+                key=label,
+                text=label,
+                content=ft.Text(label, color="#000000", size=13, weight=ft.FontWeight.W_500),
+            )
+            for label in window_options.keys()
+        ],
+        bgcolor=FIELD_BG,
+        fill_color=FIELD_BG,
+        filled=True,
+        color=TEXT_DARK,
+        border_color=FIELD_BORDER,
+        focused_border_color=ACCENT_PRIMARY,
+        border_radius=8,
+        text_style=ft.TextStyle(color=TEXT_DARK, size=12, weight=ft.FontWeight.W_500),
+    )
+
     def _block_user(user_id):
         disable_user(user_id, current_user["user"]["id"])
         show_snackbar(page, f"User #{user_id} blocked.")
-        refresh_data()
+        refresh_data(fresh=True)
         if on_user_change:
             on_user_change()
 
     def _unblock_user(user_id):
         enable_user(user_id, current_user["user"]["id"])
         show_snackbar(page, f"User #{user_id} unblocked.")
-        refresh_data()
+        refresh_data(fresh=True)
         if on_user_change:
             on_user_change()
 
-    def render():
-        risk_payload = _compute_risk_data()
+    def render(fresh=False):
+        risk_payload = get_risk_data(fresh=fresh, days=window_options[window_state["label"]])
         risk_entries = risk_payload["entries"]
-        daily_series = risk_payload["daily_series"]
-        all_orders = risk_payload["all_orders"]
+        daily_series = _bucket_daily_series(risk_payload["daily_series"])
+        order_totals = risk_payload["order_totals"]
         threshold_value = threshold_options[threshold_state["label"]]
         filtered = [entry for entry in risk_entries if entry["score"] >= threshold_value]
 
@@ -202,10 +250,10 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
         low_risk_text.value = str(low_count)
 
         # Use ALL orders for system-wide stats (not just flagged accounts)
-        all_cancelled = sum(1 for o in all_orders if _normalize_text(o.get("status")) == "cancelled")
-        all_delivered = sum(1 for o in all_orders if _normalize_text(o.get("status")) == "delivered")
-        all_in_progress = sum(1 for o in all_orders if _normalize_text(o.get("status")) in {"placed", "preparing", "out for delivery"})
-        total_all = len(all_orders)
+        all_cancelled = order_totals["cancelled"]
+        all_delivered = order_totals["delivered"]
+        all_in_progress = order_totals["in_progress"]
+        total_all = order_totals["total"]
         cancel_rate = (all_cancelled / total_all * 100.0) if total_all > 0 else 0.0
         cancel_rate_text.value = f"{cancel_rate:.2f}%"
 
@@ -338,14 +386,18 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
                     )
                 )
 
-    def refresh_data(e=None):
-        render()
+    def refresh_data(e=None, fresh=False):
+        render(fresh=fresh)
         page.update()
 
     def on_threshold_change(e):
         threshold_state["label"] = e.control.value or "Medium (50+)"
         refresh_data()
 
+    def on_window_change(e):
+        window_state["label"] = e.control.value or "Last 7 days"
+        refresh_data()
+
     def toggle_rules(e):
         rules_state["visible"] = not rules_state["visible"]
         rules_section.visible = rules_state["visible"]
@@ -353,13 +405,14 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
         page.update()
 
     threshold_dropdown.on_change = on_threshold_change
+    window_dropdown.on_change = on_window_change
 
     refresh_button = ft.ElevatedButton(
         "Refresh",
         icon=ft.Icons.REFRESH,
         bgcolor=ACCENT_PRIMARY,
         color=CREAM,
-        on_click=refresh_data,
+        on_click=lambda e: refresh_data(e, fresh=True),
     )
 
     help_button = ft.IconButton(
@@ -401,6 +454,7 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
                                 spacing=2,
                                 expand=True,
                             ),
+                            window_dropdown,
                             threshold_dropdown,
                             refresh_button,
                             help_button,
@@ -458,7 +512,7 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
                                                 content=ft.Column(
                                                     [
                                                         ft.Text("Delivered Orders", size=16, weight=ft.FontWeight.BOLD, color=TEXT_DARK),
-                                                        ft.Text("Daily count of successfully delivered orders (all customers).", size=11, color="#666666"),
+                                                        ft.Text("Successfully delivered orders over the selected window (all customers).", size=11, color="#666666"),
                                                         ft.Container(
                                                             content=approved_volume_chart,
                                                             bgcolor=CREAM,
@@ -477,7 +531,7 @@ def create_fraud_risk_tab(page: ft.Page, current_user: dict, on_user_change=None
                                                 content=ft.Column(
                                                     [
                                                         ft.Text("Cancellations", size=16, weight=ft.FontWeight.BOLD, color=TEXT_DARK),
-                                                        ft.Text("Daily cancelled orders across all customers.", size=11, color="#666666"),
+                                                        ft.Text("Cancelled orders over the selected window across all customers.", size=11, color="#666666"),
                                                         ft.Container(
                                                             content=cancelled_volume_chart,
                                                             bgcolor=CREAM,
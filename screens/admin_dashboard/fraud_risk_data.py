@@ -1,8 +1,10 @@
-import re
+import threading
 from datetime import datetime, timedelta
 
-from core.auth import get_all_users
-from core.database import get_all_orders, get_audit_logs
+from core.auth import list_users
+from core.database import list_orders, get_staff_cancelled_order_ids, get_daily_customer_order_counts
+from core.analytics_cache import analytics_snapshot
+from core.columnar import HAS_NUMPY, load_order_columns, daily_customer_counts, daily_totals
 
 
 RULES = [
@@ -17,6 +19,8 @@ RULES = [
 def _parse_dt(value):
     if not value:
         return None
+    if isinstance(value, datetime):
+        return value
     try:
         return datetime.fromisoformat(value)
     except Exception:
@@ -42,185 +46,300 @@ def _time_ago(dt: datetime) -> str:
     return f"{days}d ago"
 
 
-def _compute_daily_risk_series(orders, days=7):
-    today = datetime.now().date()
-    series = []
+def _daily_risk_level(orders_count, cancelled_count):
+    """Risk level ("high"/"medium"/"low"/None) of one customer's orders on one day."""
+    score = 0
+    cancellation_rate = (cancelled_count / orders_count * 100.0) if orders_count > 0 else 0.0
+    if cancelled_count >= 2:
+        score += 40
+    if cancelled_count >= 2 and cancellation_rate >= 60:
+        score += 30
+
+    if score >= 80:
+        return "high"
+    if score >= 50:
+        return "medium"
+    if score >= 30:
+        return "low"
+    return None
 
-    for idx in range(days - 1, -1, -1):
-        day = today - timedelta(days=idx)
-        day_orders = []
-        for order in orders:
-            order_dt = _parse_dt(order.get("created_at") or order.get("placed_at"))
-            if order_dt and order_dt.date() == day:
-                day_orders.append(order)
-
-        by_customer = {}
-        for order in day_orders:
-            customer_id = order.get("customer_id")
-            status = _normalize_text(order.get("status"))
-            if customer_id not in by_customer:
-                by_customer[customer_id] = {"orders": 0, "cancelled": 0}
-            by_customer[customer_id]["orders"] += 1
-            if status == "cancelled":
-                by_customer[customer_id]["cancelled"] += 1
-
-        high = 0
-        medium = 0
-        low = 0
-        cancelled_total = sum(1 for o in day_orders if _normalize_text(o.get("status")) == "cancelled")
-        delivered_total = sum(1 for o in day_orders if _normalize_text(o.get("status")) == "delivered")
-
-        for stats in by_customer.values():
-            score = 0
-            cancellation_rate = (stats["cancelled"] / stats["orders"] * 100.0) if stats["orders"] > 0 else 0.0
-            if stats["cancelled"] >= 2:
-                score += 40
-            if stats["cancelled"] >= 2 and cancellation_rate >= 60:
-                score += 30
-
-            if score >= 80:
-                high += 1
-            elif score >= 50:
-                medium += 1
-            elif score >= 30:
-                low += 1
 
+def _empty_daily_series(first_day, days):
+    series = []
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
         series.append(
             {
+                "day": day,
                 "label": day.strftime("%a"),
-                "high": high,
-                "medium": medium,
-                "low": low,
-                "total": high + medium + low,
-                "cancelled": cancelled_total,
-                "delivered": delivered_total,
+                "high": 0,
+                "medium": 0,
+                "low": 0,
+                "total": 0,
+                "cancelled": 0,
+                "delivered": 0,
             }
         )
-
     return series
 
 
-def _compute_risk_data():
-    orders = get_all_orders()
-    users = get_all_users()
-    audit_logs = get_audit_logs(limit=5000)
+def _add_daily_risk(point, orders_count, cancelled_count):
+    level = _daily_risk_level(orders_count, cancelled_count)
+    if level:
+        point[level] += 1
+        point["total"] += 1
+
+
+def _compute_daily_risk_series_columnar(columns, days=7):
+    """Vectorized _compute_daily_risk_series over an OrderColumns snapshot."""
+    first_day = datetime.now().date() - timedelta(days=days - 1)
+    series = _empty_daily_series(first_day, days)
+    totals = daily_totals(columns, first_day, days)
+    for point, cancelled, delivered in zip(series, totals["cancelled"].tolist(), totals["delivered"].tolist()):
+        point["cancelled"] = cancelled
+        point["delivered"] = delivered
+
+    # Only customers with 2+ cancellations on a day can score
+    day_offset, orders_count, cancelled_count = daily_customer_counts(columns, first_day, days)
+    risky = cancelled_count >= 2
+    for offset, orders_n, cancelled_n in zip(
+        day_offset[risky].tolist(), orders_count[risky].tolist(), cancelled_count[risky].tolist()
+    ):
+        _add_daily_risk(series[offset], orders_n, cancelled_n)
+    return series
 
-    now = datetime.now()
-    users_by_id = {u.get("id"): u for u in users if isinstance(u, dict)}
 
-    admin_cancelled_order_ids = set()
-    for log in audit_logs:
-        if log.get("action") != "ORDER_STATUS_UPDATED":
-            continue
-        details = log.get("details", "")
-        if "\u2192 cancelled" not in details and "-> cancelled" not in details.lower():
-            continue
-        match = re.search(r"Order #(\d+)", details)
-        if not match:
-            continue
-        order_id = int(match.group(1))
-        cancelling_uid = log.get("user_id")
-        if cancelling_uid is None:
-            continue
-        cancelling_user = users_by_id.get(cancelling_uid, {})
-        if cancelling_user.get("role", "customer") in {"admin", "owner"}:
-            admin_cancelled_order_ids.add(order_id)
+def _compute_daily_risk_series(days=7):
+    """Per-day cancelled/delivered totals and flagged-account counts for the last ``days`` days.
 
-    by_customer = {}
-    active_by_contact = {}
-    active_by_address = {}
-
-    for order in orders:
-        if not isinstance(order, dict):
+    One pass over a GROUP BY (order date, customer) query instead of a scan of
+    all orders per day.
+    """
+    first_day = datetime.now().date() - timedelta(days=days - 1)
+    series = _empty_daily_series(first_day, days)
+    for row in get_daily_customer_order_counts(since=first_day):
+        offset = (row["day"] - first_day).days
+        if not 0 <= offset < days:
             continue
+        point = series[offset]
+        point["cancelled"] += row["cancelled"]
+        point["delivered"] += row["delivered"]
+        _add_daily_risk(point, row["orders"], row["cancelled"])
+    return series
 
-        customer_id = order.get("customer_id")
-        status = _normalize_text(order.get("status"))
-        order_dt = _parse_dt(order.get("created_at") or order.get("placed_at"))
-
-        if customer_id not in by_customer:
-            by_customer[customer_id] = {
-                "orders": 0,
-                "cancelled": 0,
-                "cancelled_7d": 0,
-                "cancelled_24h": 0,
-                "active": 0,
-                "latest_order": None,
-            }
-
-        bucket = by_customer[customer_id]
-        bucket["orders"] += 1
-
-        if order_dt and (bucket["latest_order"] is None or order_dt > bucket["latest_order"]):
-            bucket["latest_order"] = order_dt
-
-        is_cancelled = status == "cancelled"
-        is_active_order = status in {"placed", "preparing", "out for delivery"}
-
-        if is_cancelled and order.get("id") not in admin_cancelled_order_ids:
-            bucket["cancelled"] += 1
-            if order_dt and order_dt >= now - timedelta(days=7):
-                bucket["cancelled_7d"] += 1
-            if order_dt and order_dt >= now - timedelta(hours=24):
-                bucket["cancelled_24h"] += 1
-
-        if is_active_order:
-            bucket["active"] += 1
-            contact_key = _normalize_text(order.get("contact_number"))
-            address_key = _normalize_text(order.get("delivery_address"))
-            if contact_key:
-                active_by_contact[contact_key] = active_by_contact.get(contact_key, 0) + 1
-            if address_key:
-                active_by_address[address_key] = active_by_address.get(address_key, 0) + 1
 
-    entries = []
-    for customer_id, stats in by_customer.items():
-        if not customer_id:
-            continue
+ACTIVE_STATUSES = {"placed", "preparing", "out for delivery"}
+SHARED_ACTIVE_ORDERS = 3
+_RECENT_WINDOW = timedelta(days=7)
+# Status events are stamped before their transaction commits, so one committed
+# just after the last refresh read may carry a slightly earlier timestamp
+_EVENT_CLOCK_SLACK = timedelta(minutes=5)
+
+
+class _CustomerRisk:
+    __slots__ = ("orders", "cancelled", "recent_cancels", "latest_order", "contacts", "addresses")
+
+    def __init__(self):
+        self.orders = 0
+        self.cancelled = 0
+        self.recent_cancels = []  # order datetimes of cancellations in the last 7 days
+        self.latest_order = None
+        self.contacts = set()
+        self.addresses = set()
+
+
+class RiskScorer:
+    """Per-customer fraud scores maintained across refreshes.
+
+    The first ``refresh`` sweeps every order once, building per-customer
+    counters and contact/address sets plus the shared active-order counters.
+    Later refreshes only read orders newer than the last one seen and the
+    orders that were still active, then rescore the customers they touch
+    (plus customers sharing a contact/address whose active count crossed the
+    threshold, and customers with cancellations ageing out of the 24h/7d
+    windows). Orders only leave the active statuses once, into a terminal
+    status, so no other order can change.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._customers = {}
+        self._active = {}  # order_id -> (customer_id, order_dt, contact, address)
+        self._active_by_contact = {}
+        self._active_by_address = {}
+        self._customers_by_contact = {}
+        self._customers_by_address = {}
+        self._scores = {}  # customer_id -> (score, reasons, orders, cancelled, latest_order)
+        self._last_order_id = 0
+        self._refreshed_at = None  # start of the last refresh; None until the first sweep
+        self._totals = {"total": 0, "cancelled": 0, "delivered": 0, "in_progress": 0}
+
+    def refresh(self, incremental=True):
+        """Bring scores up to date; returns ``(scores, order_totals)`` snapshots."""
+        with self._lock:
+            if not incremental:
+                self.reset()
+            now = datetime.now()
+            touched = set()
+
+            # Orders that were active last time and have since reached a terminal status
+            finished = []
+            active_ids = list(self._active)
+            for chunk_start in range(0, len(active_ids), 500):
+                for order in list_orders(order_ids=active_ids[chunk_start:chunk_start + 500]):
+                    status = _normalize_text(order.status)
+                    if status not in ACTIVE_STATUSES:
+                        finished.append((order.id, status))
+            new_orders = list_orders(after_id=self._last_order_id)
+
+            # Cancellations by staff are not held against the customer. Read after
+            # the orders so every cancellation seen above has its event visible.
+            excluded = self._staff_cancelled(finished, new_orders)
+
+            for order_id, status in finished:
+                self._finish_active(order_id, status, excluded, now, touched)
+            for order in new_orders:
+                self._add_order(order, excluded, now, touched)
+                if order.id > self._last_order_id:
+                    self._last_order_id = order.id
+            self._refreshed_at = now
+
+            # Cancellations ageing out of the windows change these scores without any write
+            touched.update(cid for cid, state in self._customers.items() if state.recent_cancels)
+            for customer_id in touched:
+                self._rescore(customer_id, now)
+            return dict(self._scores), dict(self._totals)
+
+    def _staff_cancelled(self, finished, new_orders):
+        if self._refreshed_at is None:
+            return get_staff_cancelled_order_ids()
+        cancelled_ids = [order_id for order_id, status in finished if status == "cancelled"]
+        cancelled_ids += [order.id for order in new_orders if _normalize_text(order.status) == "cancelled"]
+        # Only orders seen as active (or not at all) by the last refresh, so only recent events
+        since = self._refreshed_at - _EVENT_CLOCK_SLACK
+        excluded = set()
+        for chunk_start in range(0, len(cancelled_ids), 500):
+            excluded |= get_staff_cancelled_order_ids(
+                since=since, order_ids=cancelled_ids[chunk_start:chunk_start + 500]
+            )
+        return excluded
+
+    # ---------- sweep ----------
+    def _add_order(self, order, excluded, now, touched):
+        customer_id = order.customer_id
+        status = _normalize_text(order.status)
+        order_dt = _parse_dt(order.created_at or order.placed_at)
+        contact = _normalize_text(order.contact_number)
+        address = _normalize_text(order.delivery_address)
+
+        state = self._customers.get(customer_id)
+        if state is None:
+            state = self._customers[customer_id] = _CustomerRisk()
+        state.orders += 1
+        if order_dt and (state.latest_order is None or order_dt > state.latest_order):
+            state.latest_order = order_dt
+        if contact:
+            state.contacts.add(contact)
+            self._customers_by_contact.setdefault(contact, set()).add(customer_id)
+        if address:
+            state.addresses.add(address)
+            self._customers_by_address.setdefault(address, set()).add(customer_id)
+        touched.add(customer_id)
+
+        self._totals["total"] += 1
+        if status in ACTIVE_STATUSES:
+            self._totals["in_progress"] += 1
+            self._active[order.id] = (customer_id, order_dt, contact, address)
+            self._count_active(contact, address, 1, touched)
+        else:
+            self._count_terminal(order.id, customer_id, order_dt, status, excluded, now)
+
+    def _finish_active(self, order_id, status, excluded, now, touched):
+        customer_id, order_dt, contact, address = self._active.pop(order_id)
+        self._totals["in_progress"] -= 1
+        self._count_active(contact, address, -1, touched)
+        self._count_terminal(order_id, customer_id, order_dt, status, excluded, now)
+        touched.add(customer_id)
+
+    def _count_terminal(self, order_id, customer_id, order_dt, status, excluded, now):
+        if status == "delivered":
+            self._totals["delivered"] += 1
+        elif status == "cancelled":
+            self._totals["cancelled"] += 1
+            if order_id not in excluded:
+                state = self._customers[customer_id]
+                state.cancelled += 1
+                if order_dt and order_dt >= now - _RECENT_WINDOW:
+                    state.recent_cancels.append(order_dt)
+
+    def _count_active(self, contact, address, delta, touched):
+        for key, counts, customers in (
+            (contact, self._active_by_contact, self._customers_by_contact),
+            (address, self._active_by_address, self._customers_by_address),
+        ):
+            if not key:
+                continue
+            before = counts.get(key, 0)
+            counts[key] = before + delta
+            if (before >= SHARED_ACTIVE_ORDERS) != (before + delta >= SHARED_ACTIVE_ORDERS):
+                touched.update(customers.get(key, ()))
+
+    # ---------- scoring ----------
+    def _rescore(self, customer_id, now):
+        state = self._customers.get(customer_id)
+        if not customer_id or state is None:
+            return
+        state.recent_cancels = [dt for dt in state.recent_cancels if dt >= now - _RECENT_WINDOW]
+        cancelled_7d = len(state.recent_cancels)
+        cancelled_24h = sum(1 for dt in state.recent_cancels if dt >= now - timedelta(hours=24))
+        cancelled = state.cancelled
+        cancellation_rate = (cancelled / state.orders * 100.0) if state.orders > 0 else 0.0
 
-        user = users_by_id.get(customer_id, {})
         score = 0
         reasons = []
-
-        cancelled = stats["cancelled"]
-        total_orders = stats["orders"]
-        cancellation_rate = (cancelled / total_orders * 100.0) if total_orders > 0 else 0.0
-
-        if stats["cancelled_7d"] >= 3:
+        if cancelled_7d >= 3:
             score += 40
-            reasons.append(f"{stats['cancelled_7d']} cancellations in 7 days")
+            reasons.append(f"{cancelled_7d} cancellations in 7 days")
 
         if cancellation_rate >= 60 and cancelled >= 3:
             score += 30
             reasons.append(f"High cancellation rate ({cancellation_rate:.0f}%)")
 
-        if stats["cancelled_24h"] >= 2:
+        if cancelled_24h >= 2:
             score += 20
-            reasons.append(f"{stats['cancelled_24h']} cancellations in 24h")
-
-        sample_contact = None
-        sample_address = None
-        for order in orders:
-            if order.get("customer_id") == customer_id:
-                contact_key = _normalize_text(order.get("contact_number"))
-                address_key = _normalize_text(order.get("delivery_address"))
-                if not sample_contact and contact_key:
-                    sample_contact = contact_key
-                if not sample_address and address_key:
-                    sample_address = address_key
-                if sample_contact and sample_address:
-                    break
-
-        if sample_contact and active_by_contact.get(sample_contact, 0) >= 3:
+            reasons.append(f"{cancelled_24h} cancellations in 24h")
+
+        if any(self._active_by_contact.get(key, 0) >= SHARED_ACTIVE_ORDERS for key in state.contacts):
             score += 15
             reasons.append("Shared contact across multiple active orders")
 
-        if sample_address and active_by_address.get(sample_address, 0) >= 3:
+        if any(self._active_by_address.get(key, 0) >= SHARED_ACTIVE_ORDERS for key in state.addresses):
             score += 15
             reasons.append("Shared address across multiple active orders")
 
-        if score <= 0:
-            continue
+        if score > 0:
+            self._scores[customer_id] = (score, reasons, state.orders, cancelled, state.latest_order)
+        else:
+            self._scores.pop(customer_id, None)
+
+
+_risk_scorer = RiskScorer()
+
+
+def _compute_risk_data(incremental=True, days=7):
+    scores, order_totals = _risk_scorer.refresh(incremental=incremental)
+    customer_ids = list(scores)
+    users_by_id = {}
+    for chunk_start in range(0, len(customer_ids), 500):
+        for user in list_users(user_ids=customer_ids[chunk_start:chunk_start + 500]):
+            users_by_id[user.id] = user
+
+    entries = []
+    for customer_id, (score, reasons, total_orders, cancelled, latest_order) in scores.items():
+        user = users_by_id.get(customer_id, {})
 
         if score >= 80:
             level = "HIGH"
@@ -248,14 +367,27 @@ def _compute_risk_data():
                 "reasons": reasons,
                 "orders": total_orders,
                 "cancelled": cancelled,
-                "latest_order": stats["latest_order"].strftime("%b %d, %Y %I:%M %p") if stats["latest_order"] else "N/A",
+                "latest_order": latest_order.strftime("%b %d, %Y %I:%M %p") if latest_order else "N/A",
             }
         )
 
     entries.sort(key=lambda entry: entry["score"], reverse=True)
-    daily_series = _compute_daily_risk_series(orders, days=7)
+    if HAS_NUMPY:
+        first_day = datetime.now().date() - timedelta(days=days - 1)
+        columns = load_order_columns(since=datetime.combine(first_day, datetime.min.time()))
+        daily_series = _compute_daily_risk_series_columnar(columns, days=days)
+    else:
+        daily_series = _compute_daily_risk_series(days=days)
     return {
         "entries": entries,
         "daily_series": daily_series,
-        "all_orders": orders,
+        "order_totals": order_totals,
     }
+
+
+def get_risk_data(fresh=False, days=7):
+    """Shared snapshot of _compute_risk_data for every open fraud tab in this process."""
+    return analytics_snapshot(
+        "fraud_risk", (days, datetime.now().date()), lambda: _compute_risk_data(days=days),
+        depends_on=("orders", "users"), allow_stale=not fresh,
+    )
@@ -1,24 +1,54 @@
 from datetime import datetime, timedelta
 import flet as ft
-from core.database import get_all_orders, update_order_status
-from core.datetime_utils import format_datetime_philippine
+from core.database import get_orders_page, get_order, update_order_status, get_order_status_events, get_stage_durations
+from core.datetime_utils import format_datetime_philippine, format_duration
 from utils import show_snackbar, TEXT_DARK, ACCENT_PRIMARY, FIELD_BG, FIELD_BORDER, CREAM, ACCENT_DARK
 
 
-def _create_order_timeline(order):
-    """Render status timeline for admin order cards."""
+_STAGE_STEPS = [
+    ("placed", "preparing", "Placed"),
+    ("preparing", "out for delivery", "Preparing"),
+    ("out for delivery", "delivered", "Out for delivery"),
+]
+
+
+def _create_stage_summary(since):
+    """Average time orders spent in each stage, over status changes since ``since``."""
+    averages = {(row["from_status"], row["to_status"]): row["avg_seconds"] for row in get_stage_durations(since=since)}
+    parts = [
+        f"{label} {format_duration(averages[(from_status, to_status)])}"
+        for from_status, to_status, label in _STAGE_STEPS
+        if (from_status, to_status) in averages
+    ]
+    if not parts:
+        return None
+    return ft.Text("Avg. time in stage: " + "  •  ".join(parts), size=11, color="#666666")
+
+
+def _create_order_timeline(order, status_events):
+    """Render status timeline for admin order cards from the order's status events."""
     timeline_events = [
-        ("placed", order.get("placed_at"), "✓ Placed"),
-        ("preparing", order.get("preparing_at"), "👨‍🍳 Preparing"),
-        ("out for delivery", order.get("out_for_delivery_at"), "🚚 Out for Delivery"),
-        ("delivered", order.get("delivered_at"), "✅ Delivered"),
-        ("cancelled", order.get("cancelled_at"), "✗ Cancelled"),
+        ("placed", "✓ Placed"),
+        ("preparing", "👨‍🍳 Preparing"),
+        ("out for delivery", "🚚 Out for Delivery"),
+        ("delivered", "✅ Delivered"),
+        ("cancelled", "✗ Cancelled"),
     ]
+    reached_at = {event["to_status"]: event["at"] for event in status_events}
+    # Time spent in the previous status before each change
+    stage_seconds = {}
+    for event in status_events:
+        entered_at = reached_at.get(event["from_status"])
+        if entered_at and event["at"]:
+            stage_seconds[event["to_status"]] = (
+                datetime.fromisoformat(event["at"]) - datetime.fromisoformat(entered_at)
+            ).total_seconds()
 
     timeline_items = []
     current_status = order.get("status", "placed").lower()
 
-    for status_name, timestamp, display_label in timeline_events:
+    for status_name, display_label in timeline_events:
+        timestamp = reached_at.get(status_name)
         if status_name == "cancelled" and current_status != "cancelled":
             continue
 
@@ -45,6 +75,8 @@ def _create_order_timeline(order):
                 time_text = f" - {format_datetime_philippine(timestamp)}"
             except Exception:
                 time_text = f" - {timestamp}"
+        if status_name in stage_seconds:
+            time_text += f" (after {format_duration(stage_seconds[status_name])})"
 
         text_color = ACCENT_PRIMARY if is_completed else "#999999"
         font_weight = ft.FontWeight.BOLD if is_current else ft.FontWeight.W_600
@@ -109,6 +141,11 @@ def create_order_handlers(
     current_order_filter = {"value": "all"}
     order_search_query = {"value": ""}
     date_range_days = {"value": "30"}
+    order_page = {"cursor": None}
+    load_more_button = ft.TextButton(
+        "Load more orders",
+        on_click=lambda e: load_orders(current_order_filter["value"], append=True),
+    )
 
     def update_order_filter_buttons(active_filter):
         for filter_name, button in order_filter_buttons.items():
@@ -140,8 +177,7 @@ def create_order_handlers(
                     page.update()
                     return
 
-                refreshed_orders = get_all_orders()
-                updated_order = next((o for o in refreshed_orders if o.get("id") == order.get("id")), None)
+                updated_order = get_order(order.get("id"))
                 show_snackbar(page, f"Order status updated to {new_status}")
                 load_orders(current_order_filter["value"])
                 if updated_order:
@@ -243,7 +279,7 @@ def create_order_handlers(
             ft.Container(
                 content=ft.Column([
                     ft.Text("Timeline", size=12, weight=ft.FontWeight.BOLD, color=TEXT_DARK),
-                    ft.Column(_create_order_timeline(order), spacing=4),
+                    ft.Column(_create_order_timeline(order, get_order_status_events(order.get("id"))), spacing=4),
                 ], spacing=8),
                 padding=12,
                 bgcolor="#FFFFFF",
@@ -262,69 +298,52 @@ def create_order_handlers(
         date_range_days["value"] = e.control.value
         load_orders(current_order_filter["value"])
 
-    def load_orders(filter_status="all"):
+    def load_orders(filter_status="all", append=False):
         current_order_filter["value"] = filter_status
         update_order_filter_buttons(filter_status)
 
-        temp_controls = []
+        since = None
+        if date_range_days["value"] != "all":
+            try:
+                since = datetime.now() - timedelta(days=int(date_range_days["value"]))
+            except Exception:
+                since = None
 
         try:
-            all_orders = get_all_orders()
+            result = get_orders_page(
+                status=filter_status,
+                search=order_search_query["value"],
+                since=since,
+                cursor=order_page["cursor"] if append else None,
+            )
         except Exception as db_error:
-            temp_controls.append(ft.Text(f"DB Error: {db_error}", color="red"))
-            orders_list.controls = temp_controls
+            orders_list.controls = [ft.Text(f"DB Error: {db_error}", color="red")]
             page.update()
             return
 
-        if not all_orders:
-            temp_controls.append(ft.Text("No orders in database", size=12, color=TEXT_DARK))
-            orders_list.controls = temp_controls
-            page.update()
-            return
+        orders = result["orders"]
+        order_page["cursor"] = result["next_cursor"]
 
-        if filter_status == "all":
-            orders = all_orders
+        if append:
+            temp_controls = [control for control in orders_list.controls if control is not load_more_button]
         else:
-            orders = [order for order in all_orders if order["status"] == filter_status]
-
-        if order_search_query["value"]:
-            query = order_search_query["value"]
-            filtered = []
-            for order in orders:
-                customer_name = (order.get("customer_name") or "").lower()
-                order_number = str(order.get("customer_order_number", ""))
-                items_list = order.get("items", []) if isinstance(order.get("items"), list) else []
-                item_names = " ".join([(item.get("name") or "") for item in items_list]).lower()
-                if query in customer_name or query in order_number or query in item_names:
-                    filtered.append(order)
-            orders = filtered
-
-        if date_range_days["value"] != "all":
-            try:
-                days = int(date_range_days["value"])
-                cutoff = datetime.now() - timedelta(days=days)
-                date_filtered = []
-                for order in orders:
-                    created_at = order.get("created_at")
-                    if not created_at:
-                        continue
-                    try:
-                        created_dt = datetime.fromisoformat(created_at)
-                    except Exception:
-                        created_dt = None
-                    if created_dt and created_dt >= cutoff:
-                        date_filtered.append(order)
-                orders = date_filtered
-            except Exception:
-                pass
+            temp_controls = []
+            if not orders and filter_status == "all" and not order_search_query["value"] and since is None:
+                temp_controls.append(ft.Text("No orders in database", size=12, color=TEXT_DARK))
+                orders_list.controls = temp_controls
+                page.update()
+                return
 
-        count_text = ft.Text(f"{len(orders)} order(s)", size=13, color=TEXT_DARK, weight=ft.FontWeight.BOLD)
-        temp_controls.append(count_text)
-        if not orders:
-            temp_controls.append(ft.Text("No matching orders", size=12, color="#666666", italic=True))
-            orders_list.controls = temp_controls
-            page.update()
-            return
+            count_text = ft.Text(f"{result['total']} order(s)", size=13, color=TEXT_DARK, weight=ft.FontWeight.BOLD)
+            temp_controls.append(count_text)
+            stage_summary = _create_stage_summary(since)
+            if stage_summary is not None:
+                temp_controls.append(stage_summary)
+            if not orders:
+                temp_controls.append(ft.Text("No matching orders", size=12, color="#666666", italic=True))
+                orders_list.controls = temp_controls
+                page.update()
+                return
 
         for order in orders:
             status_colors = {
@@ -523,6 +542,8 @@ def create_order_handlers(
 
             temp_controls.append(card)
 
+        if order_page["cursor"]:
+            temp_controls.append(load_more_button)
         orders_list.controls = temp_controls
         page.update()
 
@@ -1,7 +1,7 @@
 import flet as ft
 from datetime import datetime
 from core.auth import (
-    get_all_users,
+    search_users,
     create_user_by_admin,
     delete_user,
     disable_user,
@@ -22,6 +22,18 @@ from utils import (
 )
 
 
+def _format_datetime(value, fmt, default):
+    """Format a native or ISO datetime, falling back to ``default``."""
+    if not value:
+        return default
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        return value.strftime(fmt)
+    except Exception:
+        return str(value)
+
+
 def create_user_handlers(
     page,
     current_user,
@@ -46,6 +58,11 @@ def create_user_handlers(
     on_user_status_change=None,
 ):
     search_query = {"value": ""}
+    user_page = {"cursor": None}
+    load_more_button = ft.TextButton(
+        "Load more users",
+        on_click=lambda e: load_users(append=True),
+    )
 
     def validate_email_field(e=None):
         if not new_email.value or new_email.value.strip() == "":
@@ -200,21 +217,8 @@ def create_user_handlers(
     def open_user_details(user):
         user_details_content.controls.clear()
 
-        created_at = "N/A"
-        if user.get("created_at"):
-            try:
-                created_dt = datetime.fromisoformat(user["created_at"])
-                created_at = created_dt.strftime("%b %d, %Y at %I:%M %p")
-            except Exception:
-                created_at = user.get("created_at", "N/A")
-
-        last_login = "Never"
-        if user.get("last_login"):
-            try:
-                login_dt = datetime.fromisoformat(user["last_login"])
-                last_login = login_dt.strftime("%b %d, %Y at %I:%M %p")
-            except Exception:
-                last_login = user.get("last_login", "Never")
+        created_at = _format_datetime(user.get("created_at"), "%b %d, %Y at %I:%M %p", "N/A")
+        last_login = _format_datetime(user.get("last_login"), "%b %d, %Y at %I:%M %p", "Never")
 
         is_active = user.get("is_active", 0)
         status_text = "ACTIVE" if is_active else "DISABLED"
@@ -323,50 +327,35 @@ def create_user_handlers(
         user_details_panel.visible = True
         page.update()
 
-    def load_users():
-        temp_controls = []
-        all_users = get_all_users()
-
-        filtered_users = all_users
-
-        if role_filter_selected["value"] != "all":
-            filtered_users = [u for u in filtered_users if u["role"] == role_filter_selected["value"]]
-
-        if status_filter_selected["value"] != "all":
-            if status_filter_selected["value"] == "active":
-                filtered_users = [u for u in filtered_users if u["is_active"]]
-            elif status_filter_selected["value"] == "disabled":
-                filtered_users = [u for u in filtered_users if not u["is_active"]]
-            elif status_filter_selected["value"] == "locked":
-                locked_users = []
-                for u in filtered_users:
-                    if u.get("locked_until"):
-                        try:
-                            locked_until_dt = datetime.fromisoformat(u["locked_until"])
-                            if datetime.now() < locked_until_dt:
-                                locked_users.append(u)
-                        except Exception:
-                            pass
-                filtered_users = locked_users
-
-        if search_query["value"]:
-            filtered_users = [
-                u
-                for u in filtered_users
-                if search_query["value"] in u["full_name"].lower()
-                or search_query["value"] in u["email"].lower()
-            ]
-
-        count_text = ft.Text(f"{len(filtered_users)} user(s)", size=13, color=TEXT_DARK, weight=ft.FontWeight.BOLD)
-        temp_controls.append(count_text)
-
-        if not filtered_users:
-            temp_controls.append(ft.Text("No users found", size=12, color="#666666", italic=True))
-            users_list.controls = temp_controls
+    def load_users(append=False):
+        try:
+            result = search_users(
+                role=role_filter_selected["value"],
+                status=status_filter_selected["value"],
+                query=search_query["value"],
+                cursor=user_page["cursor"] if append else None,
+            )
+        except Exception as db_error:
+            users_list.controls = [ft.Text(f"DB Error: {db_error}", color="red")]
             page.update()
             return
 
-        for user in filtered_users:
+        users = result["users"]
+        user_page["cursor"] = result["next_cursor"]
+
+        if append:
+            temp_controls = [control for control in users_list.controls if control is not load_more_button]
+        else:
+            count_text = ft.Text(f"{result['total']} user(s)", size=13, color=TEXT_DARK, weight=ft.FontWeight.BOLD)
+            temp_controls = [count_text]
+
+            if not users:
+                temp_controls.append(ft.Text("No users found", size=12, color="#666666", italic=True))
+                users_list.controls = temp_controls
+                page.update()
+                return
+
+        for user in users:
             status_badge_text = "ACTIVE" if user["is_active"] else "DISABLED"
             status_badge_color = "#4CAF50" if user["is_active"] else "#FFC107"
             status_badge_text_color = "#FFFFFF" if user["is_active"] else "#000000"
@@ -440,7 +429,7 @@ def create_user_handlers(
                             [
                                 ft.Icon(ft.Icons.CALENDAR_TODAY, size=12, color="#999999"),
                                 ft.Text(
-                                    f"Created: {datetime.fromisoformat(user['created_at']).strftime('%b %d, %Y')}",
+                                    f"Created: {_format_datetime(user.get('created_at'), '%b %d, %Y', 'N/A')}",
                                     size=10,
                                     color="#666666",
                                 ),
@@ -451,7 +440,7 @@ def create_user_handlers(
                             [
                                 ft.Icon(ft.Icons.LOGIN, size=12, color="#999999"),
                                 ft.Text(
-                                    f"Last Login: {datetime.fromisoformat(user['last_login']).strftime('%b %d, %Y') if user.get('last_login') else 'Never'}",
+                                    f"Last Login: {_format_datetime(user.get('last_login'), '%b %d, %Y', 'Never')}",
                                     size=10,
                                     color="#666666",
                                 ),
@@ -480,6 +469,8 @@ def create_user_handlers(
             card.on_hover = lambda e, card_ref=card: on_card_hover(e, card_ref)
             temp_controls.append(card)
 
+        if user_page["cursor"]:
+            temp_controls.append(load_more_button)
         users_list.controls = temp_controls
         page.update()
 
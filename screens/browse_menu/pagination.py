@@ -1,7 +1,7 @@
 """Pagination and menu loading logic"""
 import flet as ft
 import threading
-from core.database import get_menu_items_page, get_user_favorites
+from core.database import get_menu_items_keyset, get_favorite_menu_items_page, get_user_favorites
 from utils import TEXT_DARK, FIELD_BG, ACCENT_PRIMARY
 from .ui import create_menu_item_card
 
@@ -10,13 +10,17 @@ def create_menu_loader(page, cart, current_user, menu_list, ui_update_lock, curr
     """Create menu loading function"""
     user_id = current_user["user"]["id"]
     favorites = set(get_user_favorites(user_id))
+    # Keyset cursors of the page currently shown (first/last row keys)
+    page_cursors = {"prev": None, "next": None}
     
-    def load_menu(category="All", search="", reset_page=True):
+    def load_menu(category="All", search="", reset_page=True, direction="next"):
+        """Load a menu page. ``direction`` is "next", "prev" or "last" relative to the shown page."""
         items_per_page = 10
         
         with ui_update_lock:
             if reset_page:
                 current_page["page"] = 1
+                direction = "next"
 
             new_controls = []
 
@@ -39,33 +43,58 @@ def create_menu_loader(page, cart, current_user, menu_list, ui_update_lock, curr
                         page.update()
                         return
                     
-                    # Get all items and filter by favorites
-                    all_items = []
-                    for fav_id in favorites:
-                        for item in get_menu_items_page(limit=1000, offset=0).get("items", []):
-                            if item["id"] == fav_id:
-                                all_items.append(item)
-                    
-                    items = all_items[((current_page["page"]-1)*items_per_page):((current_page["page"])*items_per_page)]
-                    total = len(all_items)
+                    cursor = None if reset_page else page_cursors.get(direction)
+                    if direction in ("prev", "next") and cursor is None:
+                        direction = "next"
+                        current_page["page"] = 1
+
+                    result = get_favorite_menu_items_page(
+                        user_id,
+                        limit=items_per_page,
+                        cursor=cursor,
+                        direction=direction,
+                    )
+                    items = result.get("items", [])
+                    total = result.get("total", 0)
+                    page_cursors["prev"] = result.get("prev_cursor")
+                    page_cursors["next"] = result.get("next_cursor")
+
                     total_pages["count"] = max(1, (total + items_per_page - 1) // items_per_page)
+                    if direction == "last":
+                        current_page["page"] = total_pages["count"]
+                    elif page_cursors["prev"] is None:
+                        current_page["page"] = 1
+                    current_page["page"] = min(current_page["page"], total_pages["count"])
                 else:
-                    offset = (current_page["page"] - 1) * items_per_page
-                    result = get_menu_items_page(category=category, search=search, limit=items_per_page, offset=offset)
+                    cursor = None if reset_page else page_cursors.get(direction)
+                    if direction in ("prev", "next") and cursor is None:
+                        # No cursor in that direction (first load or stale state): start over
+                        direction = "next"
+                        current_page["page"] = 1
+
+                    result = get_menu_items_keyset(
+                        category=category,
+                        search=search,
+                        limit=items_per_page,
+                        cursor=cursor,
+                        direction=direction,
+                    )
                     items = result.get("items", [])
                     total = result.get("total", 0)
-                    
+                    page_cursors["prev"] = result.get("prev_cursor")
+                    page_cursors["next"] = result.get("next_cursor")
+
                     # Calculate total pages
                     total_pages["count"] = max(1, (total + items_per_page - 1) // items_per_page)
-                
-                # Ensure current page is within bounds
-                if current_page["page"] > total_pages["count"]:
-                    current_page["page"] = total_pages["count"]
-                    offset = (current_page["page"] - 1) * items_per_page
-                    result = get_menu_items_page(category=category, search=search, limit=items_per_page, offset=offset)
-                    items = result.get("items", [])
-                    total = result.get("total", 0)
-                
+                    if direction == "last":
+                        current_page["page"] = total_pages["count"]
+                    elif page_cursors["prev"] is None:
+                        current_page["page"] = 1
+
+                    # Ensure current page is within bounds
+                    if current_page["page"] > total_pages["count"]:
+                        current_page["page"] = total_pages["count"]
+
                 # Update page info
                 page_info_text.value = f"{current_page['page']} / {total_pages['count']}"
 
@@ -134,11 +163,11 @@ def create_pan_handler(current_page, total_pages, selected_category, search_fiel
             # Swipe right (previous page)
             if swipe_distance > min_swipe_distance and current_page["page"] > 1:
                 current_page["page"] -= 1
-                load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False)
+                load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False, direction="prev")
             
             # Swipe left (next page)
             elif swipe_distance < -min_swipe_distance and current_page["page"] < total_pages["count"]:
                 current_page["page"] += 1
-                load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False)
+                load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False, direction="next")
     
     return on_pan
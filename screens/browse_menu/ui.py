@@ -4,7 +4,7 @@ import threading
 import json
 import time
 from pathlib import Path
-from core.database import get_menu_items_page, get_categories, get_menu_item_stats
+from core.database import get_menu_items_page, get_category_facets, get_menu_item_stats
 from utils import TEXT_DARK, FIELD_BG, FIELD_BORDER, ACCENT_PRIMARY, ACCENT_DARK, TEXT_LIGHT
 from .image_utils import load_image_from_binary
 from .handlers import create_add_to_cart_handler, create_quantity_handlers, create_favorite_toggle_handler, create_card_hover_handler
@@ -519,9 +519,21 @@ def create_menu_item_card(item, page, cart, user_id, favorites, ui_update_lock,
     return card_container
 
 
+def _chip_label(category, available, on_sale):
+    label = f"{category} ({available})"
+    if on_sale:
+        label += f" · {on_sale} on sale"
+    return label
+
+
 def create_category_chips(selected_category, load_menu_callback, page, ui_update_lock):
-    """Create category filter chips"""
-    categories = ["❤️ Favorites", "All"] + get_categories()
+    """Create category filter chips, labelled with item counts from the in-memory facets"""
+    facets = get_category_facets()
+    categories = ["❤️ Favorites", "All"] + [facet.category for facet in facets]
+    labels = {"❤️ Favorites": "❤️ Favorites"}
+    labels["All"] = _chip_label("All", sum(f.available for f in facets), sum(f.on_sale for f in facets))
+    for facet in facets:
+        labels[facet.category] = _chip_label(facet.category, facet.available, facet.on_sale)
     chips = []
     
     def make_chip_click(cat):
@@ -539,7 +551,7 @@ def create_category_chips(selected_category, load_menu_callback, page, ui_update
     for cat in categories:
         is_selected = cat == selected_category["value"]
         chip = ft.Container(
-            content=ft.Text(cat, size=13, color="#FFFFFF" if is_selected else TEXT_DARK, weight=ft.FontWeight.W_500),
+            content=ft.Text(labels[cat], size=13, color="#FFFFFF" if is_selected else TEXT_DARK, weight=ft.FontWeight.W_500),
             bgcolor=ACCENT_DARK if is_selected else "#E0E0E0",
             padding=ft.padding.symmetric(horizontal=16, vertical=8),
             border_radius=20,
@@ -553,7 +565,7 @@ def create_category_chips(selected_category, load_menu_callback, page, ui_update
 def create_search_field(load_menu_callback, selected_category):
     """Create search input field"""
     return ft.TextField(
-        hint_text="Search menu...", 
+        hint_text="Search dishes or ingredients...", 
         width=300, 
         on_change=lambda e: load_menu_callback(category=selected_category["value"], search=e.control.value, reset_page=True),
         bgcolor="white",
@@ -571,21 +583,21 @@ def create_pagination_controls(current_page, total_pages, selected_category, sea
     
     def goto_first_page(e):
         current_page["page"] = 1
-        load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False)
+        load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=True)
 
     def goto_prev_page(e):
         if current_page["page"] > 1:
             current_page["page"] -= 1
-            load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False)
+            load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False, direction="prev")
 
     def goto_next_page(e):
         if current_page["page"] < total_pages["count"]:
             current_page["page"] += 1
-            load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False)
+            load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False, direction="next")
 
     def goto_last_page(e):
         current_page["page"] = total_pages["count"]
-        load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False)
+        load_menu_callback(category=selected_category["value"], search=search_field.value, reset_page=False, direction="last")
     
     swipe_hint = ft.Text(
         "← Swipe to browse →",
@@ -236,6 +236,26 @@ def cart_screen(page: ft.Page, current_user: dict, cart: list, goto_menu, goto_c
         width=content_width
     )
 
+    def _apply_stock_conflicts(conflicts):
+        """Trim cart lines to the stock that is actually left and tell the customer."""
+        available = {conflict["id"]: conflict["available"] for conflict in conflicts}
+        for item in list(cart):
+            if item.get("id") not in available:
+                continue
+            left = available[item["id"]]
+            if left <= 0:
+                cart.remove(item)
+            else:
+                item["quantity"] = min(item["quantity"], left)
+                available[item["id"]] = left - item["quantity"]
+
+        details = ", ".join(
+            f"{c['name']} (sold out)" if c["available"] <= 0 else f"{c['name']} (only {c['available']} left)"
+            for c in conflicts
+        )
+        refresh_cart()
+        show_snackbar(page, f"Some items are no longer available: {details}. Your cart was updated.")
+
     def place_order(e):
         if not cart:
             show_snackbar(page, "Cart is empty!")
@@ -270,7 +290,7 @@ def cart_screen(page: ft.Page, current_user: dict, cart: list, goto_menu, goto_c
                 page.update()
                 return
 
-            create_order(
+            success, _order_id, conflicts = create_order(
                 current_user["user"]["id"],
                 name_field.value,
                 address_field.value,
@@ -279,6 +299,10 @@ def cart_screen(page: ft.Page, current_user: dict, cart: list, goto_menu, goto_c
                 total_amount,
                 selected_payment["value"]
             )
+            if not success:
+                hide_login_loading(page, loading_overlay)
+                _apply_stock_conflicts(conflicts)
+                return
             cart.clear()
             refresh_cart()  # Update display to show empty cart
             hide_login_loading(page, loading_overlay)
@@ -6,6 +6,7 @@ import json
 import webbrowser
 from core.auth import authenticate_user, validate_email, register_user
 from core.database import log_action
+from core.read_cache import invalidate_reads
 from core.image_utils import get_base64_image
 from utils import show_snackbar, ACCENT_PRIMARY, TEXT_LIGHT, FIELD_BG, TEXT_DARK, FIELD_BORDER, ACCENT_DARK, CREAM, DARK_GREEN, ORANGE
 from screens.login_loading import show_login_loading, hide_login_loading
@@ -423,6 +424,7 @@ def login_screen(page: ft.Page, current_user: dict, cart: list, goto_signup, got
                     if user and getattr(user, "email_verified", 1) == 0:
                         user.email_verified = 1
                         session.commit()
+                        invalidate_reads(("user", user.id))
                     
                     if not user:
                         # Auto-register
@@ -1,16 +1,22 @@
 import flet as ft
+from core.database import get_order_status_events
 from core.datetime_utils import format_datetime_philippine
 from utils import ACCENT_PRIMARY, TEXT_DARK
 
 
 def create_customer_timeline(order):
     """Creates a timeline for customer view showing status transitions with timestamps"""
+    # Recorded status changes; the order's own timestamp columns cover orders without events
+    reached_at = {
+        event["to_status"]: event["at"]
+        for event in (get_order_status_events(order["id"]) if order.get("id") else [])
+    }
     timeline_events = [
-        ("placed", order.get("placed_at"), "✓ Placed"),
-        ("preparing", order.get("preparing_at"), "👨‍🍳 Preparing"),
-        ("out for delivery", order.get("out_for_delivery_at"), "🚚 Out for Delivery"),
-        ("delivered", order.get("delivered_at"), "✅ Delivered"),
-        ("cancelled", order.get("cancelled_at"), "✗ Cancelled"),
+        ("placed", reached_at.get("placed") or order.get("placed_at"), "✓ Placed"),
+        ("preparing", reached_at.get("preparing") or order.get("preparing_at"), "👨‍🍳 Preparing"),
+        ("out for delivery", reached_at.get("out for delivery") or order.get("out_for_delivery_at"), "🚚 Out for Delivery"),
+        ("delivered", reached_at.get("delivered") or order.get("delivered_at"), "✅ Delivered"),
+        ("cancelled", reached_at.get("cancelled") or order.get("cancelled_at"), "✗ Cancelled"),
     ]
     
     timeline_data = []
@@ -29,7 +35,9 @@ def create_customer_timeline(order):
         cancelled_order = ["placed", "cancelled"]
         
         if current_status == "cancelled":
-            is_completed = status_name in cancelled_order and cancelled_order.index(status_name) <= cancelled_order.index(current_status)
+            is_completed = status_name in reached_at or (
+                status_name in cancelled_order and cancelled_order.index(status_name) <= cancelled_order.index(current_status)
+            )
             is_current = status_name == current_status
         else:
             is_completed = status_name in status_order and status_order.index(status_name) <= status_order.index(current_status)
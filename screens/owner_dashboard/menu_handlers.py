@@ -4,6 +4,7 @@ import mimetypes
 import uuid
 from core.database import (
 	get_all_menu_items,
+	search_menu_items,
 	create_menu_item,
 	update_menu_item,
 	delete_menu_item,
@@ -20,6 +21,8 @@ from utils import (
 )
 
 
+MENU_SEARCH_PAGE_SIZE = 100
+
 UPLOAD_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "uploads")
 
 
@@ -38,6 +41,11 @@ def create_menu_handlers(page, current_user, menu_list, form_container, fields,
 
 	current_menu_filter = {"value": "All"}
 	current_search = {"value": ""}
+	search_page = {"offset": 0, "total": 0}
+	load_more_button = ft.TextButton(
+		"Load more results",
+		on_click=lambda e: load_menu(current_menu_filter["value"], append=True),
+	)
 	edit_mode = {"active": False, "item_id": None}
 	pending_uploads = {}
 	upload_state = {"in_progress": False}
@@ -142,34 +150,45 @@ def create_menu_handlers(page, current_user, menu_list, form_container, fields,
 				chip.bgcolor = "#E0E0E0"
 				chip.content.color = TEXT_DARK
 
-	def load_menu(filter_category="All"):
+	def load_menu(filter_category="All", append=False):
 		current_menu_filter["value"] = filter_category
 		update_menu_filter_buttons(filter_category)
 
-		new_controls = []
-		all_items = get_all_menu_items()
-
-		if filter_category == "All":
-			items = all_items
+		searching = bool(current_search["value"])
+		if searching:
+			# Ranked full-text search over name/description/ingredients/category, one page at a time
+			offset = search_page["offset"] if append else 0
+			result = search_menu_items(
+				current_search["value"], category=filter_category, limit=MENU_SEARCH_PAGE_SIZE, offset=offset,
+			)
+			items = result["items"]
+			search_page["offset"] = offset + len(items)
+			search_page["total"] = result["total"]
 		else:
-			items = [item for item in all_items if item.get("category") == filter_category]
-
-		if current_search["value"]:
-			query = current_search["value"]
-			items = [
-				item for item in items
-				if query in item["name"].lower() or query in item.get("description", "").lower()
-			]
+			append = False
+			all_items = get_all_menu_items()
+			if filter_category == "All":
+				items = all_items
+			else:
+				items = [item for item in all_items if item.get("category") == filter_category]
 
+		shown = search_page["offset"] if searching else len(items)
 		count_text = ft.Text(
-			f"Showing {len(items)} item(s)" + (f" in category '{filter_category}'" if filter_category != "All" else ""),
+			f"Showing {shown}" + (f" of {search_page['total']}" if searching else "") + " item(s)"
+			+ (f" in category '{filter_category}'" if filter_category != "All" else ""),
 			size=15,
 			color="#000000",
 			weight=ft.FontWeight.BOLD,
 		)
-		new_controls.append(count_text)
+		if append:
+			# Keep the cards already shown; refresh the count and drop the old "Load more"
+			new_controls = [count_text] + [
+				control for control in menu_list.controls[1:] if control is not load_more_button
+			]
+		else:
+			new_controls = [count_text]
 
-		if not items:
+		if not items and not append:
 			new_controls.append(
 				ft.Container(
 					content=ft.Text(
@@ -286,6 +305,8 @@ def create_menu_handlers(page, current_user, menu_list, form_container, fields,
 
 			new_controls.append(card)
 
+		if searching and len(items) == MENU_SEARCH_PAGE_SIZE and search_page["offset"] < search_page["total"]:
+			new_controls.append(load_more_button)
 		menu_list.controls = new_controls
 
 		page.update()
@@ -1,10 +1,10 @@
-import json
-import csv
 import os
 from datetime import datetime, timedelta
 import flet as ft
 
-from core.database import get_all_orders, get_all_menu_items
+from core.database import list_menu_items, get_daily_sales, get_daily_item_sales
+from core.analytics_cache import analytics_snapshot
+from core.export_jobs import start_sales_export
 from utils import CREAM, TEXT_DARK, FIELD_BG, FIELD_BORDER, ACCENT_PRIMARY, ACCENT_DARK, show_snackbar
 
 
@@ -31,16 +31,6 @@ def _to_float(value, default=0.0):
         return default
 
 
-def _parse_order_datetime(order):
-    date_str = order.get("created_at") or order.get("placed_at")
-    if not date_str:
-        return None
-    try:
-        return datetime.fromisoformat(date_str)
-    except Exception:
-        return None
-
-
 def _pct_change(current, previous):
     if previous <= 0:
         if current > 0:
@@ -50,8 +40,7 @@ def _pct_change(current, previous):
 
 
 def _compute_sales_stats(period_days=30, low_stock_threshold=10):
-    orders = get_all_orders()
-    menu_items = get_all_menu_items()
+    menu_items = list_menu_items()
 
     today = datetime.now().date()
     seven_days_ago = today - timedelta(days=6)
@@ -85,40 +74,39 @@ def _compute_sales_stats(period_days=30, low_stock_threshold=10):
         for index in range(chart_days)
     }
 
-    item_stats = {}
     category_by_item_id = {
-        item.get("id"): item.get("category", "Other")
+        item.id: item.category or "Other"
         for item in menu_items
-        if isinstance(item, dict)
     }
+    item_stats = get_daily_item_sales(since=period_start, until=today)
+    for item_id, entry in item_stats.items():
+        entry["category"] = category_by_item_id.get(item_id, "Other")
 
-    for order in orders:
-        order_dt = _parse_order_datetime(order)
-        if not order_dt:
-            continue
-
-        order_date = order_dt.date()
-        status = (order.get("status") or "").strip().lower()
-        amount = _to_float(order.get("total_amount"), 0.0)
+    # One row per (day, status) from the daily_sales rollup instead of one per order
+    for bucket in get_daily_sales(since=min(previous_period_start, period_start), until=today):
+        order_date = bucket["day"]
+        status = (bucket["status"] or "").strip().lower()
+        count = bucket["order_count"]
+        amount = bucket["revenue"]
 
         if previous_period_start <= order_date <= previous_period_end:
             if status != "cancelled":
                 previous_period_revenue += amount
-                previous_period_orders += 1
+                previous_period_orders += count
 
         if order_date < period_start or order_date > today:
             continue
 
-        total_orders += 1
+        total_orders += count
 
         if status == "cancelled":
-            cancelled_orders += 1
+            cancelled_orders += count
             continue
 
         total_revenue += amount
 
         if status == "delivered":
-            delivered_orders += 1
+            delivered_orders += count
 
         if order_date == today and status == "delivered":
             daily_revenue += amount
@@ -131,39 +119,9 @@ def _compute_sales_stats(period_days=30, low_stock_threshold=10):
 
         if order_date in trend_revenue_by_day:
             trend_revenue_by_day[order_date] += amount
-            trend_orders_by_day[order_date] += 1
+            trend_orders_by_day[order_date] += count
             if status == "delivered":
-                trend_delivered_orders_by_day[order_date] += 1
-
-        items = order.get("items", [])
-        if isinstance(items, str):
-            try:
-                items = json.loads(items)
-            except Exception:
-                items = []
-
-        for item in items:
-            if not isinstance(item, dict):
-                continue
-
-            item_id = item.get("id")
-            if not item_id:
-                continue
-
-            qty = _to_int(item.get("quantity"), 0)
-            price = _to_float(item.get("price"), 0.0)
-            name = item.get("name") or f"Item #{item_id}"
-
-            if item_id not in item_stats:
-                item_stats[item_id] = {
-                    "name": name,
-                    "quantity_sold": 0,
-                    "revenue": 0.0,
-                    "category": category_by_item_id.get(item_id, "Other"),
-                }
-
-            item_stats[item_id]["quantity_sold"] += qty
-            item_stats[item_id]["revenue"] += qty * price
+                trend_delivered_orders_by_day[order_date] += count
 
     top_selling_by_qty = sorted(
         item_stats.values(),
@@ -180,7 +138,7 @@ def _compute_sales_stats(period_days=30, low_stock_threshold=10):
     low_stock_items = sorted(
         [
             item for item in menu_items
-            if isinstance(item, dict) and _to_int(item.get("stock"), 0) <= low_stock_threshold
+            if _to_int(item.stock, 0) <= low_stock_threshold
         ],
         key=lambda item: _to_int(item.get("stock"), 0),
     )
@@ -225,6 +183,15 @@ def _compute_sales_stats(period_days=30, low_stock_threshold=10):
     }
 
 
+def _sales_stats(period_days=30, fresh=False):
+    """Shared snapshot of _compute_sales_stats for every open dashboard in this process."""
+    return analytics_snapshot(
+        "sales_stats", (period_days, datetime.now().date()),
+        lambda: _compute_sales_stats(period_days=period_days),
+        depends_on=("orders", "menu"), allow_stale=not fresh,
+    )
+
+
 def _build_kpi_card(title, value, subtext, accent_color):
     return ft.Container(
         content=ft.Column(
@@ -535,7 +502,7 @@ def create_sales_dashboard(page: ft.Page):
     chart_metric_state = {"label": "Revenue"}
 
     try:
-        stats = _compute_sales_stats(period_days=period_options[period_state["label"]])
+        stats = _sales_stats(period_days=period_options[period_state["label"]])
     except Exception:
         stats = {
             "daily_revenue": 0.0,
@@ -623,67 +590,70 @@ def create_sales_dashboard(page: ft.Page):
         bgcolor=ACCENT_DARK,
         color="#FFFFFF",
     )
+    cancel_export_button = ft.TextButton("Cancel", icon=ft.Icons.CLOSE, visible=False)
+    compress_export_checkbox = ft.Checkbox(label="gzip", value=False, label_style=ft.TextStyle(color=TEXT_DARK, size=12))
 
     export_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "exports")
+    export_state = {"job": None}
+
+    def reset_export_button():
+        export_csv_button.text = "Export CSV"
+        export_csv_button.icon = ft.Icons.DOWNLOAD
+        export_csv_button.bgcolor = ACCENT_DARK
+        export_csv_button.disabled = False
+        cancel_export_button.visible = False
+        cancel_export_button.disabled = False
+        compress_export_checkbox.disabled = False
+
+    def on_export_progress(job):
+        # Called from the export worker thread
+        if job.status == "running":
+            export_csv_button.text = f"Exporting... {job.rows_written}/{job.total_rows} rows ({job.progress:.0%})"
+            page.update()
+            return
+
+        export_state["job"] = None
+        reset_export_button()
+        if job.status == "done":
+            show_snackbar(page, f"CSV exported ({job.rows_written} rows): {job.path}", success=True)
+        elif job.status == "cancelled":
+            show_snackbar(page, "CSV export cancelled.")
+        else:
+            show_snackbar(page, f"CSV export failed: {str(job.error)}", error=True)
+        page.update()
 
     def export_csv(e):
+        # A job that finishes before start_sales_export returns is stored already finished
+        job = export_state["job"]
+        if job is not None and not job.finished:
+            return
         export_csv_button.text = "Exporting..."
         export_csv_button.icon = ft.Icons.HOURGLASS_TOP
         export_csv_button.bgcolor = ACCENT_PRIMARY
         export_csv_button.disabled = True
+        cancel_export_button.visible = True
+        compress_export_checkbox.disabled = True
         page.update()
         try:
-            os.makedirs(export_dir, exist_ok=True)
-            period_label = period_state["label"].lower().replace(" ", "")
             days = period_options[period_state["label"]]
-            now = datetime.now()
-            cutoff_date = now.date() - timedelta(days=max(0, days - 1))
-
-            file_name = f"sales_{period_label}_{now.strftime('%Y%m%d_%H%M%S')}.csv"
-            file_path = os.path.join(export_dir, file_name)
-
-            orders = get_all_orders()
-            rows = []
-            revenue = 0.0
-
-            for order in orders:
-                order_dt = _parse_order_datetime(order)
-                if not order_dt:
-                    continue
-                if order_dt.date() < cutoff_date:
-                    continue
-
-                status = (order.get("status") or "").lower().strip()
-                amount = _to_float(order.get("total_amount"), 0.0)
-                if status != "cancelled":
-                    revenue += amount
-
-                rows.append({
-                    "order_id": order.get("id"),
-                    "date": order_dt.strftime("%Y-%m-%d %H:%M"),
-                    "customer": order.get("customer_name", ""),
-                    "status": status,
-                    "amount": f"{amount:.2f}",
-                })
-
-            with open(file_path, "w", newline="", encoding="utf-8") as csv_file:
-                writer = csv.DictWriter(csv_file, fieldnames=["order_id", "date", "customer", "status", "amount"])
-                writer.writeheader()
-                writer.writerows(rows)
-                writer.writerow({})
-                writer.writerow({"order_id": "SUMMARY"})
-                writer.writerow({"order_id": "period", "date": period_state["label"]})
-                writer.writerow({"order_id": "orders_count", "date": str(len(rows))})
-                writer.writerow({"order_id": "non_cancelled_revenue", "date": f"{revenue:.2f}"})
-
-            show_snackbar(page, f"CSV exported: {file_path}", success=True)
+            cutoff_date = datetime.now().date() - timedelta(days=max(0, days - 1))
+            export_state["job"] = start_sales_export(
+                since=datetime.combine(cutoff_date, datetime.min.time()),
+                export_dir=export_dir,
+                period_label=period_state["label"],
+                compress=bool(compress_export_checkbox.value),
+                on_progress=on_export_progress,
+            )
         except Exception as ex:
+            reset_export_button()
             show_snackbar(page, f"CSV export failed: {str(ex)}", error=True)
-        finally:
-            export_csv_button.text = "Export CSV"
-            export_csv_button.icon = ft.Icons.DOWNLOAD
-            export_csv_button.bgcolor = ACCENT_DARK
-            export_csv_button.disabled = False
+            page.update()
+
+    def cancel_export(e):
+        job = export_state["job"]
+        if job is not None and not job.finished:
+            job.cancel()
+            cancel_export_button.disabled = True
             page.update()
 
     def render(new_stats):
@@ -755,7 +725,7 @@ def create_sales_dashboard(page: ft.Page):
 
     def refresh_dashboard(e):
         try:
-            new_stats = _compute_sales_stats(period_days=period_options[period_state["label"]])
+            new_stats = _sales_stats(period_days=period_options[period_state["label"]], fresh=True)
         except Exception:
             new_stats = stats_state["data"]
         stats_state["data"] = new_stats
@@ -766,7 +736,7 @@ def create_sales_dashboard(page: ft.Page):
         chosen = e.control.value or "30D"
         period_state["label"] = chosen
         try:
-            new_stats = _compute_sales_stats(period_days=period_options[period_state["label"]])
+            new_stats = _sales_stats(period_days=period_options[period_state["label"]])
         except Exception:
             new_stats = stats_state["data"]
         stats_state["data"] = new_stats
@@ -790,6 +760,7 @@ def create_sales_dashboard(page: ft.Page):
     )
 
     export_csv_button.on_click = export_csv
+    cancel_export_button.on_click = cancel_export
 
     render(stats)
 
@@ -799,7 +770,7 @@ def create_sales_dashboard(page: ft.Page):
                 ft.Row(
                     [
                         ft.Text("Sales Dashboard", size=18, weight=ft.FontWeight.BOLD, color=TEXT_DARK),
-                        ft.Row([period_dropdown, chart_metric_dropdown, refresh_button, export_csv_button], spacing=8, wrap=True),
+                        ft.Row([period_dropdown, chart_metric_dropdown, refresh_button, compress_export_checkbox, export_csv_button, cancel_export_button], spacing=8, wrap=True),
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
                 ),